@@ -10,7 +10,7 @@ from app.core.config import settings
 from app.core.database import Base
 
 # Импортируем все модели для автогенерации миграций
-from app.models import user, contact, company, deal, activity, file  # noqa
+from app.models import user, contact, company, deal, activity, file, stats  # noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,51 @@
+"""search trigram indexes
+
+Revision ID: a7c3e9f2b41d
+Revises: e4f2a9c1b8d0
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a7c3e9f2b41d"
+down_revision = "e4f2a9c1b8d0"
+branch_labels = None
+depends_on = None
+
+
+# Поля подстрочного поиска сервисов (search_columns)
+SEARCH_COLUMNS = {
+    "contacts": ["first_name", "last_name", "email", "phone"],
+    "companies": ["name", "email", "website"],
+    "deals": ["title", "description"],
+    "activities": ["title", "description"],
+    "files": ["filename", "original_filename", "title"],
+}
+
+
+def _index_name(table: str, column: str) -> str:
+    return f"ix_{table}_{column}_trgm"
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    # CONCURRENTLY не блокирует запись в большие таблицы, но требует autocommit
+    with op.get_context().autocommit_block():
+        for table, columns in SEARCH_COLUMNS.items():
+            for column in columns:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {_index_name(table, column)} "
+                    f"ON {table} USING gin ({column} gin_trgm_ops)"
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, columns in SEARCH_COLUMNS.items():
+            for column in columns:
+                op.execute(
+                    f"DROP INDEX CONCURRENTLY IF EXISTS {_index_name(table, column)}"
+                )
@@ -0,0 +1,34 @@
+"""activity reminder indexes
+
+Revision ID: a8d3f1c7e9b2
+Revises: f2c6a9d1b4e7
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a8d3f1c7e9b2"
+down_revision = "f2c6a9d1b4e7"
+branch_labels = None
+depends_on = None
+
+
+# Окно напоминаний: status = 'pending' AND <колонка> в (от, до] (app/services/reminder_service.py)
+REMINDER_COLUMNS = ["scheduled_at", "due_date"]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in REMINDER_COLUMNS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activities_reminders_{column} "
+                f"ON activities (status, {column}) WHERE is_deleted = false"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in REMINDER_COLUMNS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_activities_reminders_{column}")
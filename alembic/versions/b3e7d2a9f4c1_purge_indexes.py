@@ -0,0 +1,53 @@
+"""purge and foreign key reference indexes
+
+Revision ID: b3e7d2a9f4c1
+Revises: a8d3f1c7e9b2
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b3e7d2a9f4c1"
+down_revision = "a8d3f1c7e9b2"
+branch_labels = None
+depends_on = None
+
+
+# Очистка удаленных записей (app/services/purge_service.py): выбор пакетов по id
+PURGE_TABLES = ["files", "activities", "deals", "contacts", "companies"]
+
+# Внешние ключи без индекса: удаление родителя проверяет ссылки по этим колонкам
+# (deals.contact_id уже покрыт ix_deals_contact_id)
+REFERENCE_COLUMNS = {
+    "files": ["contact_id", "company_id", "deal_id", "activity_id"],
+    "activities": ["contact_id", "company_id", "deal_id"],
+    "deals": ["company_id"],
+    "contacts": ["company_id"],
+    "companies": ["parent_company_id"],
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in PURGE_TABLES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_purge "
+                f"ON {table} (id) WHERE is_deleted = true"
+            )
+        for table, columns in REFERENCE_COLUMNS.items():
+            for column in columns:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column}_ref "
+                    f"ON {table} ({column}) WHERE {column} IS NOT NULL"
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, columns in REFERENCE_COLUMNS.items():
+            for column in columns:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_{column}_ref")
+        for table in PURGE_TABLES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_purge")
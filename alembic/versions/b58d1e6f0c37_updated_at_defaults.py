@@ -0,0 +1,33 @@
+"""updated_at server defaults
+
+Revision ID: b58d1e6f0c37
+Revises: a7c3e9f2b41d
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b58d1e6f0c37"
+down_revision = "a7c3e9f2b41d"
+branch_labels = None
+depends_on = None
+
+TABLES = ("users", "contacts", "companies", "deals", "activities", "files")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(
+            f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL"
+        )
+        op.alter_column(table, "updated_at", server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        if table == "deals":
+            # У сделок server_default был и раньше
+            continue
+        op.alter_column(table, "updated_at", server_default=None)
@@ -0,0 +1,72 @@
+"""jsonb columns and gin indexes
+
+Revision ID: c3d8e1f4a2b7
+Revises: b58d1e6f0c37
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "c3d8e1f4a2b7"
+down_revision = "b58d1e6f0c37"
+branch_labels = None
+depends_on = None
+
+
+# JSON-поля, переводимые в JSONB
+JSONB_COLUMNS = {
+    "contacts": ["custom_fields", "tags"],
+    "companies": ["custom_fields", "tags", "social_links"],
+    "deals": ["custom_fields", "tags"],
+    "activities": ["custom_fields", "tags"],
+    "files": ["custom_fields", "tags"],
+}
+
+# Поля фильтров ?tag= и ?cf.<ключ>= (app/core/json_filters.py)
+INDEXED_COLUMNS = ["custom_fields", "tags"]
+
+
+def _index_name(table: str, column: str) -> str:
+    return f"ix_{table}_{column}_gin"
+
+
+def upgrade() -> None:
+    # Смена типа переписывает таблицу под эксклюзивной блокировкой
+    for table, columns in JSONB_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table,
+                column,
+                type_=postgresql.JSONB(),
+                postgresql_using=f"{column}::jsonb",
+            )
+    
+    # jsonb_path_ops: индекс меньше и быстрее стандартного, поддерживает оператор @>
+    with op.get_context().autocommit_block():
+        for table in JSONB_COLUMNS:
+            for column in INDEXED_COLUMNS:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {_index_name(table, column)} "
+                    f"ON {table} USING gin ({column} jsonb_path_ops)"
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in JSONB_COLUMNS:
+            for column in INDEXED_COLUMNS:
+                op.execute(
+                    f"DROP INDEX CONCURRENTLY IF EXISTS {_index_name(table, column)}"
+                )
+    
+    for table, columns in JSONB_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table,
+                column,
+                type_=sa.JSON(),
+                postgresql_using=f"{column}::json",
+            )
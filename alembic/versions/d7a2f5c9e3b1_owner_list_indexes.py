@@ -0,0 +1,53 @@
+"""owner list partial indexes
+
+Revision ID: d7a2f5c9e3b1
+Revises: c3d8e1f4a2b7
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "d7a2f5c9e3b1"
+down_revision = "c3d8e1f4a2b7"
+branch_labels = None
+depends_on = None
+
+
+# Фильтры списков по связям (owner_list_index в моделях)
+LIST_FILTER_COLUMNS = {
+    "contacts": ["company_id"],
+    "companies": [],
+    "deals": ["contact_id", "company_id"],
+    "activities": ["contact_id", "company_id", "deal_id"],
+    "files": ["contact_id", "company_id", "deal_id", "activity_id"],
+}
+
+
+def _indexes():
+    """(имя, таблица, колонки) частичных индексов списков владельца"""
+    for table, columns in LIST_FILTER_COLUMNS.items():
+        yield f"ix_{table}_owner_active", table, ["owner_id"]
+        for column in columns:
+            yield f"ix_{table}_owner_{column}_active", table, ["owner_id", column]
+
+
+def upgrade() -> None:
+    # Условие индекса совпадает с условием запросов сервисов (is_deleted = false)
+    with op.get_context().autocommit_block():
+        for name, table, columns in _indexes():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} ({', '.join(columns)}, created_at DESC, id DESC) "
+                f"WHERE is_deleted = false"
+            )
+        # Покрыт префиксом ix_deals_owner_active и мешал планировщику выбрать составной индекс
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_deals_owner_id")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_deals_owner_id ON deals (owner_id)")
+        for name, _, _ in _indexes():
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
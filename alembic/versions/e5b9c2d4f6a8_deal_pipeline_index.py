@@ -0,0 +1,31 @@
+"""deal pipeline index
+
+Revision ID: e5b9c2d4f6a8
+Revises: d7a2f5c9e3b1
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "e5b9c2d4f6a8"
+down_revision = "d7a2f5c9e3b1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # GET /deals/pipeline: группировка и row_number() по статусу читают только индекс
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_deals_owner_pipeline "
+            "ON deals (owner_id, status, amount DESC NULLS LAST, id DESC) "
+            "INCLUDE (currency, probability) "
+            "WHERE is_deleted = false"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_deals_owner_pipeline")
@@ -0,0 +1,75 @@
+"""daily stats rollup tables
+
+Revision ID: f2c6a9d1b4e7
+Revises: e5b9c2d4f6a8
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "f2c6a9d1b4e7"
+down_revision = "e5b9c2d4f6a8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "deal_daily_stats",
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="dealstatus", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("amount_sum", sa.Numeric(20, 2), nullable=False),
+        sa.Column("weighted_sum", sa.Numeric(22, 2), nullable=False),
+        sa.PrimaryKeyConstraint("owner_id", "day", "status", "currency"),
+    )
+    op.create_index("ix_deal_daily_stats_day", "deal_daily_stats", ["day"])
+
+    op.create_table(
+        "activity_daily_stats",
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("type", sa.String(length=50), nullable=False),
+        sa.Column("status", sa.String(length=50), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("owner_id", "day", "type", "status"),
+    )
+    op.create_index("ix_activity_daily_stats_day", "activity_daily_stats", ["day"])
+
+    # Начальное заполнение; далее сводки обновляются сервисами (app/services/rollup_service.py).
+    # Записи, измененные между миграцией и перезапуском приложения, исправляет rebuild().
+    op.execute(
+        """
+        INSERT INTO deal_daily_stats (owner_id, day, status, currency, count, amount_sum, weighted_sum)
+        SELECT owner_id, (created_at AT TIME ZONE 'UTC')::date, status, coalesce(currency, ''),
+               count(*), coalesce(sum(amount), 0), coalesce(sum(amount * probability), 0)
+        FROM deals
+        WHERE is_deleted = false
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO activity_daily_stats (owner_id, day, type, status, count)
+        SELECT owner_id, (created_at AT TIME ZONE 'UTC')::date, type, coalesce(status, ''), count(*)
+        FROM activities
+        WHERE is_deleted = false
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_activity_daily_stats_day", table_name="activity_daily_stats")
+    op.drop_table("activity_daily_stats")
+    op.drop_index("ix_deal_daily_stats_day", table_name="deal_daily_stats")
+    op.drop_table("deal_daily_stats")
@@ -0,0 +1,55 @@
+"""
+Общие зависимости эндпоинтов
+"""
+import secrets
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_session
+from app.core.security import principal_cache, verify_token
+from app.schemas.user import User
+from app.services.user_service import UserService
+
+
+async def get_current_user(
+    token: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_session)
+) -> User:
+    """Получение текущего пользователя.
+    
+    Пользователь кешируется по ключу "sub" на AUTH_CACHE_TTL_SECONDS,
+    поэтому большинство запросов не обращаются к таблице users.
+    """
+    # В токене используется ключ "sub" для хранения user_id
+    user_id = int(token.get("sub"))
+    user = principal_cache.get(user_id)
+    if user is None:
+        db_user = await UserService(db).get_by_id(user_id)
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Пользователь не найден"
+            )
+        user = User.model_validate(db_user)
+        principal_cache.set(user_id, user)
+    return user
+
+
+async def verify_metrics_token(request: Request) -> None:
+    """Доступ к /metrics по Bearer токену METRICS_TOKEN.
+    
+    Без METRICS_TOKEN эндпоинт выключен (404): метрики раскрывают состояние
+    пулов, кешей и число клиентов и не должны быть публичными.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    auth_header = request.headers.get("Authorization", "")
+    token = auth_header[7:] if auth_header.startswith("Bearer ") else ""
+    if not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Недействительный токен метрик",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
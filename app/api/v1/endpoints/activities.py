@@ -1,53 +1,53 @@
 """
 Эндпоинты для активностей
 """
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_current_user
 from app.core.database import get_async_session
-from app.core.security import verify_token
+from app.core.etag import entity_etag, etag_matches, list_etag, not_modified
+from app.core.export import ExportFormat, export_response
+from app.core.fast_json import entity_content, list_content
+from app.core.fieldsets import parse_fields
+from app.core.json_filters import custom_field_params
+from app.core.pagination import TotalStrategy, decode_cursor
+from app.core.response_cache import response_cache
 from app.schemas.activity import Activity, ActivityCreate, ActivityUpdate, ActivityList
+from app.schemas.bulk import BulkRequest, BulkResponse
 from app.schemas.user import User
 from app.services.activity_service import ActivityService
 
 router = APIRouter()
 
 
-async def get_current_user(
-    token: dict = Depends(verify_token),
-    db: AsyncSession = Depends(get_async_session)
-) -> User:
-    """Получение текущего пользователя"""
-    from app.services.user_service import UserService
-    user_service = UserService(db)
-    # В токене используется ключ "sub" для хранения user_id
-    user_id = int(token.get("sub"))
-    user = await user_service.get_by_id(user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
-    return user
-
-
 @router.get("/", response_model=ActivityList)
 async def get_activities(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    total_strategy: Optional[TotalStrategy] = Query(None, description="Подсчет total: exact, estimated или none; по умолчанию exact, для страниц по cursor — none"),
+    fields: str = Query(None, description="Поля элементов через запятую, например id,title"),
     search: str = Query(None, description="Поиск по названию"),
     type: str = Query(None, description="Фильтр по типу"),
     status: str = Query(None, description="Фильтр по статусу"),
     contact_id: int = Query(None, description="Фильтр по контакту"),
     company_id: int = Query(None, description="Фильтр по компании"),
     deal_id: int = Query(None, description="Фильтр по сделке"),
+    tag: List[str] = Query(None, description="Фильтр по тегу; можно повторить (tag=a&tag=b), тогда нужны все теги"),
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Получение списка активностей"""
+    custom_fields = custom_field_params(request)
+    selected_fields = parse_fields(fields, Activity)
+    cached = await response_cache.lookup("activities", current_user.id, request, db=db)
+    if cached.response is not None:
+        return cached.response
     activity_service = ActivityService(db)
-    activities, total = await activity_service.get_activities(
+    page = await activity_service.get_activities(
         owner_id=current_user.id,
         skip=skip,
         limit=limit,
@@ -56,25 +56,64 @@ async def get_activities(
         status=status,
         contact_id=contact_id,
         company_id=company_id,
-        deal_id=deal_id
+        deal_id=deal_id,
+        tags=tag,
+        custom_fields=custom_fields,
+        cursor=decode_cursor(cursor),
+        total_strategy=total_strategy,
+        fields=selected_fields
     )
+    etag = list_etag(request, current_user.id, page)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    return ActivityList(
-        items=activities,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
+    content = list_content(ActivityList, Activity, page.as_response(skip, limit), selected_fields)
+    return await cached.store(content, etag=etag)
+
+
+@router.get("/export")
+async def export_activities(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Формат выгрузки: ndjson или csv"),
+    fields: str = Query(None, description="Колонки через запятую (по умолчанию все поля)"),
+    search: str = Query(None, description="Поиск по названию"),
+    type: str = Query(None, description="Фильтр по типу"),
+    status: str = Query(None, description="Фильтр по статусу"),
+    contact_id: int = Query(None, description="Фильтр по контакту"),
+    company_id: int = Query(None, description="Фильтр по компании"),
+    deal_id: int = Query(None, description="Фильтр по сделке"),
+    tag: List[str] = Query(None, description="Фильтр по тегу; можно повторить (tag=a&tag=b), тогда нужны все теги"),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Потоковая выгрузка всех активностей с фильтрацией"""
+    custom_fields = custom_field_params(request)
+    selected_fields = parse_fields(fields, Activity)
+    query = ActivityService(db).get_activities_export_query(
+        owner_id=current_user.id,
+        search=search,
+        type=type,
+        status=status,
+        contact_id=contact_id,
+        company_id=company_id,
+        deal_id=deal_id,
+        tags=tag,
+        custom_fields=custom_fields
     )
+    return export_response(query, Activity, format, "activities", selected_fields)
 
 
 @router.get("/{activity_id}", response_model=Activity)
 async def get_activity(
     activity_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Получение активности по ID"""
+    cached = await response_cache.lookup("activities", current_user.id, request, db=db)
+    if cached.response is not None:
+        return cached.response
     activity_service = ActivityService(db)
     activity = await activity_service.get_activity(activity_id, current_user.id)
     if not activity:
@@ -82,7 +121,10 @@ async def get_activity(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Активность не найдена"
         )
-    return activity
+    etag = entity_etag(activity)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return await cached.store(entity_content(Activity, activity), etag=etag)
 
 
 @router.post("/", response_model=Activity, status_code=status.HTTP_201_CREATED)
@@ -97,6 +139,17 @@ async def create_activity(
     return activity
 
 
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_activities(
+    bulk: BulkRequest,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """Пакетное создание, изменение и удаление активностей с результатом по каждой операции"""
+    activity_service = ActivityService(db)
+    return await activity_service.bulk_activities(bulk.operations, current_user.id, atomic=bulk.atomic)
+
+
 @router.put("/{activity_id}", response_model=Activity)
 async def update_activity(
     activity_id: int,
@@ -9,7 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_async_session
-from app.core.security import create_access_token, create_refresh_token, verify_token, get_password_hash, verify_password
+from app.core.security import create_access_token, create_refresh_token, verify_token, verify_password_async
 from app.schemas.user import User, UserCreate, UserLogin, Token
 from app.services.user_service import UserService
 
@@ -54,7 +54,7 @@ async def login(
     
     # Получаем пользователя по email
     user = await user_service.get_by_email(form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль"
@@ -1,12 +1,20 @@
 """
 Эндпоинты для компаний
 """
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_current_user
 from app.core.database import get_async_session
-from app.core.security import verify_token
+from app.core.etag import entity_etag, etag_matches, list_etag, not_modified
+from app.core.export import ExportFormat, export_response
+from app.core.fast_json import entity_content, list_content
+from app.core.fieldsets import parse_fields
+from app.core.json_filters import custom_field_params
+from app.core.pagination import TotalStrategy, decode_cursor
+from app.core.response_cache import response_cache
+from app.schemas.bulk import BulkRequest, BulkResponse
 from app.schemas.company import Company, CompanyCreate, CompanyUpdate, CompanyList
 from app.schemas.user import User
 from app.services.company_service import CompanyService
@@ -14,61 +22,86 @@ from app.services.company_service import CompanyService
 router = APIRouter()
 
 
-async def get_current_user(
-    token: dict = Depends(verify_token),
-    db: AsyncSession = Depends(get_async_session)
-) -> User:
-    """Получение текущего пользователя"""
-    from app.services.user_service import UserService
-    user_service = UserService(db)
-    # В токене используется ключ "sub" для хранения user_id
-    user_id = int(token.get("sub"))
-    user = await user_service.get_by_id(user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
-    return user
-
-
 @router.get("/", response_model=CompanyList)
 async def get_companies(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    total_strategy: Optional[TotalStrategy] = Query(None, description="Подсчет total: exact, estimated или none; по умолчанию exact, для страниц по cursor — none"),
+    fields: str = Query(None, description="Поля элементов через запятую, например id,title"),
     search: str = Query(None, description="Поиск по названию или email"),
     status: str = Query(None, description="Фильтр по статусу"),
     industry: str = Query(None, description="Фильтр по отрасли"),
+    tag: List[str] = Query(None, description="Фильтр по тегу; можно повторить (tag=a&tag=b), тогда нужны все теги"),
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Получение списка компаний"""
+    custom_fields = custom_field_params(request)
+    selected_fields = parse_fields(fields, Company)
+    cached = await response_cache.lookup("companies", current_user.id, request, db=db)
+    if cached.response is not None:
+        return cached.response
     company_service = CompanyService(db)
-    companies, total = await company_service.get_companies(
+    page = await company_service.get_companies(
         owner_id=current_user.id,
         skip=skip,
         limit=limit,
         search=search,
         status=status,
-        industry=industry
+        industry=industry,
+        tags=tag,
+        custom_fields=custom_fields,
+        cursor=decode_cursor(cursor),
+        total_strategy=total_strategy,
+        fields=selected_fields
     )
+    etag = list_etag(request, current_user.id, page)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    return CompanyList(
-        items=companies,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
+    content = list_content(CompanyList, Company, page.as_response(skip, limit), selected_fields)
+    return await cached.store(content, etag=etag)
+
+
+@router.get("/export")
+async def export_companies(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Формат выгрузки: ndjson или csv"),
+    fields: str = Query(None, description="Колонки через запятую (по умолчанию все поля)"),
+    search: str = Query(None, description="Поиск по названию или email"),
+    status: str = Query(None, description="Фильтр по статусу"),
+    industry: str = Query(None, description="Фильтр по отрасли"),
+    tag: List[str] = Query(None, description="Фильтр по тегу; можно повторить (tag=a&tag=b), тогда нужны все теги"),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Потоковая выгрузка всех компаний с фильтрацией"""
+    custom_fields = custom_field_params(request)
+    selected_fields = parse_fields(fields, Company)
+    query = CompanyService(db).get_companies_export_query(
+        owner_id=current_user.id,
+        search=search,
+        status=status,
+        industry=industry,
+        tags=tag,
+        custom_fields=custom_fields
     )
+    return export_response(query, Company, format, "companies", selected_fields)
 
 
 @router.get("/{company_id}", response_model=Company)
 async def get_company(
     company_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Получение компании по ID"""
+    cached = await response_cache.lookup("companies", current_user.id, request, db=db)
+    if cached.response is not None:
+        return cached.response
     company_service = CompanyService(db)
     company = await company_service.get_company(company_id, current_user.id)
     if not company:
@@ -76,7 +109,10 @@ async def get_company(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Компания не найдена"
         )
-    return company
+    etag = entity_etag(company)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return await cached.store(entity_content(Company, company), etag=etag)
 
 
 @router.post("/", response_model=Company, status_code=status.HTTP_201_CREATED)
@@ -103,6 +139,17 @@ async def create_company(
         )
 
 
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_companies(
+    bulk: BulkRequest,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """Пакетное создание, изменение и удаление компаний с результатом по каждой операции"""
+    company_service = CompanyService(db)
+    return await company_service.bulk_companies(bulk.operations, current_user.id, atomic=bulk.atomic)
+
+
 @router.put("/{company_id}", response_model=Company)
 async def update_company(
     company_id: int,
@@ -1,13 +1,21 @@
 """
 Эндпоинты для контактов
 """
-from typing import Any, List
-from fastapi import APIRouter, Depends, File as FastAPIFile, HTTPException, UploadFile, status, Query
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, File as FastAPIFile, HTTPException, UploadFile, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_current_user
 from app.core.avatar_upload import local_path_from_contact_avatar_url, save_contact_avatar_file
 from app.core.database import get_async_session
-from app.core.security import verify_token
+from app.core.etag import entity_etag, etag_matches, list_etag, not_modified
+from app.core.export import ExportFormat, export_response
+from app.core.fast_json import entity_content, list_content
+from app.core.fieldsets import parse_fields
+from app.core.json_filters import custom_field_params
+from app.core.pagination import TotalStrategy, decode_cursor
+from app.core.response_cache import response_cache
+from app.schemas.bulk import BulkRequest, BulkResponse
 from app.schemas.contact import Contact, ContactCreate, ContactUpdate, ContactList
 from app.schemas.user import User
 from app.services.contact_service import ContactService
@@ -15,61 +23,86 @@ from app.services.contact_service import ContactService
 router = APIRouter()
 
 
-async def get_current_user(
-    token: dict = Depends(verify_token),
-    db: AsyncSession = Depends(get_async_session)
-) -> User:
-    """Получение текущего пользователя"""
-    from app.services.user_service import UserService
-    user_service = UserService(db)
-    # В токене используется ключ "sub" для хранения user_id
-    user_id = int(token.get("sub"))
-    user = await user_service.get_by_id(user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
-    return user
-
-
 @router.get("/", response_model=ContactList)
 async def get_contacts(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    total_strategy: Optional[TotalStrategy] = Query(None, description="Подсчет total: exact, estimated или none; по умолчанию exact, для страниц по cursor — none"),
+    fields: str = Query(None, description="Поля элементов через запятую, например id,title"),
     search: str = Query(None, description="Поиск по имени, email или телефону"),
     status: str = Query(None, description="Фильтр по статусу"),
     company_id: int = Query(None, description="Фильтр по компании"),
+    tag: List[str] = Query(None, description="Фильтр по тегу; можно повторить (tag=a&tag=b), тогда нужны все теги"),
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Получение списка контактов"""
+    custom_fields = custom_field_params(request)
+    selected_fields = parse_fields(fields, Contact)
+    cached = await response_cache.lookup("contacts", current_user.id, request, db=db)
+    if cached.response is not None:
+        return cached.response
     contact_service = ContactService(db)
-    contacts, total = await contact_service.get_contacts(
+    page = await contact_service.get_contacts(
         owner_id=current_user.id,
         skip=skip,
         limit=limit,
         search=search,
         status=status,
-        company_id=company_id
+        company_id=company_id,
+        tags=tag,
+        custom_fields=custom_fields,
+        cursor=decode_cursor(cursor),
+        total_strategy=total_strategy,
+        fields=selected_fields
     )
+    etag = list_etag(request, current_user.id, page)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    return ContactList(
-        items=contacts,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
+    content = list_content(ContactList, Contact, page.as_response(skip, limit), selected_fields)
+    return await cached.store(content, etag=etag)
+
+
+@router.get("/export")
+async def export_contacts(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Формат выгрузки: ndjson или csv"),
+    fields: str = Query(None, description="Колонки через запятую (по умолчанию все поля)"),
+    search: str = Query(None, description="Поиск по имени, email или телефону"),
+    status: str = Query(None, description="Фильтр по статусу"),
+    company_id: int = Query(None, description="Фильтр по компании"),
+    tag: List[str] = Query(None, description="Фильтр по тегу; можно повторить (tag=a&tag=b), тогда нужны все теги"),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Потоковая выгрузка всех контактов с фильтрацией"""
+    custom_fields = custom_field_params(request)
+    selected_fields = parse_fields(fields, Contact)
+    query = ContactService(db).get_contacts_export_query(
+        owner_id=current_user.id,
+        search=search,
+        status=status,
+        company_id=company_id,
+        tags=tag,
+        custom_fields=custom_fields
     )
+    return export_response(query, Contact, format, "contacts", selected_fields)
 
 
 @router.get("/{contact_id}", response_model=Contact)
 async def get_contact(
     contact_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Получение контакта по ID"""
+    cached = await response_cache.lookup("contacts", current_user.id, request, db=db)
+    if cached.response is not None:
+        return cached.response
     contact_service = ContactService(db)
     contact = await contact_service.get_contact(contact_id, current_user.id)
     if not contact:
@@ -77,7 +110,10 @@ async def get_contact(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Контакт не найден"
         )
-    return contact
+    etag = entity_etag(contact)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return await cached.store(entity_content(Contact, contact), etag=etag)
 
 
 @router.post("/{contact_id}/avatar", response_model=Contact)
@@ -162,6 +198,17 @@ async def create_contact(
         )
 
 
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_contacts(
+    bulk: BulkRequest,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """Пакетное создание, изменение и удаление контактов с результатом по каждой операции"""
+    contact_service = ContactService(db)
+    return await contact_service.bulk_contacts(bulk.operations, current_user.id, atomic=bulk.atomic)
+
+
 @router.put("/{contact_id}", response_model=Contact)
 async def update_contact(
     contact_id: int,
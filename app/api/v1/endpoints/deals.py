@@ -1,52 +1,52 @@
 """
 Эндпоинты для сделок
 """
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_current_user
 from app.core.database import get_async_session
-from app.core.security import verify_token
-from app.schemas.deal import Deal, DealCreate, DealUpdate, DealList, DealStatusUpdate
+from app.core.etag import entity_etag, etag_matches, list_etag, not_modified
+from app.core.export import ExportFormat, export_response
+from app.core.fast_json import entity_content, list_content
+from app.core.fieldsets import parse_fields
+from app.core.json_filters import custom_field_params
+from app.core.pagination import TotalStrategy, decode_cursor
+from app.core.response_cache import response_cache
+from app.schemas.bulk import BulkRequest, BulkResponse
+from app.schemas.deal import Deal, DealCreate, DealUpdate, DealList, DealPipeline, DealStatusUpdate
 from app.schemas.user import User
 from app.services.deal_service import DealService
 
 router = APIRouter()
 
 
-async def get_current_user(
-    token: dict = Depends(verify_token),
-    db: AsyncSession = Depends(get_async_session)
-) -> User:
-    """Получение текущего пользователя"""
-    from app.services.user_service import UserService
-    user_service = UserService(db)
-    # В токене используется ключ "sub" для хранения user_id
-    user_id = int(token.get("sub"))
-    user = await user_service.get_by_id(user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
-    return user
-
-
 @router.get("/", response_model=DealList)
 async def get_deals(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    total_strategy: Optional[TotalStrategy] = Query(None, description="Подсчет total: exact, estimated или none; по умолчанию exact, для страниц по cursor — none"),
+    fields: str = Query(None, description="Поля элементов через запятую, например id,title"),
     search: str = Query(None, description="Поиск по названию"),
     status: str = Query(None, description="Фильтр по статусу (Новая, В работе, Завершена, Отменена)"),
     manager_id: int = Query(None, description="Фильтр по менеджеру (owner_id)"),
     contact_id: int = Query(None, description="Фильтр по клиенту (contact_id)"),
     company_id: int = Query(None, description="Фильтр по компании"),
+    tag: List[str] = Query(None, description="Фильтр по тегу; можно повторить (tag=a&tag=b), тогда нужны все теги"),
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Получение списка сделок с фильтрацией"""
+    custom_fields = custom_field_params(request)
+    selected_fields = parse_fields(fields, Deal)
+    cached = await response_cache.lookup("deals", current_user.id, request, owner_id=manager_id, db=db)
+    if cached.response is not None:
+        return cached.response
     deal_service = DealService(db)
-    deals, total = await deal_service.get_deals(
+    page = await deal_service.get_deals(
         owner_id=current_user.id,
         skip=skip,
         limit=limit,
@@ -54,25 +54,79 @@ async def get_deals(
         status=status,
         manager_id=manager_id,
         contact_id=contact_id,
-        company_id=company_id
+        company_id=company_id,
+        tags=tag,
+        custom_fields=custom_fields,
+        cursor=decode_cursor(cursor),
+        total_strategy=total_strategy,
+        fields=selected_fields
     )
+    etag = list_etag(request, current_user.id, page)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    return DealList(
-        items=deals,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
+    content = list_content(DealList, Deal, page.as_response(skip, limit), selected_fields)
+    return await cached.store(content, etag=etag)
+
+
+@router.get("/export")
+async def export_deals(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Формат выгрузки: ndjson или csv"),
+    fields: str = Query(None, description="Колонки через запятую (по умолчанию все поля)"),
+    search: str = Query(None, description="Поиск по названию"),
+    status: str = Query(None, description="Фильтр по статусу (Новая, В работе, Завершена, Отменена)"),
+    manager_id: int = Query(None, description="Фильтр по менеджеру (owner_id)"),
+    contact_id: int = Query(None, description="Фильтр по клиенту (contact_id)"),
+    company_id: int = Query(None, description="Фильтр по компании"),
+    tag: List[str] = Query(None, description="Фильтр по тегу; можно повторить (tag=a&tag=b), тогда нужны все теги"),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Потоковая выгрузка всех сделок с фильтрацией"""
+    custom_fields = custom_field_params(request)
+    selected_fields = parse_fields(fields, Deal)
+    query = DealService(db).get_deals_export_query(
+        owner_id=current_user.id,
+        search=search,
+        status=status,
+        manager_id=manager_id,
+        contact_id=contact_id,
+        company_id=company_id,
+        tags=tag,
+        custom_fields=custom_fields
     )
+    return export_response(query, Deal, format, "deals", selected_fields)
+
+
+@router.get("/pipeline", response_model=DealPipeline)
+async def get_deal_pipeline(
+    request: Request,
+    top: int = Query(5, ge=0, le=50, description="Сколько крупнейших сделок вернуть в каждой колонке"),
+    manager_id: int = Query(None, description="Воронка менеджера (owner_id)"),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """Воронка сделок: по каждому статусу количество, суммы по валютам и top-N сделок"""
+    cached = await response_cache.lookup("deals", current_user.id, request, owner_id=manager_id, db=db)
+    if cached.response is not None:
+        return cached.response
+    deal_service = DealService(db)
+    pipeline = await deal_service.get_pipeline(current_user.id, manager_id=manager_id, top=top)
+    return await cached.store(pipeline)
 
 
 @router.get("/{deal_id}", response_model=Deal)
 async def get_deal(
     deal_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Получение сделки по ID"""
+    cached = await response_cache.lookup("deals", current_user.id, request, db=db)
+    if cached.response is not None:
+        return cached.response
     deal_service = DealService(db)
     deal = await deal_service.get_deal(deal_id, current_user.id)
     if not deal:
@@ -80,7 +134,10 @@ async def get_deal(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Сделка не найдена"
         )
-    return deal
+    etag = entity_etag(deal)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return await cached.store(entity_content(Deal, deal), etag=etag)
 
 
 @router.post("/", response_model=Deal, status_code=status.HTTP_201_CREATED)
@@ -112,6 +169,17 @@ async def create_deal(
         )
 
 
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_deals(
+    bulk: BulkRequest,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """Пакетное создание, изменение и удаление сделок с результатом по каждой операции"""
+    deal_service = DealService(db)
+    return await deal_service.bulk_deals(bulk.operations, current_user.id, atomic=bulk.atomic)
+
+
 @router.put("/{deal_id}", response_model=Deal)
 async def update_deal(
     deal_id: int,
@@ -1,12 +1,14 @@
 """
 Эндпоинты для файлов
 """
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File as FastAPIFile
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File as FastAPIFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_current_user
 from app.core.database import get_async_session
-from app.core.security import verify_token
+from app.core.json_filters import custom_field_params
+from app.core.pagination import TotalStrategy, decode_cursor
 from app.schemas.file import File, FileCreate, FileList
 from app.schemas.user import User
 from app.services.file_service import FileService
@@ -14,40 +16,27 @@ from app.services.file_service import FileService
 router = APIRouter()
 
 
-async def get_current_user(
-    token: dict = Depends(verify_token),
-    db: AsyncSession = Depends(get_async_session)
-) -> User:
-    """Получение текущего пользователя"""
-    from app.services.user_service import UserService
-    user_service = UserService(db)
-    # В токене используется ключ "sub" для хранения user_id
-    user_id = int(token.get("sub"))
-    user = await user_service.get_by_id(user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
-    return user
-
-
 @router.get("/", response_model=FileList)
 async def get_files(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    total_strategy: Optional[TotalStrategy] = Query(None, description="Подсчет total: exact, estimated или none; по умолчанию exact, для страниц по cursor — none"),
     search: str = Query(None, description="Поиск по названию файла"),
     mime_type: str = Query(None, description="Фильтр по типу файла"),
     contact_id: int = Query(None, description="Фильтр по контакту"),
     company_id: int = Query(None, description="Фильтр по компании"),
     deal_id: int = Query(None, description="Фильтр по сделке"),
     activity_id: int = Query(None, description="Фильтр по активности"),
+    tag: List[str] = Query(None, description="Фильтр по тегу; можно повторить (tag=a&tag=b), тогда нужны все теги"),
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Получение списка файлов"""
+    custom_fields = custom_field_params(request)
     file_service = FileService(db)
-    files, total = await file_service.get_files(
+    page = await file_service.get_files(
         owner_id=current_user.id,
         skip=skip,
         limit=limit,
@@ -56,16 +45,14 @@ async def get_files(
         contact_id=contact_id,
         company_id=company_id,
         deal_id=deal_id,
-        activity_id=activity_id
+        activity_id=activity_id,
+        tags=tag,
+        custom_fields=custom_fields,
+        cursor=decode_cursor(cursor),
+        total_strategy=total_strategy
     )
     
-    return FileList(
-        items=files,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
-    )
+    return FileList(**page.as_response(skip, limit))
 
 
 @router.get("/{file_id}", response_model=File)
@@ -1,41 +1,70 @@
-from fastapi import APIRouter, Request
-import structlog
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, Body, HTTPException, Request, status
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.core.frontend_logs import frontend_logs
 from app.schemas.log import FrontendLogData
 
 router = APIRouter()
-logger = structlog.get_logger("frontend_logger")
+
+
+def _token_user_id(request: Request) -> Optional[str]:
+    """ID пользователя из Bearer токена (лог без валидного токена принимается анонимно)"""
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    try:
+        payload = jwt.decode(auth_header[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
 
 @router.post("", status_code=200)
-async def receive_frontend_log(log_data: FrontendLogData, request: Request):
+async def receive_frontend_logs(
+    request: Request,
+    logs: Union[List[FrontendLogData], FrontendLogData] = Body(...)
+):
     """
-    Эндпоинт для приема логов с фронтенда.
-    Логи пишутся в системный вывод с пометкой frontend_logger.
+    Эндпоинт для приема логов с фронтенда: одна запись или массив
+    до FRONTEND_LOG_MAX_BATCH записей.
+    Записи ставятся в очередь и пишутся в системный вывод с пометкой
+    frontend_logger фоновой задачей; сверх лимита клиента отбрасываются.
     """
-    user_id = None
-    auth_header = request.headers.get("Authorization")
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header.split(" ")[1]
-        try:
-            import jwt
-            from app.core.config import settings
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            user_id = payload.get("sub")
-        except Exception:
-            pass
-
-    log_context = {
-        "url": log_data.url,
-        "userAgent": log_data.userAgent,
-        "frontend_timestamp": log_data.timestamp,
-        "frontend_context": log_data.context,
-        "user_id": user_id
-    }
+    entries = logs if isinstance(logs, list) else [logs]
+    if len(entries) > settings.FRONTEND_LOG_MAX_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Не больше {settings.FRONTEND_LOG_MAX_BATCH} записей в одном запросе"
+        )
     
-    if log_data.level == "error":
-        logger.error(log_data.message, **log_context)
-    elif log_data.level in ["warn", "warning"]:
-        logger.warning(log_data.message, **log_context)
-    else:
-        logger.info(log_data.message, **log_context)
-        
-    return {"status": "success", "message": "Log received"}
+    user_id = _token_user_id(request)
+    client = f"user:{user_id}" if user_id else f"ip:{request.client.host if request.client else '-'}"
+    result = frontend_logs.submit(client, [
+        {
+            "level": entry.level,
+            "message": entry.message,
+            "url": entry.url,
+            "userAgent": entry.userAgent,
+            "frontend_timestamp": entry.timestamp,
+            "frontend_context": entry.context,
+            "user_id": user_id,
+        }
+        for entry in entries
+    ])
+    
+    if result["rate_limited"] and not result["accepted"]:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много логов, повторите позже",
+            headers={"Retry-After": "1"}
+        )
+    
+    return {
+        "status": "success",
+        "message": "Log received",
+        "accepted": result["accepted"],
+        "dropped": len(entries) - result["accepted"],
+    }
@@ -5,32 +5,15 @@ from typing import Any, List
 from fastapi import APIRouter, Depends, File as FastAPIFile, HTTPException, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_current_user
 from app.core.avatar_upload import local_path_from_avatar_url, save_user_avatar_file
 from app.core.database import get_async_session
-from app.core.security import verify_token
 from app.schemas.user import User, UserUpdate
 from app.services.user_service import UserService
 
 router = APIRouter()
 
 
-async def get_current_user(
-    token: dict = Depends(verify_token),
-    db: AsyncSession = Depends(get_async_session)
-) -> User:
-    """Получение текущего пользователя"""
-    user_service = UserService(db)
-    # В токене используется ключ "sub" для хранения user_id
-    user_id = int(token.get("sub"))
-    user = await user_service.get_by_id(user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
-    return user
-
-
 @router.get("/me", response_model=User)
 async def get_current_user_info(
     current_user: User = Depends(get_current_user)
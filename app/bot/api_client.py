@@ -1,10 +1,63 @@
 """
 Клиент для работы с CRM API
 """
+import asyncio
+import logging
+import random
 import httpx
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Awaitable
 from app.bot.config import bot_settings
 
+logger = logging.getLogger(__name__)
+
+# Поля, которые показывают списки бота (?fields= — сервер не загружает остальное)
+COMPANY_LIST_FIELDS = "id,name,status"
+CONTACT_LIST_FIELDS = "id,first_name,last_name,email"
+DEAL_LIST_FIELDS = "id,title,status,amount,currency"
+
+# Ответы, после которых идемпотентный запрос повторяется
+RETRY_STATUS_CODES = frozenset({502, 503, 504})
+
+# Общий HTTP-клиент процесса бота: пул keep-alive соединений к API
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 в httpx требует пакет h2 (httpx[http2]) и работает только поверх TLS"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Общий для всех пользователей бота httpx.AsyncClient (создается при первом запросе)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=bot_settings.API_HTTP2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=bot_settings.API_MAX_CONNECTIONS,
+                max_keepalive_connections=bot_settings.API_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=bot_settings.API_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                bot_settings.API_TIMEOUT,
+                connect=bot_settings.API_CONNECT_TIMEOUT,
+                pool=bot_settings.API_POOL_TIMEOUT,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Закрытие общего клиента (остановка бота)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 class APIClient:
     """Клиент для взаимодействия с API"""
@@ -12,14 +65,20 @@ class APIClient:
     def __init__(self, base_url: str = None):
         self.base_url = base_url or bot_settings.API_BASE_URL
         self.token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        # Вызывается после обновления токенов через /auth/refresh (сохранение сессии)
+        self.on_token_refresh: Optional[Callable[["APIClient"], Awaitable[None]]] = None
     
-    def set_token(self, token: str):
-        """Установка JWT токена"""
+    def set_token(self, token: str, refresh_token: Optional[str] = None):
+        """Установка JWT токена (и refresh токена, если передан)"""
         self.token = token
+        if refresh_token is not None:
+            self.refresh_token = refresh_token
     
     def clear_token(self):
-        """Очистка токена"""
+        """Очистка токенов"""
         self.token = None
+        self.refresh_token = None
     
     def _get_headers(self) -> Dict[str, str]:
         """Получение заголовков для запросов"""
@@ -28,107 +87,177 @@ class APIClient:
             headers["Authorization"] = f"Bearer {self.token}"
         return headers
     
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        idempotent: bool = True,
+        authorized: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """Запрос к API с обновлением истекшего токена.
+        
+        На ответ 401 запрос с токеном (authorized) повторяется один раз после
+        получения новой пары токенов через /auth/refresh.
+        """
+        try:
+            return await self._send(method, path, idempotent, headers or self._get_headers(), **kwargs)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code != 401 or not authorized or not self.refresh_token:
+                raise
+        await self.refresh()
+        return await self._send(method, path, idempotent, self._get_headers(), **kwargs)
+    
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        idempotent: bool,
+        headers: Dict[str, str],
+        **kwargs
+    ) -> httpx.Response:
+        """Запрос к API через общий клиент с повторами и экспоненциальной задержкой.
+        
+        Повторяются ошибки соединения и таймауты, а для идемпотентных запросов еще
+        и ответы 502/503/504. Неидемпотентный запрос повторяется, только если
+        соединение не было установлено (запрос точно не дошел до API).
+        """
+        kwargs["headers"] = headers
+        client = get_http_client()
+        attempt = 0
+        while True:
+            try:
+                response = await client.request(method, f"{self.base_url}{path}", **kwargs)
+                retry = idempotent and response.status_code in RETRY_STATUS_CODES
+                if not retry or attempt >= bot_settings.API_RETRIES:
+                    response.raise_for_status()
+                    return response
+                reason = response.status_code
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as exc:
+                if attempt >= bot_settings.API_RETRIES:
+                    raise
+                reason = repr(exc)
+            except httpx.TransportError as exc:
+                if not idempotent or attempt >= bot_settings.API_RETRIES:
+                    raise
+                reason = repr(exc)
+            # Задержка base * 2^attempt со случайным разбросом, чтобы повторы не шли волной
+            delay = bot_settings.API_RETRY_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5)
+            attempt += 1
+            logger.warning("Повтор запроса %s %s (%s) через %.2f с", method, path, reason, delay)
+            await asyncio.sleep(delay)
+    
     async def login(self, username: str, password: str) -> Dict[str, Any]:
         """Авторизация в системе"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/auth/login",
-                data={
-                    "username": username,
-                    "password": password
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
+        response = await self._request(
+            "POST",
+            "/auth/login",
+            idempotent=False,
+            authorized=False,
+            data={
+                "username": username,
+                "password": password
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        return response.json()
+    
+    async def refresh(self) -> None:
+        """Новая пара токенов по refresh токену; при отказе API токены сбрасываются"""
+        try:
+            response = await self._request(
+                "POST",
+                "/auth/refresh",
+                idempotent=False,
+                authorized=False,
+                params={"refresh_token": self.refresh_token},
+                headers={"Content-Type": "application/json"}
             )
-            response.raise_for_status()
-            return response.json()
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code == 401:
+                # Refresh токен истек или пользователь деактивирован: нужен новый вход
+                self.clear_token()
+                if self.on_token_refresh:
+                    await self.on_token_refresh(self)
+            raise
+        data = response.json()
+        self.set_token(data["access_token"], data.get("refresh_token"))
+        if self.on_token_refresh:
+            await self.on_token_refresh(self)
     
     async def get_companies(
         self,
         skip: int = 0,
         limit: int = 10,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        fields: Optional[str] = COMPANY_LIST_FIELDS
     ) -> Dict[str, Any]:
         """Получение списка компаний"""
         params = {"skip": skip, "limit": limit}
+        if fields:
+            params["fields"] = fields
         if search:
             params["search"] = search
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/companies/",
-                params=params,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("GET", "/companies/", params=params)
+        return response.json()
     
     async def get_company(self, company_id: int) -> Dict[str, Any]:
         """Получение компании по ID"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/companies/{company_id}",
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("GET", f"/companies/{company_id}")
+        return response.json()
     
     async def get_contacts(
         self,
         skip: int = 0,
         limit: int = 10,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        fields: Optional[str] = CONTACT_LIST_FIELDS
     ) -> Dict[str, Any]:
         """Получение списка контактов"""
         params = {"skip": skip, "limit": limit}
+        if fields:
+            params["fields"] = fields
         if search:
             params["search"] = search
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/contacts/",
-                params=params,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("GET", "/contacts/", params=params)
+        return response.json()
     
     async def get_contact(self, contact_id: int) -> Dict[str, Any]:
         """Получение контакта по ID"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/contacts/{contact_id}",
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("GET", f"/contacts/{contact_id}")
+        return response.json()
     
     async def get_deals(
         self,
         skip: int = 0,
         limit: int = 10,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        fields: Optional[str] = DEAL_LIST_FIELDS
     ) -> Dict[str, Any]:
         """Получение списка сделок"""
         params = {"skip": skip, "limit": limit}
+        if fields:
+            params["fields"] = fields
         if status:
             params["status"] = status
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/deals/",
-                params=params,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("GET", "/deals/", params=params)
+        return response.json()
+    
+    async def get_deal_pipeline(self, top: int = 5) -> Dict[str, Any]:
+        """Воронка сделок: итоги по статусам и валютам и top-N сделок в каждом статусе"""
+        response = await self._request("GET", "/deals/pipeline", params={"top": top})
+        return response.json()
     
     async def get_deal(self, deal_id: int) -> Dict[str, Any]:
         """Получение сделки по ID"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/deals/{deal_id}",
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
-
+        response = await self._request("GET", f"/deals/{deal_id}")
+        return response.json()
+    
+    async def update_deal_status(self, deal_id: int, status: str) -> Dict[str, Any]:
+        """Изменение статуса сделки (повтор с тем же статусом безопасен)"""
+        response = await self._request("PUT", f"/deals/{deal_id}/status", json={"status": status})
+        return response.json()
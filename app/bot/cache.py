@@ -0,0 +1,143 @@
+"""
+Кеш ответов API для одного пользователя бота и предзагрузка следующей страницы
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from telegram.ext import ContextTypes
+
+from app.bot.api_client import APIClient
+from app.bot.config import bot_settings
+
+logger = logging.getLogger(__name__)
+
+# Размер страницы списков бота
+PAGE_SIZE = 10
+
+# Методы APIClient для списков и карточек по разделам бота
+LIST_METHODS = {"companies": "get_companies", "contacts": "get_contacts", "deals": "get_deals"}
+ITEM_METHODS = {"companies": "get_company", "contacts": "get_contact", "deals": "get_deal"}
+
+
+class ResponseCache:
+    """Ограниченный LRU-кеш ответов API с TTL.
+    
+    Одновременные запросы одного ключа (нажатие кнопки во время предзагрузки)
+    ждут один и тот же запрос к API. Ошибки не кешируются.
+    """
+    
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+    
+    def __getstate__(self):
+        # Кеш не сохраняется вместе с user_data: после перезапуска данные все равно устарели
+        return {"ttl": self.ttl, "max_size": self.max_size}
+    
+    def __setstate__(self, state):
+        self.__init__(state["ttl"], state["max_size"])
+    
+    def _get(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+    
+    def _set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def _start(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        async def load():
+            try:
+                value = await fetch()
+                # Ответ, запрошенный до invalidate(), не сохраняется
+                if self._pending.get(key) is task:
+                    self._set(key, value)
+                return value
+            finally:
+                if self._pending.get(key) is task:
+                    del self._pending[key]
+        
+        task = asyncio.get_running_loop().create_task(load())
+        self._pending[key] = task
+        return task
+    
+    async def fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Значение из кеша или результат fetch() (сохраняется на ttl секунд)"""
+        entry = self._get(key)
+        if entry is not None:
+            return entry[1]
+        task = self._pending.get(key) or self._start(key, fetch)
+        # shield: отмена обработчика не отменяет общий запрос
+        return await asyncio.shield(task)
+    
+    def prefetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """Фоновая загрузка значения, если его еще нет в кеше"""
+        if self._get(key) is not None or key in self._pending:
+            return
+        task = self._start(key, fetch)
+        task.add_done_callback(_log_prefetch_error)
+    
+    def invalidate(self, section: str) -> None:
+        """Удаление страниц и карточек раздела (после изменения данных)"""
+        for key in [key for key in self._entries if key[0] == section]:
+            del self._entries[key]
+        for key in [key for key in self._pending if key[0] == section]:
+            del self._pending[key]
+
+
+def _log_prefetch_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Ошибка предзагрузки страницы: %s", task.exception())
+
+
+def get_cache(context: ContextTypes.DEFAULT_TYPE) -> ResponseCache:
+    """Кеш пользователя в context.user_data (очищается вместе с user_data при выходе)"""
+    cache = context.user_data.get("api_cache")
+    if cache is None:
+        cache = ResponseCache(bot_settings.CACHE_TTL_SECONDS, bot_settings.CACHE_MAX_SIZE)
+        context.user_data["api_cache"] = cache
+    return cache
+
+
+async def get_page(
+    context: ContextTypes.DEFAULT_TYPE,
+    api_client: APIClient,
+    section: str,
+    page: int
+) -> Dict[str, Any]:
+    """Страница списка раздела из кеша; следующая страница загружается в фоне"""
+    cache = get_cache(context)
+    method = getattr(api_client, LIST_METHODS[section])
+    
+    def load(number: int):
+        return lambda: method(skip=(number - 1) * PAGE_SIZE, limit=PAGE_SIZE)
+    
+    data = await cache.fetch((section, "page", page), load(page))
+    if page < data.get("pages", 1):
+        cache.prefetch((section, "page", page + 1), load(page + 1))
+    return data
+
+
+async def get_item(
+    context: ContextTypes.DEFAULT_TYPE,
+    api_client: APIClient,
+    section: str,
+    item_id: int
+) -> Dict[str, Any]:
+    """Карточка записи раздела из кеша"""
+    method = getattr(api_client, ITEM_METHODS[section])
+    return await get_cache(context).fetch((section, "item", item_id), lambda: method(item_id))
@@ -17,6 +17,43 @@ class BotSettings:
             raise ValueError("TELEGRAM_BOT_TOKEN не найден в переменных окружения")
         
         self.API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api/v1")
+        
+        # Общий HTTP-клиент к API (app/bot/api_client.py): пул соединений, таймауты (секунды),
+        # повторы с экспоненциальной задержкой; HTTP/2 — если установлен h2 и API за HTTPS
+        self.API_HTTP2 = os.getenv("API_HTTP2", "true").lower() in ("1", "true", "yes")
+        self.API_MAX_CONNECTIONS = int(os.getenv("API_MAX_CONNECTIONS", "100"))
+        self.API_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("API_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.API_KEEPALIVE_EXPIRY = float(os.getenv("API_KEEPALIVE_EXPIRY", "60"))
+        self.API_TIMEOUT = float(os.getenv("API_TIMEOUT", "10"))
+        self.API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "5"))
+        self.API_POOL_TIMEOUT = float(os.getenv("API_POOL_TIMEOUT", "5"))
+        self.API_RETRIES = int(os.getenv("API_RETRIES", "2"))
+        self.API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.2"))
+        
+        # Кеш страниц списков и карточек на пользователя (app/bot/cache.py): TTL (секунды) и размер
+        self.CACHE_TTL_SECONDS = float(os.getenv("BOT_CACHE_TTL_SECONDS", "30"))
+        self.CACHE_MAX_SIZE = int(os.getenv("BOT_CACHE_MAX_SIZE", "50"))
+        
+        # Параллельная обработка обновлений (app/bot/updates.py): обработчиков одновременно
+        # и принятых, но еще не обработанных обновлений; внутри одного чата — по очереди
+        self.MAX_CONCURRENT_UPDATES = int(os.getenv("BOT_MAX_CONCURRENT_UPDATES", "32"))
+        self.MAX_PENDING_UPDATES = int(os.getenv("BOT_MAX_PENDING_UPDATES", "256"))
+        
+        # Режим получения обновлений: polling или webhook (ASGI-приложение app/bot/webhook.py)
+        self.BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+        self.WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+        self.WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+        self.WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+        self.WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+        self.WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8081"))
+        
+        # Сессии пользователей (app/bot/sessions.py): sqlite (по умолчанию) — файл SESSION_DB_PATH
+        # для одного экземпляра бота (процессы на одной машине), redis — общий для экземпляров
+        # на разных машинах; срок жизни — по сроку refresh токена API
+        self.SESSION_BACKEND = os.getenv("BOT_SESSION_BACKEND", "sqlite").lower()
+        self.SESSION_DB_PATH = os.getenv("BOT_SESSION_DB_PATH", "bot_sessions.db")
+        self.SESSION_TTL_DAYS = float(os.getenv("BOT_SESSION_TTL_DAYS", "7"))
+        self.REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
 
 bot_settings = BotSettings()
@@ -2,77 +2,91 @@
 Обработчики авторизации
 """
 from telegram import Update
-from telegram.ext import ContextTypes, ConversationHandler
+from telegram.ext import ApplicationHandlerStop, ContextTypes
 from app.bot.api_client import APIClient
 from app.bot.keyboards import get_main_menu
+from app.bot.sessions import (
+    STATE_EMAIL,
+    STATE_PASSWORD,
+    clear_session,
+    get_session,
+    save_login,
+    save_session,
+)
 
-# Состояния для ConversationHandler
-WAITING_EMAIL, WAITING_PASSWORD = range(2)
 
-
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /start"""
     user = update.effective_user
+    session = get_session(context)
     
     # Проверяем, есть ли уже токен
-    if "api_client" not in context.user_data:
-        context.user_data["api_client"] = APIClient()
-    
-    api_client: APIClient = context.user_data["api_client"]
-    
-    if api_client.token:
+    if session.access_token:
         await update.message.reply_text(
             f"Привет, {user.first_name}! Ты уже авторизован.\n\n"
             "Используй меню для работы с CRM.",
             reply_markup=get_main_menu()
         )
-        return ConversationHandler.END
+        return
+    
+    session.state = STATE_EMAIL
+    await save_session(update, context)
+    await update.message.reply_text(
+        f"Привет, {user.first_name}! 👋\n\n"
+        "Для работы с CRM системой нужно авторизоваться.\n\n"
+        "Введи свой email:"
+    )
+
+
+async def handle_login_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Ввод email и пароля: шаг диалога входа хранится в сессии.
+    
+    Вне диалога входа сообщение передается следующим обработчикам (меню).
+    """
+    state = get_session(context).state
+    if state == STATE_EMAIL:
+        await handle_email(update, context)
+    elif state == STATE_PASSWORD:
+        await handle_password(update, context)
     else:
-        await update.message.reply_text(
-            f"Привет, {user.first_name}! 👋\n\n"
-            "Для работы с CRM системой нужно авторизоваться.\n\n"
-            "Введи свой email:"
-        )
-        return WAITING_EMAIL
+        return
+    raise ApplicationHandlerStop
 
 
-async def handle_email(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def handle_email(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик ввода email"""
-    email = update.message.text.strip()
-    context.user_data["email"] = email
+    session = get_session(context)
+    session.email = update.message.text.strip()
+    session.state = STATE_PASSWORD
+    await save_session(update, context)
     
     await update.message.reply_text(
         "Теперь введи пароль:"
     )
-    return WAITING_PASSWORD
 
 
-async def handle_password(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def handle_password(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик ввода пароля и авторизации"""
     password = update.message.text
-    email = context.user_data.get("email")
-    
-    api_client: APIClient = context.user_data.get("api_client", APIClient())
+    session = get_session(context)
     
     try:
-        response = await api_client.login(email, password)
+        response = await APIClient().login(session.email, password)
         token = response.get("access_token")
         
         if token:
-            api_client.set_token(token)
-            context.user_data["api_client"] = api_client
+            await save_login(update, context, token, response.get("refresh_token"))
             await update.message.reply_text(
                 "✅ Авторизация успешна!\n\n"
                 "Теперь ты можешь работать с CRM системой.",
                 reply_markup=get_main_menu()
             )
-            return ConversationHandler.END
+            return
         else:
             await update.message.reply_text(
                 "❌ Ошибка авторизации. Попробуй снова.\n\n"
                 "Введи email:"
             )
-            return WAITING_EMAIL
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Неверный" in error_msg:
@@ -85,16 +99,13 @@ async def handle_password(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 f"❌ Ошибка при авторизации: {error_msg}\n\n"
                 "Попробуй снова. Введи email:"
             )
-        return WAITING_EMAIL
+    session.state = STATE_EMAIL
+    await save_session(update, context)
 
 
 async def logout(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик выхода из системы"""
-    if "api_client" in context.user_data:
-        api_client: APIClient = context.user_data["api_client"]
-        api_client.clear_token()
-    
-    context.user_data.clear()
+    await clear_session(update, context)
     
     await update.message.reply_text(
         "👋 Ты вышел из системы.\n\n"
@@ -102,10 +113,14 @@ async def logout(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
-async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Отмена авторизации"""
+    session = get_session(context)
+    if not session.state:
+        return
+    session.state = None
+    session.email = None
+    await save_session(update, context)
     await update.message.reply_text(
         "Авторизация отменена. Используй /start для начала."
     )
-    return ConversationHandler.END
-
@@ -3,28 +3,29 @@
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from app.bot.api_client import APIClient
+from app.bot.cache import get_item, get_page
 from app.bot.keyboards import get_list_keyboard, get_pagination_keyboard
+from app.bot.sessions import get_api_client
 
 
 async def show_companies(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Показать список компаний"""
-    api_client: APIClient = context.user_data.get("api_client")
+    api_client = get_api_client(update, context)
     
-    if not api_client or not api_client.token:
-        await update.message.reply_text(
+    if not api_client.token:
+        await update.effective_message.reply_text(
             "❌ Ты не авторизован. Используй /start для авторизации."
         )
         return
     
     try:
-        data = await api_client.get_companies(skip=0, limit=10)
+        data = await get_page(context, api_client, "companies", 1)
         companies = data.get("items", [])
         total = data.get("total", 0)
         pages = data.get("pages", 1)
         
         if not companies:
-            await update.message.reply_text("📭 Компаний не найдено.")
+            await update.effective_message.reply_text("📭 Компаний не найдено.")
             return
         
         # Формируем сообщение
@@ -37,13 +38,13 @@ async def show_companies(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Клавиатура
         keyboard = get_list_keyboard(companies, 1, pages, "company")
         
-        await update.message.reply_text(
+        await update.effective_message.reply_text(
             message,
             parse_mode="HTML",
             reply_markup=keyboard
         )
     except Exception as e:
-        await update.message.reply_text(
+        await update.effective_message.reply_text(
             f"❌ Ошибка при получении компаний: {str(e)}"
         )
 
@@ -54,9 +55,9 @@ async def handle_company_callback(update: Update, context: ContextTypes.DEFAULT_
     await query.answer()
     
     data = query.data
-    api_client: APIClient = context.user_data.get("api_client")
+    api_client = get_api_client(update, context)
     
-    if not api_client or not api_client.token:
+    if not api_client.token:
         await query.edit_message_text(
             "❌ Ты не авторизован. Используй /start для авторизации."
         )
@@ -66,7 +67,7 @@ async def handle_company_callback(update: Update, context: ContextTypes.DEFAULT_
         # Показать детали компании
         company_id = int(data.split("_")[-1])
         try:
-            company = await api_client.get_company(company_id)
+            company = await get_item(context, api_client, "companies", company_id)
             
             message = f"🏢 <b>{company.get('name', 'Без названия')}</b>\n\n"
             if company.get("legal_name"):
@@ -99,7 +100,7 @@ async def handle_company_callback(update: Update, context: ContextTypes.DEFAULT_
         # Пагинация
         page = int(data.split("_")[-1])
         try:
-            data = await api_client.get_companies(skip=(page - 1) * 10, limit=10)
+            data = await get_page(context, api_client, "companies", page)
             companies = data.get("items", [])
             total = data.get("total", 0)
             pages = data.get("pages", 1)
@@ -3,28 +3,29 @@
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from app.bot.api_client import APIClient
+from app.bot.cache import get_item, get_page
 from app.bot.keyboards import get_list_keyboard
+from app.bot.sessions import get_api_client
 
 
 async def show_contacts(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Показать список контактов"""
-    api_client: APIClient = context.user_data.get("api_client")
+    api_client = get_api_client(update, context)
     
-    if not api_client or not api_client.token:
-        await update.message.reply_text(
+    if not api_client.token:
+        await update.effective_message.reply_text(
             "❌ Ты не авторизован. Используй /start для авторизации."
         )
         return
     
     try:
-        data = await api_client.get_contacts(skip=0, limit=10)
+        data = await get_page(context, api_client, "contacts", 1)
         contacts = data.get("items", [])
         total = data.get("total", 0)
         pages = data.get("pages", 1)
         
         if not contacts:
-            await update.message.reply_text("📭 Контактов не найдено.")
+            await update.effective_message.reply_text("📭 Контактов не найдено.")
             return
         
         # Формируем сообщение
@@ -42,13 +43,13 @@ async def show_contacts(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Клавиатура
         keyboard = get_list_keyboard(contacts, 1, pages, "contact")
         
-        await update.message.reply_text(
+        await update.effective_message.reply_text(
             message,
             parse_mode="HTML",
             reply_markup=keyboard
         )
     except Exception as e:
-        await update.message.reply_text(
+        await update.effective_message.reply_text(
             f"❌ Ошибка при получении контактов: {str(e)}"
         )
 
@@ -59,9 +60,9 @@ async def handle_contact_callback(update: Update, context: ContextTypes.DEFAULT_
     await query.answer()
     
     data = query.data
-    api_client: APIClient = context.user_data.get("api_client")
+    api_client = get_api_client(update, context)
     
-    if not api_client or not api_client.token:
+    if not api_client.token:
         await query.edit_message_text(
             "❌ Ты не авторизован. Используй /start для авторизации."
         )
@@ -71,7 +72,7 @@ async def handle_contact_callback(update: Update, context: ContextTypes.DEFAULT_
         # Показать детали контакта
         contact_id = int(data.split("_")[-1])
         try:
-            contact = await api_client.get_contact(contact_id)
+            contact = await get_item(context, api_client, "contacts", contact_id)
             
             first_name = contact.get("first_name", "")
             last_name = contact.get("last_name", "")
@@ -106,7 +107,7 @@ async def handle_contact_callback(update: Update, context: ContextTypes.DEFAULT_
         # Пагинация
         page = int(data.split("_")[-1])
         try:
-            data = await api_client.get_contacts(skip=(page - 1) * 10, limit=10)
+            data = await get_page(context, api_client, "contacts", page)
             contacts = data.get("items", [])
             total = data.get("total", 0)
             pages = data.get("pages", 1)
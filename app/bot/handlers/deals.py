@@ -1,24 +1,26 @@
 """
 Обработчики для работы со сделками
 """
+import httpx
 from telegram import Update
 from telegram.ext import ContextTypes
-from app.bot.api_client import APIClient
+from app.bot.cache import get_cache, get_item, get_page
 from app.bot.keyboards import get_list_keyboard, get_deal_status_keyboard
+from app.bot.sessions import get_api_client
 
 
 async def show_deals(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Показать список сделок"""
-    api_client: APIClient = context.user_data.get("api_client")
+    api_client = get_api_client(update, context)
     
-    if not api_client or not api_client.token:
+    if not api_client.token:
         await update.message.reply_text(
             "❌ Ты не авторизован. Используй /start для авторизации."
         )
         return
     
     try:
-        data = await api_client.get_deals(skip=0, limit=10)
+        data = await get_page(context, api_client, "deals", 1)
         deals = data.get("items", [])
         total = data.get("total", 0)
         pages = data.get("pages", 1)
@@ -57,9 +59,9 @@ async def handle_deal_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         return
     
     data = query.data
-    api_client: APIClient = context.user_data.get("api_client")
+    api_client = get_api_client(update, context)
     
-    if not api_client or not api_client.token:
+    if not api_client.token:
         await query.edit_message_text(
             "❌ Ты не авторизован. Используй /start для авторизации."
         )
@@ -69,7 +71,7 @@ async def handle_deal_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         # Показать детали сделки
         deal_id = int(data.split("_")[-1])
         try:
-            deal = await api_client.get_deal(deal_id)
+            deal = await get_item(context, api_client, "deals", deal_id)
             
             message = f"💼 <b>{deal.get('title', 'Без названия')}</b>\n\n"
             if deal.get("description"):
@@ -106,7 +108,7 @@ async def handle_deal_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         # Вернуться к деталям сделки
         deal_id = int(data.split("_")[-1])
         try:
-            deal = await api_client.get_deal(deal_id)
+            deal = await get_item(context, api_client, "deals", deal_id)
             
             message = f"💼 <b>{deal.get('title', 'Без названия')}</b>\n\n"
             if deal.get("description"):
@@ -151,17 +153,12 @@ async def handle_deal_callback(update: Update, context: ContextTypes.DEFAULT_TYP
             await query.answer("Изменение статуса...")
             
             # Изменяем статус через API
-            import httpx
-            async with httpx.AsyncClient() as client:
-                response = await client.put(
-                    f"{api_client.base_url}/deals/{deal_id}/status",
-                    json={"status": status},
-                    headers=api_client._get_headers()
-                )
-                response.raise_for_status()
+            await api_client.update_deal_status(deal_id, status)
+            # Закешированные списки и карточка сделки устарели
+            get_cache(context).invalidate("deals")
             
             # Получаем обновленную сделку для показа
-            deal = await api_client.get_deal(deal_id)
+            deal = await get_item(context, api_client, "deals", deal_id)
             
             # Формируем сообщение с обновленным статусом
             message = f"✅ Статус изменен на: <b>{status}</b>\n\n"
@@ -224,7 +221,7 @@ async def handle_deal_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         # Пагинация
         page = int(data.split("_")[-1])
         try:
-            data = await api_client.get_deals(skip=(page - 1) * 10, limit=10)
+            data = await get_page(context, api_client, "deals", page)
             deals = data.get("items", [])
             total = data.get("total", 0)
             pages = data.get("pages", 1)
@@ -255,7 +252,7 @@ async def handle_deal_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     elif data == "deal_back":
         # Вернуться к списку сделок
         try:
-            deals_data = await api_client.get_deals(skip=0, limit=10)
+            deals_data = await get_page(context, api_client, "deals", 1)
             deals = deals_data.get("items", [])
             total = deals_data.get("total", 0)
             pages = deals_data.get("pages", 1)
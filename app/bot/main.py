@@ -3,30 +3,32 @@
 """
 import asyncio
 import logging
+import uvicorn
 from telegram import Update
 from telegram.ext import (
     Application,
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
-    ConversationHandler,
+    TypeHandler,
     filters
 )
 
+from app.bot.api_client import close_http_client
 from app.bot.config import bot_settings
 from app.bot.handlers.auth import (
     start,
-    handle_email,
-    handle_password,
+    handle_login_input,
     logout,
-    cancel,
-    WAITING_EMAIL,
-    WAITING_PASSWORD
+    cancel
 )
 from app.bot.handlers.companies import show_companies, handle_company_callback
 from app.bot.handlers.contacts import show_contacts, handle_contact_callback
 from app.bot.handlers.deals import show_deals, handle_deal_callback
 from app.bot.keyboards import get_main_menu
+from app.bot.sessions import load_session, session_store
+from app.bot.updates import PerChatUpdateProcessor
+from app.bot.webhook import create_webhook_app
 
 # Настройка логирования
 logging.basicConfig(
@@ -39,18 +41,18 @@ logger = logging.getLogger(__name__)
 def setup_handlers(application: Application):
     """Настройка обработчиков"""
     
-    # ConversationHandler для авторизации
-    auth_handler = ConversationHandler(
-        entry_points=[CommandHandler("start", start)],
-        states={
-            WAITING_EMAIL: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_email)],
-            WAITING_PASSWORD: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_password)],
-        },
-        fallbacks=[CommandHandler("cancel", cancel)],
+    # Сессия пользователя из общего хранилища — до всех обработчиков
+    application.add_handler(TypeHandler(Update, load_session), group=-2)
+    
+    # Ввод email и пароля (шаг диалога входа — в сессии, а не в памяти процесса)
+    application.add_handler(
+        MessageHandler(filters.TEXT & ~filters.COMMAND, handle_login_input),
+        group=-1
     )
     
     # Обработчики команд
-    application.add_handler(auth_handler)
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("cancel", cancel))
     application.add_handler(CommandHandler("logout", logout))
     
     # Обработчики кнопок главного меню
@@ -79,13 +81,56 @@ def setup_handlers(application: Application):
     ))
 
 
-def main():
-    """Запуск бота"""
-    # Создание приложения
-    application = Application.builder().token(bot_settings.TELEGRAM_BOT_TOKEN).build()
+async def on_shutdown(application: Application):
+    """Закрытие общего HTTP-клиента к API и хранилища сессий при остановке бота"""
+    await close_http_client()
+    await session_store.close()
+
+
+def build_application(webhook: bool = False) -> Application:
+    """Приложение бота с параллельной обработкой обновлений разных чатов"""
+    builder = (
+        Application.builder()
+        .token(bot_settings.TELEGRAM_BOT_TOKEN)
+        .concurrent_updates(PerChatUpdateProcessor(
+            bot_settings.MAX_CONCURRENT_UPDATES,
+            bot_settings.MAX_PENDING_UPDATES,
+        ))
+        .post_shutdown(on_shutdown)
+    )
+    if webhook:
+        # Обновления приходят в ASGI-приложение, Updater (long polling) не нужен
+        builder = builder.updater(None)
+    application = builder.build()
     
     # Настройка обработчиков
     setup_handlers(application)
+    return application
+
+
+def run_webhook():
+    """Запуск бота в webhook-режиме: ASGI-приложение под uvicorn"""
+    if not bot_settings.WEBHOOK_URL or not bot_settings.WEBHOOK_SECRET:
+        raise ValueError("Для BOT_MODE=webhook нужны WEBHOOK_URL и WEBHOOK_SECRET")
+    
+    application = build_application(webhook=True)
+    app = create_webhook_app(
+        application,
+        secret_token=bot_settings.WEBHOOK_SECRET,
+        path=bot_settings.WEBHOOK_PATH,
+        webhook_url=bot_settings.WEBHOOK_URL.rstrip("/") + bot_settings.WEBHOOK_PATH,
+    )
+    logger.info("Бот запущен (webhook, порт %s)", bot_settings.WEBHOOK_PORT)
+    uvicorn.run(app, host=bot_settings.WEBHOOK_HOST, port=bot_settings.WEBHOOK_PORT)
+
+
+def main():
+    """Запуск бота"""
+    if bot_settings.BOT_MODE == "webhook":
+        run_webhook()
+        return
+    
+    application = build_application()
     
     # Запуск бота
     logger.info("Бот запущен")
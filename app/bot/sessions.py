@@ -0,0 +1,203 @@
+"""
+Сессии пользователей бота: токены API и шаг диалога входа.
+
+Сессия читается из хранилища в начале обработки каждого обновления и
+записывается при изменении, поэтому пользователя может обслуживать любой
+процесс бота, а перезапуск не разлогинивает пользователей.
+
+Бэкенды: redis (общий для всех процессов бота) и sqlite (файл; локальный
+запуск, в том числе нескольких процессов на одной машине).
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import redis.asyncio as redis
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from app.bot.api_client import APIClient
+from app.bot.config import bot_settings
+
+# Шаги диалога входа
+STATE_EMAIL = "email"
+STATE_PASSWORD = "password"
+
+
+@dataclass
+class Session:
+    """Сессия пользователя бота"""
+    access_token: Optional[str] = None
+    refresh_token: Optional[str] = None
+    # Шаг диалога входа (STATE_EMAIL, STATE_PASSWORD) и введенный email
+    state: Optional[str] = None
+    email: Optional[str] = None
+    # Новый при каждом входе: процесс со старым login_id сбрасывает кеш ответов API
+    login_id: Optional[str] = None
+    
+    def dumps(self) -> str:
+        return json.dumps(asdict(self))
+    
+    @classmethod
+    def loads(cls, data) -> "Session":
+        return cls(**json.loads(data))
+
+
+class SQLiteSessionStore:
+    """Сессии в файле SQLite: запросы выполняются в потоке, чтобы не блокировать цикл событий"""
+    
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            # timeout — ожидание блокировки файла другим процессом бота
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS bot_sessions ("
+                "user_id INTEGER PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+    
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(sql, params).fetchone()
+            connection.commit()
+            return row
+    
+    async def get(self, user_id: int) -> Optional[Session]:
+        row = await asyncio.to_thread(
+            self._execute,
+            "SELECT data FROM bot_sessions WHERE user_id = ? AND updated_at >= ?",
+            (user_id, time.time() - self.ttl),
+        )
+        return Session.loads(row[0]) if row else None
+    
+    async def save(self, user_id: int, session: Session) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO bot_sessions (user_id, data, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+            (user_id, session.dumps(), time.time()),
+        )
+    
+    async def delete(self, user_id: int) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM bot_sessions WHERE user_id = ?", (user_id,))
+    
+    async def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class RedisSessionStore:
+    """Сессии в Redis: ключ bot:session:<user_id> со сроком жизни ttl"""
+    
+    def __init__(self, url: str, ttl: float):
+        self._redis = redis.from_url(url)
+        self.ttl = int(ttl)
+    
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"bot:session:{user_id}"
+    
+    async def get(self, user_id: int) -> Optional[Session]:
+        data = await self._redis.get(self._key(user_id))
+        return Session.loads(data) if data is not None else None
+    
+    async def save(self, user_id: int, session: Session) -> None:
+        await self._redis.set(self._key(user_id), session.dumps(), ex=self.ttl)
+    
+    async def delete(self, user_id: int) -> None:
+        await self._redis.delete(self._key(user_id))
+    
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def _create_store():
+    ttl = bot_settings.SESSION_TTL_DAYS * 86400
+    if bot_settings.SESSION_BACKEND == "redis":
+        return RedisSessionStore(bot_settings.REDIS_URL, ttl)
+    return SQLiteSessionStore(bot_settings.SESSION_DB_PATH, ttl)
+
+
+session_store = _create_store()
+
+
+async def load_session(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Загрузка сессии пользователя перед обработчиками (группа -2 в main.py)"""
+    if update.effective_user is None:
+        return
+    session = await session_store.get(update.effective_user.id) or Session()
+    if context.user_data.get("api_cache_login") != session.login_id:
+        # Вход или выход был в другом процессе: кеш ответов API этого процесса устарел
+        context.user_data.pop("api_cache", None)
+        context.user_data["api_cache_login"] = session.login_id
+    context.user_data["session"] = session
+
+
+def get_session(context: ContextTypes.DEFAULT_TYPE) -> Session:
+    """Сессия, загруженная для текущего обновления"""
+    session = context.user_data.get("session")
+    if session is None:
+        session = context.user_data["session"] = Session()
+    return session
+
+
+async def save_session(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Запись измененной сессии в хранилище"""
+    await session_store.save(update.effective_user.id, get_session(context))
+
+
+async def save_login(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    access_token: str,
+    refresh_token: Optional[str]
+) -> None:
+    """Сохранение токенов после успешного входа"""
+    session = get_session(context)
+    session.access_token = access_token
+    session.refresh_token = refresh_token
+    session.state = None
+    session.email = None
+    session.login_id = uuid.uuid4().hex
+    context.user_data.pop("api_cache", None)
+    context.user_data["api_cache_login"] = session.login_id
+    await save_session(update, context)
+
+
+async def clear_session(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Выход: удаление сессии из хранилища и данных пользователя в процессе"""
+    await session_store.delete(update.effective_user.id)
+    context.user_data.clear()
+
+
+def get_api_client(update: Update, context: ContextTypes.DEFAULT_TYPE) -> APIClient:
+    """APIClient с токенами сессии; обновленные через /auth/refresh токены сохраняются"""
+    session = get_session(context)
+    api_client = APIClient()
+    if session.access_token:
+        api_client.set_token(session.access_token, session.refresh_token)
+    
+    async def on_token_refresh(client: APIClient) -> None:
+        session.access_token = client.token
+        session.refresh_token = client.refresh_token
+        await save_session(update, context)
+    
+    api_client.on_token_refresh = on_token_refresh
+    return api_client
@@ -0,0 +1,82 @@
+"""
+Параллельная обработка обновлений бота с сохранением порядка внутри чата
+"""
+import asyncio
+from typing import Any, Awaitable, Dict, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+def update_key(update: object) -> Optional[Hashable]:
+    """Ключ очереди обновления: чат, а без чата (inline-запросы) — пользователь"""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat is not None:
+        return ("chat", update.effective_chat.id)
+    if update.effective_user is not None:
+        return ("user", update.effective_user.id)
+    return None
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Обработчик обновлений: разные чаты параллельно, один чат — строго по очереди.
+    
+    Одновременно выполняются не больше max_running_updates обработчиков, поэтому
+    медленный запрос к API одного пользователя не задерживает кнопки остальных.
+    Обновления, ждущие очереди своего чата, слот обработчика не занимают; всего
+    принятых и еще не обработанных обновлений не больше max_pending_updates
+    (max_concurrent_updates базового класса).
+    """
+    
+    def __init__(self, max_running_updates: int, max_pending_updates: Optional[int] = None):
+        if max_running_updates < 1:
+            raise ValueError("max_running_updates должно быть положительным")
+        super().__init__(max(max_pending_updates or 4 * max_running_updates, max_running_updates))
+        self._max_running_updates = max_running_updates
+        self._running = asyncio.Semaphore(max_running_updates)
+        self._active = 0
+        # Ключ чата → [замок, число обновлений чата в обработке или в очереди]
+        self._chats: Dict[Hashable, list] = {}
+    
+    @property
+    def max_running_updates(self) -> int:
+        """Сколько обработчиков выполняется одновременно"""
+        return self._max_running_updates
+    
+    @property
+    def current_running_updates(self) -> int:
+        return self._active
+    
+    async def _run(self, coroutine: Awaitable[Any]) -> None:
+        async with self._running:
+            self._active += 1
+            try:
+                await coroutine
+            finally:
+                self._active -= 1
+    
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = update_key(update)
+        if key is None:
+            await self._run(coroutine)
+            return
+        
+        chat = self._chats.get(key)
+        if chat is None:
+            chat = self._chats[key] = [asyncio.Lock(), 0]
+        chat[1] += 1
+        try:
+            # asyncio.Lock будит ожидающих в порядке очереди — порядке получения обновлений
+            async with chat[0]:
+                await self._run(coroutine)
+        finally:
+            chat[1] -= 1
+            if not chat[1]:
+                del self._chats[key]
+    
+    async def initialize(self) -> None:
+        pass
+    
+    async def shutdown(self) -> None:
+        pass
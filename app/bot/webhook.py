@@ -0,0 +1,81 @@
+"""
+Webhook-режим бота: ASGI-приложение, принимающее обновления от Telegram
+"""
+import logging
+import secrets
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from telegram import Update
+from telegram.ext import Application
+
+logger = logging.getLogger(__name__)
+
+# Заголовок, в котором Telegram передает secret_token из setWebhook
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def create_webhook_app(
+    application: Application,
+    secret_token: str,
+    path: str = "/telegram",
+    webhook_url: Optional[str] = None
+) -> Starlette:
+    """ASGI-приложение webhook-режима.
+    
+    Обновление кладется в очередь application и сразу подтверждается ответом 200:
+    обработку выполняет update processor приложения, а не запрос Telegram.
+    При старте регистрирует webhook_url в Telegram (если передан).
+    """
+    
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        # Те же этапы и хуки post_init/post_stop/post_shutdown, что у Application.run_polling
+        await application.initialize()
+        try:
+            if application.post_init:
+                await application.post_init(application)
+            if webhook_url:
+                await application.bot.set_webhook(
+                    url=webhook_url,
+                    secret_token=secret_token,
+                    allowed_updates=Update.ALL_TYPES,
+                )
+                logger.info("Webhook зарегистрирован: %s", webhook_url)
+            await application.start()
+            try:
+                yield
+            finally:
+                await application.stop()
+                if application.post_stop:
+                    await application.post_stop(application)
+        finally:
+            await application.shutdown()
+            if application.post_shutdown:
+                await application.post_shutdown(application)
+    
+    async def telegram_update(request: Request) -> Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not secrets.compare_digest(token.encode(), secret_token.encode()):
+            return Response(status_code=403)
+        try:
+            data = await request.json()
+        except ValueError:
+            return Response(status_code=400)
+        await application.update_queue.put(Update.de_json(data, application.bot))
+        return Response()
+    
+    async def health(request: Request) -> Response:
+        return JSONResponse({"status": "ok", "pending_updates": application.update_queue.qsize()})
+    
+    return Starlette(
+        routes=[
+            Route(path, telegram_update, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
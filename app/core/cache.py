@@ -0,0 +1,65 @@
+"""
+In-process кеши
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """LRU-кеш ограниченного размера с временем жизни записей.
+    
+    Рассчитан на использование из event loop: операции не содержат await,
+    поэтому блокировки не нужны.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Значение из кеша или None"""
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self._timer():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return None
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохранение значения с вытеснением самых старых записей"""
+        self._data[key] = (self._timer() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def invalidate(self, key: Hashable) -> None:
+        """Удаление записи"""
+        self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Очистка кеша"""
+        self._data.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -11,6 +11,7 @@ celery_app = Celery(
     backend=settings.CELERY_RESULT_BACKEND,
     include=[
         "app.tasks.email",
+        "app.tasks.cleanup",
         "app.tasks.import_export",
         "app.tasks.reports",
         "app.tasks.notifications"
@@ -39,7 +40,15 @@ celery_app.conf.beat_schedule = {
     },
     "send-reminders": {
         "task": "app.tasks.notifications.send_reminders",
-        "schedule": 300.0,  # Каждые 5 минут
+        "schedule": float(settings.REMINDER_INTERVAL_SECONDS),  # REMINDER_INTERVAL_SECONDS (по умолчанию 5 минут)
+    },
+    "cleanup-soft-deleted-records": {
+        "task": "app.tasks.cleanup.cleanup_soft_deleted_records",
+        "schedule": 86400.0,  # Каждый день
+    },
+    "cleanup-old-files": {
+        "task": "app.tasks.cleanup.cleanup_old_files",
+        "schedule": 86400.0,  # Каждый день
     },
     "generate-daily-reports": {
         "task": "app.tasks.reports.generate_daily_reports",
@@ -22,10 +22,76 @@ class Settings(BaseSettings):
     # База данных
     DATABASE_URL: str
     DATABASE_URL_ASYNC: str
+    # Реплики для чтения (через запятую); GET-запросы читают с них round-robin
+    DATABASE_URL_ASYNC_REPLICAS: str = ""
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 10.0  # секунды
+    
+    # Пул соединений асинхронного движка (PostgreSQL)
+    DB_ECHO: bool = False  # логирование SQL, не зависит от DEBUG
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # секунды, -1 — без пересоздания
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # кеш подготовленных выражений asyncpg, 0 — выключен
+    
+    # Списки: порог, ниже которого оценка total заменяется точным подсчетом
+    LIST_COUNT_ESTIMATE_THRESHOLD: int = 10000
+    
+    # Поиск: trigram (pg_trgm, ранжирование в PostgreSQL) или ilike
+    SEARCH_BACKEND: str = "trigram"
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Кеш ответов GET списков и карточек: redis (общий для воркеров) или memory — только для
+    # одного процесса: сброс версии при записи виден лишь процессу, обработавшему запись
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_BACKEND: str = "redis"
+    RESPONSE_CACHE_TTL: int = 60  # секунды
+    RESPONSE_CACHE_MAX_SIZE: int = 10000  # записей для memory
+    
+    # Быстрый путь ответов списков/карточек: dict из ORM-объектов + orjson без валидации Pydantic
+    FAST_JSON_RESPONSES: bool = False
+    
+    # Потоковая выгрузка (/export): строк за одну выборку из серверного курсора
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # Импорт CSV: строк в одной пачке валидации/записи и максимум ошибок в отчете
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 1000
+    
+    # Пакетные операции (POST /{entity}/bulk): максимум операций и размер транзакции без atomic
+    BULK_MAX_OPERATIONS: int = 1000
+    BULK_CHUNK_SIZE: int = 200
+    
+    # Напоминания об активностях: очередь отложенных напоминаний redis (ZSET, общая для API и
+    # воркеров Celery) или memory (куча в процессе; только для тестов — API и воркер ее не делят)
+    REMINDER_QUEUE_BACKEND: str = "redis"
+    REMINDER_INTERVAL_SECONDS: int = 300  # период задачи send_reminders
+    REMINDER_LOOKAHEAD_SECONDS: int = 900  # насколько вперед сканируются активности
+    REMINDER_ADVANCE_MINUTES: int = 15  # за сколько минут до scheduled_at/due_date напоминать
+    REMINDER_GRACE_SECONDS: int = 3600  # просроченные напоминания, которые еще отправляются
+    
+    # Очистка мягко удаленных записей (cleanup_soft_deleted_records): срок хранения, размер
+    # пакета (одна короткая транзакция), ограничение скорости и времени работы одного запуска
+    PURGE_RETENTION_DAYS: int = 30
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_MAX_ROWS_PER_SECOND: int = 2000
+    PURGE_LOCK_TIMEOUT_MS: int = 1000  # ожидание блокировки пакетом (PostgreSQL), затем пропуск
+    PURGE_MAX_RUNTIME_SECONDS: int = 20 * 60
+    EXPORT_RETENTION_DAYS: int = 7  # выгрузки в UPLOAD_ROOT/exports (cleanup_old_files)
+    
+    # Логи фронтенда (POST /frontend-logs): ограниченная очередь в процессе, которую пачками
+    # разбирает фоновая запись; лимит записей в секунду на клиента (пользователь или IP)
+    FRONTEND_LOG_MAX_BATCH: int = 100  # записей в одном запросе
+    FRONTEND_LOG_QUEUE_SIZE: int = 10000
+    FRONTEND_LOG_WRITE_BATCH: int = 500  # записей за один проход фоновой записи
+    FRONTEND_LOG_RATE_PER_SECOND: float = 20.0
+    FRONTEND_LOG_BURST: int = 200  # запас записей клиента сверх скорости
+    FRONTEND_LOG_INFO_SAMPLE_RATE: float = 1.0  # доля сохраняемых info/debug (warn и error — все)
+    FRONTEND_LOG_MAX_CLIENTS: int = 10000  # клиентов в таблице лимитов (LRU)
+    
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
@@ -35,6 +101,17 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     ALGORITHM: str = "HS256"
     
+    # Пул потоков для bcrypt (хеширование и проверка паролей)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # ожидающих операций сверх PASSWORD_HASH_WORKERS
+    
+    # Токен доступа к GET /metrics (Authorization: Bearer ...); пустой — эндпоинт выключен
+    METRICS_TOKEN: str = ""
+    
+    # Кеш аутентифицированных пользователей (get_current_user)
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    
     # Файловое хранилище
     STORAGE_TYPE: str = "local"  # local, s3, minio
     UPLOAD_ROOT: str = "uploads"
@@ -1,11 +1,71 @@
 """
 Настройка базы данных
 """
-from sqlalchemy import create_engine, text
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import asyncio
+import itertools
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import structlog
+from fastapi import Request
+from sqlalchemy import JSON, Index, create_engine, event, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.metrics import Histogram
+
+logger = structlog.get_logger()
+
+# Время ожидания соединения из пула по имени пула и время жизни сессии запроса
+pool_checkout_wait: Dict[str, Histogram] = {}
+session_duration = Histogram()
+_active_sessions = 0
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, замеряющий ожидание свободного соединения"""
+    
+    def _do_get(self):
+        histogram = pool_checkout_wait.setdefault(
+            self._orig_logging_name or "default", Histogram()
+        )
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+
+def async_engine_options(url: str, pool_name: str) -> Dict[str, Any]:
+    """Параметры create_async_engine из настроек"""
+    options: Dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "future": True,
+    }
+    if url.startswith("sqlite"):
+        # SQLite (тесты, локальная разработка) остается на пуле диалекта по умолчанию
+        return options
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_logging_name=pool_name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if url.startswith("postgresql+asyncpg"):
+        # 0 отключает кеш подготовленных выражений (нужно за PgBouncer в transaction mode)
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
 
 # Синхронный движок для миграций
 engine = create_engine(settings.DATABASE_URL)
@@ -13,34 +73,226 @@ engine = create_engine(settings.DATABASE_URL)
 # Асинхронный движок для приложения
 async_engine = create_async_engine(
     settings.DATABASE_URL_ASYNC,
-    echo=settings.DEBUG,
-    future=True
+    **async_engine_options(settings.DATABASE_URL_ASYNC, "primary"),
 )
 
+
+
+class ReplicaSet:
+    """Реплики для чтения: round-robin по репликам, прошедшим проверку здоровья"""
+    
+    def __init__(self, engines: List[AsyncEngine]):
+        self.engines = engines
+        self._healthy = list(engines)
+        self._counter = itertools.count()
+    
+    def choose(self) -> Optional[AsyncEngine]:
+        """Следующая здоровая реплика или None (тогда читаем с primary)"""
+        healthy = self._healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+    
+    async def check(self) -> None:
+        """Проверка доступности реплик через SELECT 1"""
+        healthy = []
+        for replica in self.engines:
+            try:
+                async with replica.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except Exception as exc:
+                logger.warning("Реплика недоступна", replica=replica.url.host, error=str(exc))
+            else:
+                healthy.append(replica)
+        self._healthy = healthy
+    
+    async def run_health_checks(self, interval: float) -> None:
+        """Периодическая проверка реплик (фоновая задача приложения)"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {"healthy": replica in self._healthy, **pool_stats(replica)}
+            for replica in self.engines
+        ]
+    
+    async def dispose(self) -> None:
+        for replica in self.engines:
+            await replica.dispose()
+
+
+def _replica_urls() -> List[str]:
+    return [url.strip() for url in settings.DATABASE_URL_ASYNC_REPLICAS.split(",") if url.strip()]
+
+
+replicas = ReplicaSet([
+    create_async_engine(url, **async_engine_options(url, f"replica{index}"))
+    for index, url in enumerate(_replica_urls())
+])
+
+
+class RoutingSession(Session):
+    """Сессия, направляющая чтения GET-запросов на реплики.
+    
+    На реплику уходят только SELECT (без FOR UPDATE) в сессиях с info["read_only"],
+    пока в сессии не было записи. После первого flush все запросы сессии идут на
+    primary, чтобы запрос видел собственные изменения. Реплика выбирается один раз
+    на сессию, поэтому чтения одного запроса согласованы между собой. Запросы, которые
+    заполняют кеш ответов, снимают read_only (см. ResponseCache.lookup).
+    """
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.info.get("read_only")
+            and not self.info.get("wrote")
+            and not self._flushing
+            and clause is not None
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            if "replica" not in self.info:
+                self.info["replica"] = replicas.choose()
+            replica = self.info["replica"]
+            if replica is not None:
+                return replica.sync_engine
+        return async_engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_to_primary(session, flush_context):
+    session.info["wrote"] = True
+
+
 # Сессии
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 AsyncSessionLocal = sessionmaker(
-    async_engine, class_=AsyncSession, expire_on_commit=False
+    async_engine, class_=AsyncSession, sync_session_class=RoutingSession,
+    expire_on_commit=False
 )
 
 # Базовый класс для моделей
 Base = declarative_base()
 
+# Тип JSON-полей моделей: JSONB в PostgreSQL (GIN-индексы, оператор @>), JSON в остальных БД
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+def owner_list_index(model, *columns) -> Index:
+    """Частичный индекс списков владельца по неудаленным записям.
+    
+    (owner_id, *columns, created_at DESC, id DESC) WHERE is_deleted = false — под запросы
+    сервисов owner_id = ? [AND <колонка> = ?] AND is_deleted = false ORDER BY created_at DESC, id DESC.
+    Условие индекса совпадает с условием запросов, поэтому планировщик может его использовать.
+    """
+    table = model.__tablename__
+    name = "_".join(["ix", table, "owner", *(column.key for column in columns), "active"])
+    active = model.is_deleted == False
+    return Index(
+        name,
+        model.owner_id,
+        *columns,
+        model.created_at.desc(),
+        model.id.desc(),
+        postgresql_where=active,
+        sqlite_where=active,
+    )
+
+
+def purge_index(model) -> Index:
+    """Частичный индекс (id) WHERE is_deleted = true для пакетной очистки удаленных записей.
+    
+    Очистка (app/services/purge_service.py) выбирает удаленные записи пакетами по первичному
+    ключу; индекс содержит только удаленные записи и не растет вместе с живыми данными.
+    """
+    deleted = model.is_deleted == True
+    return Index(
+        f"ix_{model.__tablename__}_purge",
+        model.id,
+        postgresql_where=deleted,
+        sqlite_where=deleted,
+    )
+
+
+def reference_index(column) -> Index:
+    """Частичный индекс внешнего ключа (column) WHERE column IS NOT NULL.
+    
+    Без него удаление родительской записи проверяет ссылки на нее полным просмотром
+    дочерней таблицы (PostgreSQL не индексирует колонки внешних ключей сам).
+    """
+    referenced = column.isnot(None)
+    return Index(
+        f"ix_{column.table.name}_{column.key}_ref",
+        column,
+        postgresql_where=referenced,
+        sqlite_where=referenced,
+    )
+
+
+@event.listens_for(Base, "before_update", propagate=True)
+def _touch_updated_at(mapper, connection, target):
+    """Обновление updated_at при любом изменении записи через ORM"""
+    if "updated_at" in mapper.columns:
+        target.updated_at = datetime.now(timezone.utc)
+
+
+def dialect_name(session: AsyncSession) -> str:
+    """Имя диалекта БД, к которой привязана сессия (postgresql, sqlite, ...)"""
+    return session.get_bind().dialect.name
+
+
+def pool_stats(db_engine: AsyncEngine) -> Dict[str, Any]:
+    """Состояние пула соединений движка: занятые/свободные соединения и ожидание"""
+    pool = db_engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__, "status": pool.status()}
+    histogram = pool_checkout_wait.get(pool._orig_logging_name or "default")
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": pool._max_overflow,
+        "checkout_wait_seconds": histogram.snapshot() if histogram else None,
+    }
+
+
+def database_stats() -> Dict[str, Any]:
+    """Метрики базы данных для /metrics"""
+    return {
+        "primary": pool_stats(async_engine),
+        "replicas": replicas.stats(),
+        "active_sessions": _active_sessions,
+        "session_duration_seconds": session_duration.snapshot(),
+    }
+
 
-async def get_async_session():
-    """Получение асинхронной сессии базы данных"""
+async def get_async_session(request: Request = None):
+    """Получение асинхронной сессии базы данных.
+    
+    Для GET/HEAD-запросов чтения направляются на реплики (если они настроены).
+    """
+    global _active_sessions
+    started = time.perf_counter()
+    _active_sessions += 1
     async with AsyncSessionLocal() as session:
+        if request is not None and request.method in ("GET", "HEAD"):
+            session.info["read_only"] = True
         try:
             yield session
         finally:
             await session.close()
+            _active_sessions -= 1
+            session_duration.observe(time.perf_counter() - started)
 
 
 async def create_tables():
     """Создание таблиц в базе данных"""
     async with async_engine.begin() as conn:
         # Импортируем все модели для создания таблиц
-        from app.models import user, contact, company, deal, activity, file
+        from app.models import user, contact, company, deal, activity, file, stats
         await conn.run_sync(Base.metadata.create_all)
         # create_all не добавляет новые колонки к уже существующим таблицам (типичный Docker volume).
         if settings.DATABASE_URL_ASYNC.startswith("postgresql"):
@@ -0,0 +1,67 @@
+"""
+Условные GET-запросы: слабые ETag и If-None-Match.
+
+ETag карточки строится из id и updated_at записи, ETag списка — из уже выбранной
+страницы (id и updated_at ее элементов, total, has_more, next_cursor) вместе с
+параметрами запроса, без отдельного запроса к БД. При совпадении с If-None-Match
+отдается 304 без сериализации моделей.
+"""
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Request, status
+from fastapi.responses import Response
+
+from app.core.pagination import Page
+
+
+def normalized_query(request: Request) -> str:
+    """Query-параметры без пустых значений в стабильном порядке"""
+    items = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+    return "&".join(f"{k}={v}" for k, v in items)
+
+
+def _timestamp(value: Optional[datetime]) -> str:
+    return value.isoformat() if value is not None else "-"
+
+
+def entity_etag(obj) -> str:
+    """ETag карточки по id и времени последнего изменения"""
+    changed_at = obj.updated_at or obj.created_at
+    return f'W/"{obj.id}-{_timestamp(changed_at)}"'
+
+
+def list_etag(request: Request, user_id: int, page: Page) -> str:
+    """ETag страницы списка: содержимое страницы + пользователь и параметры запроса.
+    
+    Меняется при изменении, добавлении или удалении элемента страницы, а также
+    при изменении total или следующей страницы.
+    """
+    items = ",".join(
+        f"{item.id}:{_timestamp(item.updated_at or item.created_at)}" for item in page.items
+    )
+    digest = hashlib.sha1(
+        f"{user_id}|{request.url.path}|{normalized_query(request)}|{items}|"
+        f"{page.total}|{page.has_more}|{page.next_cursor}".encode()
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """Слабое сравнение ETag с заголовком If-None-Match"""
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {_opaque(value.strip()) for value in header.split(",")}
+    return _opaque(etag) in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
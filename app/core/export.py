@@ -0,0 +1,121 @@
+"""
+Потоковая выгрузка списков в NDJSON и CSV.
+
+Строки читаются серверным курсором (stream + yield_per) пачками по
+EXPORT_BATCH_SIZE и сразу отправляются клиенту, поэтому память не зависит от
+размера выборки. Выгрузка открывает собственную сессию: ответ передается уже
+после выхода из обработчика.
+"""
+import csv
+import enum
+import io
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.fast_json import dumps, json_default
+
+
+class ExportFormat(str, enum.Enum):
+    """Формат выгрузки"""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def export_fields(schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None) -> Tuple[str, ...]:
+    """Поля выгрузки: выбранные через ?fields= или все поля схемы"""
+    return fields or tuple(schema.model_fields)
+
+
+def export_query(query: Select, fields: Sequence[str]) -> Select:
+    """Запрос списка (select(Model)) только с нужными колонками в порядке первичного ключа"""
+    model = query.column_descriptions[0]["entity"]
+    return query.with_only_columns(*(getattr(model, name) for name in fields)).order_by(model.id)
+
+
+async def stream_rows(query: Select, batch_size: Optional[int] = None) -> AsyncIterator[Sequence[Dict[str, Any]]]:
+    """Пачки строк (RowMapping) из серверного курсора"""
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    async with AsyncSessionLocal() as session:
+        session.info["read_only"] = True
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.mappings().partitions():
+            yield rows
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    return json_default(value)
+
+
+def encode_ndjson(rows: Sequence[Dict[str, Any]], fields: Sequence[str]) -> bytes:
+    """Пачка строк в NDJSON: по одному объекту на строку"""
+    return b"".join(
+        dumps({name: row[name] for name in fields}) + b"\n" for row in rows
+    )
+
+
+def encode_csv(rows: Sequence[Dict[str, Any]], fields: Sequence[str]) -> bytes:
+    """Пачка строк в CSV без заголовка"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(row[name]) for name in fields] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def csv_header(fields: Sequence[str]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(fields)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def export_chunks(
+    query: Select,
+    schema: Type[BaseModel],
+    export_format: ExportFormat,
+    fields: Optional[Tuple[str, ...]] = None
+) -> AsyncIterator[bytes]:
+    """Тело выгрузки по частям (одна часть — одна пачка курсора)"""
+    names: List[str] = list(export_fields(schema, fields))
+    if export_format == ExportFormat.CSV:
+        # Заголовок уходит клиенту до выполнения запроса
+        yield csv_header(names)
+        encode = encode_csv
+    else:
+        encode = encode_ndjson
+    async for rows in stream_rows(export_query(query, names)):
+        yield encode(rows, names)
+
+
+def export_response(
+    query: Select,
+    schema: Type[BaseModel],
+    export_format: ExportFormat,
+    filename: str,
+    fields: Optional[Tuple[str, ...]] = None
+) -> StreamingResponse:
+    """StreamingResponse с выгрузкой запроса списка"""
+    return StreamingResponse(
+        export_chunks(query, schema, export_format, fields),
+        media_type=_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"',
+        },
+    )
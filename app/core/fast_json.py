@@ -0,0 +1,120 @@
+"""
+Быстрый путь сериализации ответов списков и карточек.
+
+При FAST_JSON_RESPONSES=True эндпоинты собирают ответ прямо из ORM-объектов
+(или RowMapping) по списку полей схемы ответа, без валидации Pydantic, и
+сериализуют его через orjson (без orjson — стандартным json). Формат совпадает
+с ответами через response_model: Decimal — строкой, datetime — ISO 8601
+(UTC как Z), Enum — значением.
+"""
+import datetime
+import decimal
+import enum
+import json
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.fieldsets import partial_list_schema, partial_schema
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson указан в requirements.txt
+    orjson = None
+
+
+def json_default(value: Any) -> Any:
+    """JSON-представление типов, которые не сериализуются напрямую"""
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime.datetime):
+        iso = value.isoformat()
+        return iso[:-6] + "Z" if iso.endswith("+00:00") else iso
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON в том же виде, что и JSONResponse после response_model"""
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content,
+        default=json_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Разбор JSON через orjson (без orjson — стандартным json)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse с быстрым кодировщиком"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RowSerializer:
+    """Преобразование ORM-объекта или RowMapping в dict по полям схемы ответа"""
+    
+    def __init__(self, schema: Type[BaseModel]):
+        self.fields: List[Tuple[str, str, Any]] = [
+            (field.serialization_alias or field.alias or name, name, field.get_default())
+            for name, field in schema.model_fields.items()
+        ]
+    
+    def __call__(self, row: Any) -> Dict[str, Any]:
+        if isinstance(row, Mapping):
+            return {key: row.get(name, default) for key, name, default in self.fields}
+        return {key: getattr(row, name, default) for key, name, default in self.fields}
+
+
+_serializers: Dict[Type[BaseModel], RowSerializer] = {}
+
+
+def serializer_for(schema: Type[BaseModel]) -> RowSerializer:
+    serializer = _serializers.get(schema)
+    if serializer is None:
+        serializer = _serializers[schema] = RowSerializer(schema)
+    return serializer
+
+
+def entity_content(schema: Type[BaseModel], row: Any) -> Union[BaseModel, Dict[str, Any]]:
+    """Содержимое ответа карточки: модель схемы или dict для быстрого пути"""
+    if not settings.FAST_JSON_RESPONSES:
+        return schema.model_validate(row)
+    return serializer_for(schema)(row)
+
+
+def list_content(
+    list_schema: Type[BaseModel],
+    item_schema: Type[BaseModel],
+    page_fields: Dict[str, Any],
+    fields: Optional[Tuple[str, ...]] = None
+) -> Union[BaseModel, Dict[str, Any]]:
+    """Содержимое ответа списка (page_fields — Page.as_response) для *List-схемы.
+    
+    fields — разреженный набор полей элементов (см. app.core.fieldsets).
+    """
+    if fields:
+        list_schema = partial_list_schema(list_schema, item_schema, fields)
+        item_schema = partial_schema(item_schema, fields)
+    if not settings.FAST_JSON_RESPONSES:
+        return list_schema(**page_fields)
+    to_dict = serializer_for(item_schema)
+    content = {name: page_fields.get(name) for name in list_schema.model_fields}
+    content["items"] = [to_dict(item) for item in page_fields["items"]]
+    return content
@@ -0,0 +1,65 @@
+"""
+Разреженные наборы полей (?fields=) для списков.
+
+Клиент перечисляет нужные поля схемы ответа через запятую. Из БД загружаются
+только эти колонки (плюс id, created_at и updated_at для курсора и ETag), связи не подгружаются,
+а ответ строится по урезанной схеме с теми же правилами сериализации.
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.orm import load_only
+
+# Колонки, нужные для сортировки, курсора и ETag страницы независимо от запрошенных полей
+_REQUIRED_COLUMNS = ("id", "created_at", "updated_at")
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """Разбор ?fields=a,b,c с проверкой по полям схемы. Неизвестное поле — 400."""
+    if not fields:
+        return None
+    requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неизвестные поля: {', '.join(unknown)}",
+        )
+    # Порядок полей в ответе — как в полной схеме
+    return tuple(name for name in schema.model_fields if name in requested) or None
+
+
+def load_only_columns(model, fields: Tuple[str, ...]):
+    """Опция загрузки только запрошенных колонок модели"""
+    names = dict.fromkeys(_REQUIRED_COLUMNS + fields)
+    return load_only(*(getattr(model, name) for name in names))
+
+
+@lru_cache(maxsize=256)
+def partial_schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Схема ответа только с выбранными полями (типы и значения по умолчанию как у полной)"""
+    definitions = {
+        name: (schema.model_fields[name].annotation, schema.model_fields[name])
+        for name in fields
+    }
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=256)
+def partial_list_schema(
+    list_schema: Type[BaseModel],
+    item_schema: Type[BaseModel],
+    fields: Tuple[str, ...]
+) -> Type[BaseModel]:
+    """*List-схема, элементы которой — partial_schema(item_schema, fields)"""
+    definitions = {
+        name: (field.annotation, field) for name, field in list_schema.model_fields.items()
+    }
+    definitions["items"] = (List[partial_schema(item_schema, fields)], ...)
+    return create_model(f"{list_schema.__name__}Fields", **definitions)
@@ -0,0 +1,180 @@
+"""
+Прием логов фронтенда: лимит на клиента, выборка и очередь с фоновой записью.
+
+Запрос только проверяет лимит и кладет записи в ограниченную очередь процесса,
+не дожидаясь записи; фоновая задача разбирает очередь пачками и пишет их через
+structlog в отдельном потоке, поэтому поток логов не увеличивает задержку API.
+Отброшенные записи учитываются по причинам: rate_limited (лимит клиента),
+sampled (выборка info/debug) и queue_full (очередь переполнена).
+"""
+import asyncio
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger("frontend_logger")
+
+# Уровни, которые не попадают под выборку FRONTEND_LOG_INFO_SAMPLE_RATE
+ALWAYS_KEPT_LEVELS = frozenset({"error", "warn", "warning"})
+
+
+def write_records(records: List[Dict[str, Any]]) -> None:
+    """Запись пачки логов фронтенда через structlog (выполняется в потоке)"""
+    for record in records:
+        record = dict(record)
+        level = record.pop("level")
+        message = record.pop("message")
+        if level == "error":
+            logger.error(message, **record)
+        elif level in ("warn", "warning"):
+            logger.warning(message, **record)
+        else:
+            logger.info(message, **record)
+
+
+class FrontendLogPipeline:
+    """Очередь логов фронтенда с лимитом на клиента и фоновой записью.
+    
+    Лимит — token bucket: rate записей в секунду с запасом burst на клиента;
+    таблица клиентов ограничена max_clients (вытесняются давно не писавшие).
+    Методы submit/stats не содержат await и вызываются из event loop.
+    """
+    
+    def __init__(
+        self,
+        queue_size: int,
+        write_batch: int,
+        rate: float,
+        burst: int,
+        info_sample_rate: float = 1.0,
+        max_clients: int = 10000,
+        write: Callable[[List[Dict[str, Any]]], None] = write_records,
+        timer: Callable[[], float] = time.monotonic,
+        sample: Callable[[], float] = random.random
+    ):
+        self.queue_size = queue_size
+        self.write_batch = write_batch
+        self.rate = rate
+        self.burst = burst
+        self.info_sample_rate = info_sample_rate
+        self.max_clients = max_clients
+        self._write = write
+        self._timer = timer
+        self._sample = sample
+        self._queue: deque = deque()
+        # Клиент → [доступные записи, время последнего пополнения]
+        self._buckets: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.accepted = 0
+        self.written = 0
+        self.write_errors = 0
+        self.dropped = {"rate_limited": 0, "sampled": 0, "queue_full": 0}
+    
+    def _take(self, client: Hashable, count: int) -> int:
+        """Сколько из count записей клиент может отправить сейчас"""
+        now = self._timer()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = [float(self.burst), now]
+            self._buckets[client] = bucket
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self._buckets.move_to_end(client)
+        allowed = min(count, int(bucket[0]))
+        bucket[0] -= allowed
+        return allowed
+    
+    def submit(self, client: Hashable, records: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Постановка записей клиента в очередь; число принятых и отброшенных по причинам"""
+        kept = [
+            record for record in records
+            if record["level"] in ALWAYS_KEPT_LEVELS or self._sample() < self.info_sample_rate
+        ]
+        result = {"accepted": 0, "sampled": len(records) - len(kept), "rate_limited": 0, "queue_full": 0}
+        if kept:
+            # При превышении лимита первыми проходят ошибки и предупреждения
+            kept.sort(key=lambda record: record["level"] not in ALWAYS_KEPT_LEVELS)
+            allowed = self._take(client, len(kept))
+            result["rate_limited"] = len(kept) - allowed
+            space = max(0, self.queue_size - len(self._queue))
+            queued = kept[:min(allowed, space)]
+            result["queue_full"] = allowed - len(queued)
+            self._queue.extend(queued)
+            result["accepted"] = len(queued)
+        
+        self.accepted += result["accepted"]
+        for reason in self.dropped:
+            self.dropped[reason] += result[reason]
+        if result["accepted"] and self._wakeup is not None:
+            self._wakeup.set()
+        return result
+    
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        count = min(self.write_batch, len(self._queue))
+        return [self._queue.popleft() for _ in range(count)]
+    
+    async def _flush(self) -> None:
+        while self._queue:
+            batch = self._next_batch()
+            try:
+                await asyncio.to_thread(self._write, batch)
+                self.written += len(batch)
+            except Exception:
+                self.write_errors += len(batch)
+    
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self._flush()
+    
+    def start(self) -> None:
+        """Запуск фоновой записи (при старте приложения)"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            if self._queue:
+                self._wakeup.set()
+    
+    async def stop(self) -> None:
+        """Остановка фоновой записи и запись оставшихся в очереди логов"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        await self._flush()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики принятых, записанных и отброшенных логов"""
+        return {
+            "queued": len(self._queue),
+            "queue_size": self.queue_size,
+            "accepted": self.accepted,
+            "written": self.written,
+            "write_errors": self.write_errors,
+            "dropped": dict(self.dropped),
+            "clients": len(self._buckets),
+        }
+
+
+frontend_logs = FrontendLogPipeline(
+    queue_size=settings.FRONTEND_LOG_QUEUE_SIZE,
+    write_batch=settings.FRONTEND_LOG_WRITE_BATCH,
+    rate=settings.FRONTEND_LOG_RATE_PER_SECOND,
+    burst=settings.FRONTEND_LOG_BURST,
+    info_sample_rate=settings.FRONTEND_LOG_INFO_SAMPLE_RATE,
+    max_clients=settings.FRONTEND_LOG_MAX_CLIENTS,
+)
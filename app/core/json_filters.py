@@ -0,0 +1,94 @@
+"""
+Фильтры списков по JSON-полям: тегам (?tag=vip) и пользовательским полям (?cf.region=EU).
+
+В PostgreSQL поля tags и custom_fields имеют тип JSONB с GIN-индексами jsonb_path_ops
+(миграция c3d8e1f4a2b7), поэтому фильтры строятся через оператор @> и выполняются
+по индексу. В SQLite (тесты) те же условия выражаются через json_each и json_extract.
+"""
+import math
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import and_, literal, or_, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+# Префикс query-параметров фильтра по пользовательским полям
+CUSTOM_FIELD_PREFIX = "cf."
+_KEY_PATTERN = re.compile(r"^[\w\-]{1,100}$")
+
+
+def custom_field_params(request: Request) -> Dict[str, str]:
+    """Фильтры по пользовательским полям из query-параметров cf.<ключ>=<значение>"""
+    filters = {}
+    for name, value in request.query_params.multi_items():
+        if not name.startswith(CUSTOM_FIELD_PREFIX) or value == "":
+            continue
+        key = name[len(CUSTOM_FIELD_PREFIX):]
+        if not _KEY_PATTERN.match(key):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Некорректное имя пользовательского поля: {name}"
+            )
+        filters[key] = value
+    return filters
+
+
+def _scalar_candidates(value: str) -> List[Any]:
+    """Значения, с которыми сравнивается параметр: строка и, если возможно, число"""
+    candidates: List[Any] = [value]
+    try:
+        number = int(value)
+    except ValueError:
+        try:
+            number = float(value)
+        except ValueError:
+            return candidates
+        if not math.isfinite(number):
+            return candidates
+    candidates.append(number)
+    return candidates
+
+
+def _contains(column, document):
+    """column @> document (JSONB, выполняется по GIN-индексу)"""
+    return column.op("@>")(literal(document, JSONB))
+
+
+def tags_filter(dialect: str, column, tags: Sequence[str]):
+    """Условие: массив тегов содержит все указанные теги"""
+    if dialect == "postgresql":
+        return _contains(column, list(tags))
+    conditions = []
+    for tag in tags:
+        items = func.json_each(column).table_valued("value")
+        conditions.append(select(items.c.value).where(items.c.value == tag).exists())
+    return and_(*conditions)
+
+
+def custom_fields_filter(dialect: str, column, filters: Dict[str, str]):
+    """Условие: пользовательские поля равны указанным значениям (строка или число)"""
+    conditions = []
+    for key, value in filters.items():
+        candidates = _scalar_candidates(value)
+        if dialect == "postgresql":
+            conditions.append(or_(*(_contains(column, {key: candidate}) for candidate in candidates)))
+        else:
+            conditions.append(func.json_extract(column, f'$."{key}"').in_(candidates))
+    return and_(*conditions)
+
+
+def json_filters(
+    dialect: str,
+    model,
+    tags: Optional[Sequence[str]] = None,
+    custom_fields: Optional[Dict[str, str]] = None
+) -> list:
+    """Условия фильтров по тегам и пользовательским полям модели"""
+    conditions = []
+    if tags:
+        conditions.append(tags_filter(dialect, model.tags, tags))
+    if custom_fields:
+        conditions.append(custom_fields_filter(dialect, model.custom_fields, custom_fields))
+    return conditions
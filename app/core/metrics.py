@@ -0,0 +1,43 @@
+"""
+Простые метрики процесса для endpoint /metrics
+"""
+import bisect
+import threading
+from typing import Any, Dict, Sequence
+
+# Границы корзин по умолчанию, секунды
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин (кумулятивная, как в Prometheus).
+
+    Используется и из event loop, и из потоков синхронного движка, поэтому
+    обновления защищены блокировкой.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        buckets = {}
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = count
+        return {"buckets": buckets, "count": count, "sum": round(total, 6)}
@@ -0,0 +1,221 @@
+"""
+Пагинация списков: общий исполнитель списочных запросов, стратегии подсчета total
+и курсоры для keyset-пагинации по (created_at, id)
+"""
+import base64
+import enum
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from app.core.config import settings
+from app.core.database import dialect_name
+
+# Позиция в списке: (created_at, id) последнего элемента предыдущей страницы
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Непрозрачный курсор для передачи клиенту"""
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """Разбор курсора из query-параметра. Невалидный курсор — 400."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор пагинации",
+        )
+
+
+def _sort_key(model, dialect: str):
+    """Выражение для сортировки по времени создания.
+
+    SQLite хранит DateTime строками, а server_default (CURRENT_TIMESTAMP) пишет их
+    без дробной части секунд, поэтому сравнение строк с параметром курсора
+    некорректно — нормализуем через julianday.
+    """
+    if dialect == "sqlite":
+        return func.julianday(model.created_at)
+    return model.created_at
+
+
+def apply_keyset(query, model, cursor: Optional[Cursor], dialect: str = "postgresql"):
+    """Условие «строго после курсора» для сортировки created_at DESC, id DESC"""
+    if cursor is None:
+        return query
+    created_at, item_id = cursor
+    if dialect == "sqlite":
+        created_at = func.julianday(created_at.isoformat(sep=" "))
+    return query.where(
+        tuple_(_sort_key(model, dialect), model.id) < tuple_(created_at, item_id)
+    )
+
+
+def keyset_order(model, dialect: str = "postgresql") -> Tuple[Any, Any]:
+    """Стабильная сортировка списков: новые записи первыми, id как tie-breaker"""
+    return _sort_key(model, dialect).desc(), model.id.desc()
+
+
+class TotalStrategy(str, enum.Enum):
+    """Способ подсчета общего количества записей в списке"""
+    EXACT = "exact"  # точный count(*) OVER () в том же запросе
+    ESTIMATED = "estimated"  # оценка планировщика PostgreSQL для больших выборок
+    NONE = "none"  # без подсчета, только has_more
+
+
+@dataclass
+class Page:
+    """Страница списка"""
+    items: List[Any]
+    total: Optional[int]
+    total_strategy: TotalStrategy
+    has_more: bool
+    next_cursor: Optional[str] = None
+    
+    def as_response(self, skip: int, limit: int) -> Dict[str, Any]:
+        """Поля для схем *List"""
+        pages = (self.total + limit - 1) // limit if self.total is not None else None
+        return {
+            "items": self.items,
+            "total": self.total,
+            "page": skip // limit + 1,
+            "size": limit,
+            "pages": pages,
+            "next_cursor": self.next_cursor,
+            "has_more": self.has_more,
+            "total_strategy": self.total_strategy.value,
+        }
+
+
+class _ExplainJSON(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) для произвольного SELECT с сохранением параметров"""
+    inherit_cache = False
+    
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_ExplainJSON, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def _exact_total(db: AsyncSession, query: Select, model) -> int:
+    result = await db.execute(
+        query.with_only_columns(func.count(model.id)).order_by(None)
+    )
+    return result.scalar()
+
+
+async def _estimated_total(db: AsyncSession, query: Select, model) -> Optional[int]:
+    """Оценка количества строк по статистике планировщика (только PostgreSQL)"""
+    if dialect_name(db) != "postgresql":
+        return None
+    result = await db.execute(
+        _ExplainJSON(query.with_only_columns(model.id).order_by(None))
+    )
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Cursor] = None,
+    total_strategy: Optional[TotalStrategy] = None,
+    options: Sequence[Any] = (),
+    rank: Optional[Any] = None,
+) -> Page:
+    """Выполнение отфильтрованного списочного запроса.
+    
+    query — SELECT модели со всеми фильтрами, без сортировки и лимитов.
+    Страница выбирается с limit + 1, чтобы определить has_more без отдельного запроса.
+    Для точного total без курсора count(*) OVER () считается в том же запросе.
+    rank — выражение релевантности поиска; применяется только без курсора,
+    так как курсор привязан к сортировке по (created_at, id).
+    total_strategy=None — NONE для страниц по курсору (total за пределами первой страницы
+    потребовал бы count по всей выборке) и EXACT без курсора; в Page.total_strategy
+    возвращается фактически примененная стратегия.
+    """
+    dialect = dialect_name(db)
+    if total_strategy is None:
+        total_strategy = TotalStrategy.NONE if cursor is not None else TotalStrategy.EXACT
+    
+    total = None
+    if total_strategy == TotalStrategy.ESTIMATED:
+        total = await _estimated_total(db, query, model)
+        if total is None or total < settings.LIST_COUNT_ESTIMATE_THRESHOLD:
+            # На небольших выборках точный подсчет дешев
+            total = None
+            total_strategy = TotalStrategy.EXACT
+    
+    if cursor is not None:
+        rank = None
+    
+    data_query = apply_keyset(query, model, cursor, dialect)
+    if cursor is None:
+        data_query = data_query.offset(skip)
+    if rank is not None:
+        data_query = data_query.order_by(rank.desc())
+    data_query = (
+        data_query.options(*options)
+        .limit(limit + 1)
+        .order_by(*keyset_order(model, dialect))
+    )
+    
+    window_total = total_strategy == TotalStrategy.EXACT and cursor is None
+    if window_total:
+        data_query = data_query.add_columns(func.count().over().label("total"))
+    
+    result = await db.execute(data_query)
+    if window_total:
+        rows = result.all()
+        items = [row[0] for row in rows]
+        if rows:
+            total = rows[0].total
+        elif skip == 0:
+            total = 0
+    else:
+        items = list(result.scalars().all())
+    
+    if total_strategy == TotalStrategy.EXACT and total is None:
+        # Курсорный режим или страница за пределами выборки
+        total = await _exact_total(db, query, model)
+    
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = None
+    if has_more and rank is None:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    return Page(
+        items=items,
+        total=total,
+        total_strategy=total_strategy,
+        has_more=has_more,
+        next_cursor=next_cursor,
+    )
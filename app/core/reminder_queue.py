@@ -0,0 +1,112 @@
+"""
+Очередь отложенных напоминаний об активностях.
+
+Элемент очереди — напоминание "<activity_id>:<user_id>" с временем отправки
+(unix time) в качестве приоритета. Повторное добавление того же элемента
+заменяет время, поэтому перенос активности не создает второе напоминание.
+Рядом с очередью хранится high-water mark — граница, до которой активности
+уже просканированы (app/services/reminder_service.py).
+
+Бэкенды: redis (sorted set, общий для API и всех воркеров, переживает перезапуск;
+по умолчанию) и memory (куча в процессе; только для тестов). Очередь в памяти не
+работает в развертывании: API ставит напоминания в свою кучу, которую воркер
+Celery не читает, а у каждого дочернего процесса воркера своя граница и куча.
+"""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+_QUEUE_KEY = "reminders:queue"
+_HWM_KEY = "reminders:hwm"
+
+
+class MemoryReminderQueue:
+    """Очередь в памяти процесса: куча (время, элемент) с ленивым удалением замененных"""
+    
+    def __init__(self):
+        self._heap: List[Tuple[float, str]] = []
+        self._scores: Dict[str, float] = {}
+        self._high_water_mark: Optional[float] = None
+    
+    async def push(self, items: Dict[str, float]) -> None:
+        for member, score in items.items():
+            self._scores[member] = score
+            heapq.heappush(self._heap, (score, member))
+    
+    async def pop_due(self, until: float) -> List[Tuple[str, float]]:
+        due = []
+        while self._heap and self._heap[0][0] <= until:
+            score, member = heapq.heappop(self._heap)
+            # Запись из кучи актуальна, только если время элемента с тех пор не менялось
+            if self._scores.get(member) == score:
+                del self._scores[member]
+                due.append((member, score))
+        return due
+    
+    async def size(self) -> int:
+        return len(self._scores)
+    
+    async def get_high_water_mark(self) -> Optional[float]:
+        return self._high_water_mark
+    
+    async def set_high_water_mark(self, value: float) -> None:
+        self._high_water_mark = value
+    
+    async def close(self) -> None:
+        pass
+
+
+class RedisReminderQueue:
+    """Очередь в Redis (REDIS_URL): sorted set и ключ с high-water mark"""
+    
+    def __init__(self, url: str):
+        self._redis = redis.from_url(url)
+    
+    async def push(self, items: Dict[str, float]) -> None:
+        if items:
+            await self._redis.zadd(_QUEUE_KEY, items)
+    
+    async def pop_due(self, until: float) -> List[Tuple[str, float]]:
+        # Чтение и удаление в одной транзакции MULTI: параллельный тик не получит те же элементы
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zrangebyscore(_QUEUE_KEY, "-inf", until, withscores=True)
+            pipe.zremrangebyscore(_QUEUE_KEY, "-inf", until)
+            due, _ = await pipe.execute()
+        return [(member.decode(), score) for member, score in due]
+    
+    async def size(self) -> int:
+        return await self._redis.zcard(_QUEUE_KEY)
+    
+    async def get_high_water_mark(self) -> Optional[float]:
+        value = await self._redis.get(_HWM_KEY)
+        return float(value) if value is not None else None
+    
+    async def set_high_water_mark(self, value: float) -> None:
+        await self._redis.set(_HWM_KEY, value)
+    
+    async def close(self) -> None:
+        # Соединения привязаны к циклу событий; следующий вызов откроет новые
+        await self._redis.aclose()
+
+
+def reminder_member(activity_id: int, user_id: int) -> str:
+    """Элемент очереди для напоминания пользователю об активности"""
+    return f"{activity_id}:{user_id}"
+
+
+def parse_member(member: str) -> Tuple[int, int]:
+    """(activity_id, user_id) из элемента очереди"""
+    activity_id, user_id = member.split(":")
+    return int(activity_id), int(user_id)
+
+
+def _create_queue():
+    if settings.REMINDER_QUEUE_BACKEND == "redis":
+        return RedisReminderQueue(settings.REDIS_URL)
+    return MemoryReminderQueue()
+
+
+reminder_queue = _create_queue()
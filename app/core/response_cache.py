@@ -0,0 +1,217 @@
+"""
+Кеш ответов GET-эндпоинтов списков и карточек.
+
+Ключ записи включает сущность, пользователя, нормализованные query-параметры и
+версию данных владельца. Сервисы при записи (create/update/delete) увеличивают
+версию владельца, после чего все его старые записи перестают находиться и
+вытесняются по TTL — без перебора ключей.
+
+Бэкенды: redis (общий для всех воркеров) и memory (в процессе; для тестов и
+запуска в одном процессе — при нескольких воркерах uvicorn invalidate() видит
+только воркер, обработавший запись, и остальные отдают устаревшие ответы до TTL).
+Кеш выключен по умолчанию (RESPONSE_CACHE_ENABLED).
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+import redis.asyncio as redis
+import structlog
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.etag import etag_matches, normalized_query, not_modified
+from app.core.fast_json import FastJSONResponse
+
+logger = structlog.get_logger()
+
+_KEY_PREFIX = "rc"
+
+
+class MemoryCacheBackend:
+    """Кеш в памяти процесса"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[str, int] = {}
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+    
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries.set(key, value)
+    
+    async def get_version(self, key: str) -> int:
+        return self._versions.get(key, 0)
+    
+    async def incr_version(self, key: str) -> None:
+        self._versions[key] = self._versions.get(key, 0) + 1
+    
+    async def close(self) -> None:
+        pass
+
+
+class RedisCacheBackend:
+    """Кеш в Redis (REDIS_URL)"""
+    
+    def __init__(self, url: str):
+        self._redis = redis.from_url(url)
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+    
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self._redis.set(key, value, ex=ttl)
+    
+    async def get_version(self, key: str) -> int:
+        value = await self._redis.get(key)
+        return int(value) if value is not None else 0
+    
+    async def incr_version(self, key: str) -> None:
+        await self._redis.incr(key)
+    
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+@dataclass
+class CacheEntry:
+    """Результат поиска в кеше: готовый ответ или место для сохранения"""
+    cache: "ResponseCache"
+    key: Optional[str]
+    response: Optional[Response] = None
+    
+    async def store(
+        self,
+        content: Union[BaseModel, Dict[str, Any]],
+        etag: Optional[str] = None
+    ) -> Response:
+        """Сериализация ответа и сохранение в кеш вместе с ETag.
+        
+        dict (быстрый путь, см. app.core.fast_json) сериализуется FastJSONResponse.
+        """
+        if isinstance(content, BaseModel):
+            response = JSONResponse(content=content.model_dump(mode="json", by_alias=True))
+        else:
+            response = FastJSONResponse(content=content)
+        if self.key is not None:
+            await self.cache.set(self.key, (etag or "").encode() + b"\n" + response.body)
+        response.headers["X-Cache"] = "MISS"
+        if etag:
+            response.headers["ETag"] = etag
+        return response
+
+
+class ResponseCache:
+    """Кеш ответов с версионированием по владельцу данных"""
+    
+    def __init__(self, backend, ttl: int, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+    
+    @staticmethod
+    def _version_key(entity: str, owner_id: int) -> str:
+        return f"{_KEY_PREFIX}:v:{entity}:{owner_id}"
+    
+    async def lookup(
+        self,
+        entity: str,
+        user_id: int,
+        request: Request,
+        owner_id: Optional[int] = None,
+        db: Optional[AsyncSession] = None
+    ) -> CacheEntry:
+        """Поиск ответа для запроса пользователя.
+        
+        owner_id — владелец данных, чья версия определяет актуальность
+        (по умолчанию сам пользователь). Если сохраненный ETag совпадает
+        с If-None-Match, вместо тела возвращается 304.
+        При промахе сессия запроса db переводится на primary: запись кладется под
+        текущую версию владельца и не должна заполняться из отстающей реплики.
+        """
+        if not self.enabled:
+            return CacheEntry(self, None)
+        owner_id = user_id if owner_id is None else owner_id
+        try:
+            version = await self.backend.get_version(self._version_key(entity, owner_id))
+            digest = hashlib.sha1(
+                f"{user_id}|{request.url.path}|{normalized_query(request)}".encode()
+            ).hexdigest()
+            key = f"{_KEY_PREFIX}:{entity}:{owner_id}:{version}:{digest}"
+            body = await self.backend.get(key)
+        except Exception as exc:
+            # Недоступный кеш не должен ломать чтение
+            self.errors += 1
+            logger.warning("Кеш ответов недоступен", error=str(exc))
+            return CacheEntry(self, None)
+        
+        if body is None:
+            self.misses += 1
+            if db is not None:
+                db.info.pop("read_only", None)
+            return CacheEntry(self, key)
+        self.hits += 1
+        etag, body = body.split(b"\n", 1)
+        etag = etag.decode()
+        if etag_matches(request, etag):
+            return CacheEntry(self, key, not_modified(etag))
+        headers = {"X-Cache": "HIT"}
+        if etag:
+            headers["ETag"] = etag
+        return CacheEntry(
+            self,
+            key,
+            Response(content=body, media_type="application/json", headers=headers),
+        )
+    
+    async def set(self, key: str, body: bytes) -> None:
+        try:
+            await self.backend.set(key, body, self.ttl)
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("Не удалось сохранить ответ в кеш", error=str(exc))
+    
+    async def invalidate(self, entity: str, owner_id: int) -> None:
+        """Сброс всех закешированных ответов сущности владельца"""
+        if not self.enabled:
+            return
+        try:
+            await self.backend.incr_version(self._version_key(entity, owner_id))
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("Не удалось сбросить кеш ответов", entity=entity, error=str(exc))
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+    
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def _create_backend():
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.REDIS_URL)
+    return MemoryCacheBackend(
+        maxsize=settings.RESPONSE_CACHE_MAX_SIZE, ttl=settings.RESPONSE_CACHE_TTL
+    )
+
+
+response_cache = ResponseCache(
+    _create_backend(),
+    ttl=settings.RESPONSE_CACHE_TTL,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
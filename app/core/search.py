@@ -0,0 +1,50 @@
+"""
+Поиск по текстовым полям списков.
+
+Подстрочный поиск выполняется через ILIKE '%term%'. В PostgreSQL по полям поиска
+построены GIN-индексы pg_trgm (миграция a7c3e9f2b41d), поэтому такие условия
+выполняются по индексу, а результаты ранжируются по word_similarity.
+В SQLite (тесты), при SEARCH_BACKEND=ilike и без установленного pg_trgm работает
+тот же фильтр без ранжирования.
+"""
+from typing import Optional, Sequence
+
+from sqlalchemy import func, or_, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.database import dialect_name
+
+# Наличие расширения pg_trgm, определяется при запуске приложения
+_trigram_available = False
+
+
+async def detect_trigram_support(engine: AsyncEngine) -> bool:
+    """Проверка, установлено ли расширение pg_trgm"""
+    global _trigram_available
+    if engine.dialect.name != "postgresql" or settings.SEARCH_BACKEND != "trigram":
+        _trigram_available = False
+        return False
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        )
+        _trigram_available = result.scalar() is not None
+    return _trigram_available
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_filter(columns: Sequence, term: str):
+    """Условие подстрочного поиска по любому из полей"""
+    pattern = f"%{_escape_like(term)}%"
+    return or_(*(column.ilike(pattern, escape="\\") for column in columns))
+
+
+def search_rank(db: AsyncSession, columns: Sequence, term: Optional[str]):
+    """Выражение релевантности для сортировки или None, если ранжирование недоступно"""
+    if not term or not _trigram_available or dialect_name(db) != "postgresql":
+        return None
+    return func.greatest(*(func.word_similarity(term, column) for column in columns))
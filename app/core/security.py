@@ -1,20 +1,40 @@
 """
 Модуль безопасности и аутентификации
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Any, Callable, Dict, Optional, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 # Контекст для хеширования паролей
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt занимает ~200 мс CPU и отпускает GIL, поэтому выполняется в отдельном
+# ограниченном пуле потоков, а не в event loop
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_hash_limit = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+# completed — успешные операции, failed — завершившиеся ошибкой или отмененные
+_hash_stats = {"pending": 0, "completed": 0, "failed": 0, "rejected": 0}
+
 # OAuth2 схема для получения токена из заголовка Authorization
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Кеш аутентифицированных пользователей по user_id (ключ "sub" в токене).
+# Сбрасывается при изменении и удалении пользователя в UserService.
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Создание JWT токена доступа"""
@@ -63,3 +83,46 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """Хеширование пароля"""
     return pwd_context.hash(password)
+
+
+async def _run_hashing(func: Callable[..., Any], *args: Any) -> Any:
+    """Выполнение bcrypt в пуле с контролем допуска: при переполненной очереди — 503"""
+    if _hash_stats["pending"] >= _hash_limit:
+        _hash_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервис перегружен, повторите попытку позже",
+            headers={"Retry-After": "1"}
+        )
+    _hash_stats["pending"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(_hash_executor, func, *args)
+    except BaseException:
+        # Включая отмену запроса (CancelledError)
+        _hash_stats["failed"] += 1
+        raise
+    finally:
+        _hash_stats["pending"] -= 1
+    _hash_stats["completed"] += 1
+    return result
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Проверка пароля без блокировки event loop"""
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Хеширование пароля без блокировки event loop"""
+    return await _run_hashing(get_password_hash, password)
+
+
+def password_hashing_stats() -> Dict[str, int]:
+    """Состояние пула хеширования паролей"""
+    return {**_hash_stats, "limit": _hash_limit}
+
+
+def shutdown_password_hashing() -> None:
+    """Остановка пула хеширования при завершении приложения"""
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
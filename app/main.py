@@ -1,16 +1,27 @@
 """
 Основной файл приложения CRM системы
 """
+import asyncio
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
 import structlog
 
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import async_engine, create_tables, database_stats, replicas
+from app.core.frontend_logs import frontend_logs
+from app.core.reminder_queue import reminder_queue
+from app.core.response_cache import response_cache
+from app.core.search import detect_trigram_support
+from app.core.security import (
+    password_hashing_stats,
+    principal_cache,
+    shutdown_password_hashing,
+)
+from app.api.deps import verify_metrics_token
 from app.api.v1.api import api_router
 
 # Настройка логирования
@@ -77,14 +88,32 @@ app.mount(
 async def startup_event():
     """Инициализация при запуске приложения"""
     logger.info("Запуск CRM приложения")
+    frontend_logs.start()
     await create_tables()
     logger.info("База данных инициализирована")
+    if not await detect_trigram_support(async_engine):
+        logger.info("pg_trgm недоступен, поиск без ранжирования")
+    if replicas.engines:
+        await replicas.check()
+        app.state.replica_health_task = asyncio.create_task(
+            replicas.run_health_checks(settings.REPLICA_HEALTH_CHECK_INTERVAL)
+        )
+        logger.info("Реплики для чтения подключены", count=len(replicas.engines))
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Очистка при завершении приложения"""
     logger.info("Завершение работы CRM приложения")
+    shutdown_password_hashing()
+    replica_health_task = getattr(app.state, "replica_health_task", None)
+    if replica_health_task is not None:
+        replica_health_task.cancel()
+    await replicas.dispose()
+    await response_cache.close()
+    await reminder_queue.close()
+    await frontend_logs.stop()
+    await async_engine.dispose()
 
 
 @app.get("/")
@@ -101,3 +130,18 @@ async def root():
 async def health_check():
     """Проверка состояния приложения"""
     return {"status": "healthy", "version": settings.APP_VERSION}
+
+
+@app.get("/metrics", dependencies=[Depends(verify_metrics_token)])
+async def metrics():
+    """Метрики процесса: пул соединений БД, кеши, пул хеширования паролей, логи фронтенда.
+    
+    Доступны только с Bearer токеном METRICS_TOKEN.
+    """
+    return {
+        "database": database_stats(),
+        "auth_cache": principal_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "password_hashing": password_hashing_stats(),
+        "frontend_logs": frontend_logs.stats(),
+    }
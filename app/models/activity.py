@@ -1,10 +1,10 @@
 """
 Модель активности/взаимодействия
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, JSONDocument, owner_list_index, purge_index, reference_index
 
 
 class Activity(Base):
@@ -40,12 +40,12 @@ class Activity(Base):
     outcome = Column(Text, nullable=True)
     
     # JSON поля для дополнительных данных
-    custom_fields = Column(JSON, default=dict)
-    tags = Column(JSON, default=list)
+    custom_fields = Column(JSONDocument, default=dict)
+    tags = Column(JSONDocument, default=list)
     
     # Временные метки
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Мягкое удаление
     is_deleted = Column(Boolean, default=False)
@@ -57,3 +57,33 @@ class Activity(Base):
     deal = relationship("Deal", back_populates="activities")
     owner = relationship("User", foreign_keys=[owner_id])
     assigned_to = relationship("User", foreign_keys=[assigned_to_id])
+
+
+# Списки владельца и фильтры списков по связям (только неудаленные записи)
+owner_list_index(Activity)
+owner_list_index(Activity, Activity.contact_id)
+owner_list_index(Activity, Activity.company_id)
+owner_list_index(Activity, Activity.deal_id)
+
+# Очистка удаленных записей: выбор пакетов по id и проверка ссылок при удалении
+purge_index(Activity)
+reference_index(Activity.contact_id)
+reference_index(Activity.company_id)
+reference_index(Activity.deal_id)
+
+# Напоминания (app/services/reminder_service.py): окно status = 'pending' AND scheduled_at
+# (или due_date) в (от, до] читается диапазоном индекса, без сканирования таблицы
+Index(
+    "ix_activities_reminders_scheduled_at",
+    Activity.status,
+    Activity.scheduled_at,
+    postgresql_where=Activity.is_deleted == False,
+    sqlite_where=Activity.is_deleted == False,
+)
+Index(
+    "ix_activities_reminders_due_date",
+    Activity.status,
+    Activity.due_date,
+    postgresql_where=Activity.is_deleted == False,
+    sqlite_where=Activity.is_deleted == False,
+)
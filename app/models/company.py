@@ -1,10 +1,10 @@
 """
 Модель компании
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, JSONDocument, owner_list_index, purge_index, reference_index
 
 
 class Company(Base):
@@ -47,13 +47,13 @@ class Company(Base):
     parent_company_id = Column(Integer, ForeignKey("companies.id"), nullable=True)
     
     # JSON поля для дополнительных данных
-    custom_fields = Column(JSON, default=dict)
-    tags = Column(JSON, default=list)
-    social_links = Column(JSON, default=dict)  # linkedin, twitter, facebook, etc.
+    custom_fields = Column(JSONDocument, default=dict)
+    tags = Column(JSONDocument, default=list)
+    social_links = Column(JSONDocument, default=dict)  # linkedin, twitter, facebook, etc.
     
     # Временные метки
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     last_contacted = Column(DateTime(timezone=True), nullable=True)
     
     # Мягкое удаление
@@ -66,3 +66,11 @@ class Company(Base):
     contacts = relationship("Contact", back_populates="company")
     deals = relationship("Deal", back_populates="company")
     activities = relationship("Activity", back_populates="company")
+
+
+# Списки владельца (только неудаленные записи)
+owner_list_index(Company)
+
+# Очистка удаленных записей: выбор пакетов по id и проверка ссылок при удалении
+purge_index(Company)
+reference_index(Company.parent_company_id)
@@ -1,10 +1,10 @@
 """
 Модель контакта
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, JSONDocument, owner_list_index, purge_index, reference_index
 
 
 class Contact(Base):
@@ -37,12 +37,12 @@ class Contact(Base):
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # JSON поля для дополнительных данных
-    custom_fields = Column(JSON, default=dict)
-    tags = Column(JSON, default=list)
+    custom_fields = Column(JSONDocument, default=dict)
+    tags = Column(JSONDocument, default=list)
     
     # Временные метки
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     last_contacted = Column(DateTime(timezone=True), nullable=True)
     
     # Мягкое удаление
@@ -54,3 +54,12 @@ class Contact(Base):
     owner = relationship("User")
     activities = relationship("Activity", back_populates="contact")
     deals = relationship("Deal", back_populates="contact")
+
+
+# Списки владельца и фильтры списков по связям (только неудаленные записи)
+owner_list_index(Contact)
+owner_list_index(Contact, Contact.company_id)
+
+# Очистка удаленных записей: выбор пакетов по id и проверка ссылок при удалении
+purge_index(Contact)
+reference_index(Contact.company_id)
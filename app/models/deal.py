@@ -2,11 +2,10 @@
 Модель сделки
 """
 import enum
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey, Numeric, Enum, event
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Numeric, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from datetime import datetime, timezone
-from app.core.database import Base
+from app.core.database import Base, JSONDocument, owner_list_index, purge_index, reference_index
 
 
 class DealStatus(str, enum.Enum):
@@ -42,15 +41,15 @@ class Deal(Base):
     # Связи
     contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=True, index=True)  # Клиент
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # Менеджер
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Менеджер
     
     # Дополнительная информация
     source = Column(String(100), nullable=True)
     notes = Column(Text, nullable=True)
     
     # JSON поля для дополнительных данных
-    custom_fields = Column(JSON, default=dict)
-    tags = Column(JSON, default=list)
+    custom_fields = Column(JSONDocument, default=dict)
+    tags = Column(JSONDocument, default=list)
     
     # Временные метки
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -67,7 +66,23 @@ class Deal(Base):
     activities = relationship("Activity", back_populates="deal")
 
 
-@event.listens_for(Deal, 'before_update', propagate=True)
-def receive_before_update(mapper, connection, target):
-    """Автоматическое обновление updated_at при любом изменении сделки"""
-    target.updated_at = datetime.now(timezone.utc)
+# Списки владельца и фильтры списков по связям (только неудаленные записи)
+owner_list_index(Deal)
+owner_list_index(Deal, Deal.contact_id)
+owner_list_index(Deal, Deal.company_id)
+
+# Очистка удаленных записей: выбор пакетов по id и проверка ссылок при удалении
+purge_index(Deal)
+reference_index(Deal.company_id)
+
+# Воронка сделок: GROUP BY status и row_number() по статусу без сортировки и чтения таблицы
+# (только PostgreSQL: SQLite не поддерживает NULLS LAST в индексах)
+Index(
+    "ix_deals_owner_pipeline",
+    Deal.owner_id,
+    Deal.status,
+    Deal.amount.desc().nulls_last(),
+    Deal.id.desc(),
+    postgresql_include=["currency", "probability"],
+    postgresql_where=Deal.is_deleted == False,
+).ddl_if(dialect="postgresql")
@@ -4,7 +4,7 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey, BigInteger
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, JSONDocument, owner_list_index, purge_index, reference_index
 
 
 class File(Base):
@@ -27,7 +27,7 @@ class File(Base):
     # Описание и теги
     title = Column(String(255), nullable=True)
     description = Column(Text, nullable=True)
-    tags = Column(JSON, default=list)
+    tags = Column(JSONDocument, default=list)
     
     # Связи
     contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=True)
@@ -42,12 +42,12 @@ class File(Base):
     access_level = Column(String(50), default="private")  # private, team, public
     
     # JSON поля для дополнительных данных
-    custom_fields = Column(JSON, default=dict)
+    custom_fields = Column(JSONDocument, default=dict)
     file_metadata = Column(JSON, default=dict)  # exif, dimensions, etc.
     
     # Временные метки
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Мягкое удаление
     is_deleted = Column(Boolean, default=False)
@@ -59,3 +59,18 @@ class File(Base):
     deal = relationship("Deal")
     activity = relationship("Activity")
     owner = relationship("User")
+
+
+# Списки владельца и фильтры списков по связям (только неудаленные записи)
+owner_list_index(File)
+owner_list_index(File, File.contact_id)
+owner_list_index(File, File.company_id)
+owner_list_index(File, File.deal_id)
+owner_list_index(File, File.activity_id)
+
+# Очистка удаленных записей: выбор пакетов по id и проверка ссылок при удалении
+purge_index(File)
+reference_index(File.contact_id)
+reference_index(File.company_id)
+reference_index(File.deal_id)
+reference_index(File.activity_id)
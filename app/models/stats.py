@@ -0,0 +1,36 @@
+"""
+Модели дневных сводок (rollup) для отчетов.
+
+Строки обновляются инкрементально в той же транзакции, что и исходные записи
+(app/services/rollup_service.py), поэтому отчеты читают только сводки и не
+сканируют таблицы сделок и активностей.
+"""
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Numeric, Enum
+from app.core.database import Base
+from app.models.deal import DealStatus
+
+
+class DealDailyStats(Base):
+    """Сделки владельца, созданные за день, в разрезе статуса и валюты"""
+    __tablename__ = "deal_daily_stats"
+    
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True, index=True)  # дата создания сделки (UTC)
+    status = Column(Enum(DealStatus), primary_key=True)
+    currency = Column(String(3), primary_key=True)  # "" для сделок без валюты
+    
+    count = Column(Integer, nullable=False, default=0)
+    amount_sum = Column(Numeric(20, 2), nullable=False, default=0)
+    weighted_sum = Column(Numeric(22, 2), nullable=False, default=0)  # сумма amount * probability (%)
+
+
+class ActivityDailyStats(Base):
+    """Активности владельца, созданные за день, в разрезе типа и статуса"""
+    __tablename__ = "activity_daily_stats"
+    
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True, index=True)  # дата создания активности (UTC)
+    type = Column(String(50), primary_key=True)
+    status = Column(String(50), primary_key=True)  # "" для активностей без статуса
+    
+    count = Column(Integer, nullable=False, default=0)
@@ -72,7 +72,10 @@ class Activity(ActivityInDB):
 class ActivityList(BaseModel):
     """Схема списка активностей"""
     items: List[Activity]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    total_strategy: str = "exact"
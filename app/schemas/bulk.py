@@ -0,0 +1,52 @@
+"""
+Схемы пакетных операций (POST /{entity}/bulk)
+"""
+import enum
+from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+
+class BulkAction(str, enum.Enum):
+    """Тип операции в пакете"""
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class BulkOperation(BaseModel):
+    """Операция пакета.
+
+    data проверяется схемой *Create (create) или *Update (update) сущности,
+    ошибки возвращаются в результате операции, а не всего запроса.
+    """
+    action: BulkAction
+    id: Optional[int] = None  # для update и delete
+    data: Dict[str, Any] = {}
+
+
+class BulkRequest(BaseModel):
+    """Пакет операций"""
+    operations: List[BulkOperation] = Field(..., min_length=1, max_length=settings.BULK_MAX_OPERATIONS)
+    # atomic=True — одна транзакция: при любой ошибке ничего не применяется.
+    # atomic=False — транзакции по BULK_CHUNK_SIZE операций, ошибки не мешают остальным.
+    atomic: bool = True
+
+
+class BulkItemResult(BaseModel):
+    """Результат операции (index — позиция в operations)"""
+    index: int
+    action: BulkAction
+    status: str  # created, updated, deleted, error, skipped
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    """Результат пакета"""
+    results: List[BulkItemResult]
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
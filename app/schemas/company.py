@@ -90,7 +90,10 @@ class Company(CompanyInDB):
 class CompanyList(BaseModel):
     """Схема списка компаний"""
     items: List[Company]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    total_strategy: str = "exact"
@@ -84,7 +84,10 @@ class Contact(ContactInDB):
 class ContactList(BaseModel):
     """Схема списка контактов"""
     items: List[Contact]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    total_strategy: str = "exact"
@@ -93,7 +93,47 @@ class Deal(DealInDB):
 class DealList(BaseModel):
     """Схема списка сделок"""
     items: List[Deal]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    total_strategy: str = "exact"
+
+
+class PipelineDeal(BaseModel):
+    """Карточка сделки в колонке воронки"""
+    id: int
+    title: str
+    amount: Optional[Decimal] = None
+    currency: Optional[str] = None
+    probability: Optional[int] = None
+    contact_id: Optional[int] = None
+    company_id: Optional[int] = None
+    expected_close_date: Optional[datetime] = None
+
+
+class PipelineTotal(BaseModel):
+    """Итоги колонки воронки в одной валюте"""
+    currency: Optional[str] = None
+    count: int
+    amount: Decimal
+    weighted_amount: Decimal  # сумма amount × probability / 100
+
+
+class PipelineColumn(BaseModel):
+    """Колонка воронки: статус, итоги по валютам и крупнейшие сделки"""
+    status: DealStatus
+    count: int
+    totals: List[PipelineTotal]
+    top_deals: List[PipelineDeal]
+    
+    class Config:
+        use_enum_values = True
+
+
+class DealPipeline(BaseModel):
+    """Воронка сделок (канбан-доска) по всем статусам"""
+    columns: List[PipelineColumn]
+    top: int
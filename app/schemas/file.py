@@ -53,7 +53,10 @@ class File(FileInDB):
 class FileList(BaseModel):
     """Схема списка файлов"""
     items: List[File]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    total_strategy: str = "exact"
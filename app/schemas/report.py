@@ -0,0 +1,81 @@
+"""
+Схемы отчетов, построенных по дневным сводкам
+"""
+from typing import List
+from datetime import date
+from decimal import Decimal
+from pydantic import BaseModel
+from app.models.deal import DealStatus
+
+
+class SalesStatusRow(BaseModel):
+    """Сделки одного статуса в одной валюте"""
+    status: DealStatus
+    currency: str
+    count: int
+    amount: Decimal
+    weighted_amount: Decimal  # сумма amount × probability / 100
+    
+    class Config:
+        use_enum_values = True
+
+
+class SalesDayRow(BaseModel):
+    """Сделки, созданные за день, в одной валюте"""
+    day: date
+    currency: str
+    count: int
+    amount: Decimal
+
+
+class SalesReport(BaseModel):
+    """Отчет по продажам менеджера за период (по дате создания сделок)"""
+    user_id: int
+    date_from: date
+    date_to: date
+    count: int
+    by_status: List[SalesStatusRow]
+    by_day: List[SalesDayRow]
+
+
+class ActivityTypeRow(BaseModel):
+    """Активности одного типа и статуса"""
+    type: str
+    status: str
+    count: int
+
+
+class ActivityDayRow(BaseModel):
+    """Активности, созданные за день"""
+    day: date
+    count: int
+
+
+class ActivityReport(BaseModel):
+    """Отчет по активностям менеджера за период (по дате создания активностей)"""
+    user_id: int
+    date_from: date
+    date_to: date
+    count: int
+    by_type: List[ActivityTypeRow]
+    by_day: List[ActivityDayRow]
+
+
+class CurrencyAmount(BaseModel):
+    """Сумма в одной валюте"""
+    currency: str
+    amount: Decimal
+
+
+class OwnerDailySummary(BaseModel):
+    """Итоги дня одного менеджера"""
+    user_id: int
+    deals: int
+    deal_amounts: List[CurrencyAmount]
+    activities: int
+
+
+class DailyReport(BaseModel):
+    """Ежедневный отчет: итоги дня по всем менеджерам"""
+    day: date
+    owners: List[OwnerDailySummary]
@@ -1,18 +1,39 @@
 """
 Сервис для работы с активностями
 """
-from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_
+from sqlalchemy.sql import Select
 from sqlalchemy.orm import selectinload
 
+from app.core.database import dialect_name
+from app.core.fieldsets import load_only_columns
+from app.core.json_filters import json_filters
+from app.core.pagination import Cursor, Page, TotalStrategy, paginate
+from app.core.response_cache import response_cache
+from app.core.search import search_filter, search_rank
 from app.models.activity import Activity
+from app.models.company import Company
+from app.models.contact import Contact
+from app.models.deal import Deal
+from app.models.user import User
 from app.schemas.activity import ActivityCreate, ActivityUpdate
+from app.schemas.bulk import BulkOperation, BulkResponse
+from app.services.bulk_service import BulkService
+from app.services.reminder_service import REMINDER_FIELDS, ReminderService
 
 
 class ActivityService:
     """Сервис для работы с активностями"""
     
+    # Поля подстрочного поиска (в PostgreSQL покрыты trigram-индексами)
+    search_columns = (
+        Activity.title,
+        Activity.description
+    )
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -35,19 +56,19 @@ class ActivityService:
         )
         return result.scalar_one_or_none()
     
-    async def get_activities(
+    def _list_query(
         self,
         owner_id: int,
-        skip: int = 0,
-        limit: int = 100,
         search: Optional[str] = None,
         type: Optional[str] = None,
         status: Optional[str] = None,
         contact_id: Optional[int] = None,
         company_id: Optional[int] = None,
-        deal_id: Optional[int] = None
-    ) -> Tuple[List[Activity], int]:
-        """Получение списка активностей с фильтрацией"""
+        deal_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None
+    ) -> Select:
+        """Запрос активностей владельца со всеми фильтрами списка"""
         query = select(Activity).where(
             and_(
                 Activity.owner_id == owner_id,
@@ -57,11 +78,7 @@ class ActivityService:
         
         # Поиск
         if search:
-            search_filter = or_(
-                Activity.title.ilike(f"%{search}%"),
-                Activity.description.ilike(f"%{search}%")
-            )
-            query = query.where(search_filter)
+            query = query.where(search_filter(self.search_columns, search))
         
         # Фильтр по типу
         if type:
@@ -83,44 +100,69 @@ class ActivityService:
         if deal_id:
             query = query.where(Activity.deal_id == deal_id)
         
-        # Получение общего количества
-        count_query = select(func.count(Activity.id)).where(
-            and_(
-                Activity.owner_id == owner_id,
-                Activity.is_deleted == False
-            )
-        )
+        # Фильтры по тегам и пользовательским полям (в PostgreSQL — по GIN-индексам)
+        if tags or custom_fields:
+            query = query.where(*json_filters(dialect_name(self.db), Activity, tags, custom_fields))
         
-        if search:
-            count_query = count_query.where(search_filter)
-        if type:
-            count_query = count_query.where(Activity.type == type)
-        if status:
-            count_query = count_query.where(Activity.status == status)
-        if contact_id:
-            count_query = count_query.where(Activity.contact_id == contact_id)
-        if company_id:
-            count_query = count_query.where(Activity.company_id == company_id)
-        if deal_id:
-            count_query = count_query.where(Activity.deal_id == deal_id)
-        
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
-        
-        # Получение данных
-        result = await self.db.execute(
-            query.options(
+        return query
+    
+    def get_activities_export_query(
+        self,
+        owner_id: int,
+        search: Optional[str] = None,
+        type: Optional[str] = None,
+        status: Optional[str] = None,
+        contact_id: Optional[int] = None,
+        company_id: Optional[int] = None,
+        deal_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None
+    ) -> Select:
+        """Запрос активностей для потоковой выгрузки (фильтры как у списка)"""
+        return self._list_query(
+            owner_id, search, type, status, contact_id, company_id, deal_id, tags, custom_fields
+        )
+    
+    async def get_activities(
+        self,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        type: Optional[str] = None,
+        status: Optional[str] = None,
+        contact_id: Optional[int] = None,
+        company_id: Optional[int] = None,
+        deal_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None,
+        cursor: Optional[Cursor] = None,
+        total_strategy: Optional[TotalStrategy] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Page:
+        """Получение списка активностей с фильтрацией"""
+        query = self._list_query(
+            owner_id, search, type, status, contact_id, company_id, deal_id, tags, custom_fields
+        )
+        if fields:
+            options = [load_only_columns(Activity, fields)]
+        else:
+            options = [
                 selectinload(Activity.contact),
                 selectinload(Activity.company),
                 selectinload(Activity.deal)
-            )
-            .offset(skip)
-            .limit(limit)
-            .order_by(Activity.created_at.desc())
+            ]
+        return await paginate(
+            self.db,
+            query,
+            Activity,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            total_strategy=total_strategy,
+            rank=search_rank(self.db, self.search_columns, search),
+            options=options
         )
-        
-        activities = result.scalars().all()
-        return activities, total
     
     async def create_activity(self, activity_data: ActivityCreate, owner_id: int) -> Activity:
         """Создание новой активности"""
@@ -131,7 +173,9 @@ class ActivityService:
         
         self.db.add(activity)
         await self.db.commit()
+        await response_cache.invalidate("activities", owner_id)
         await self.db.refresh(activity)
+        await ReminderService(self.db).reschedule([activity])
         return activity
     
     async def update_activity(
@@ -150,7 +194,10 @@ class ActivityService:
             setattr(activity, field, value)
         
         await self.db.commit()
+        await response_cache.invalidate("activities", owner_id)
         await self.db.refresh(activity)
+        if REMINDER_FIELDS.intersection(update_data):
+            await ReminderService(self.db).reschedule([activity])
         return activity
     
     async def delete_activity(self, activity_id: int, owner_id: int) -> bool:
@@ -160,5 +207,36 @@ class ActivityService:
             return False
         
         activity.is_deleted = True
+        activity.deleted_at = datetime.now(timezone.utc)
         await self.db.commit()
+        await response_cache.invalidate("activities", owner_id)
         return True
+    
+    async def bulk_activities(
+        self,
+        operations: List[BulkOperation],
+        owner_id: int,
+        atomic: bool = True
+    ) -> BulkResponse:
+        """Пакетное создание, изменение и удаление активностей"""
+        bulk_service = BulkService(
+            self.db,
+            Activity,
+            "activities",
+            ActivityCreate,
+            ActivityUpdate,
+            references={
+                "contact_id": Contact,
+                "company_id": Company,
+                "deal_id": Deal,
+                "assigned_to_id": User,
+            }
+        )
+        response = await bulk_service.run(operations, owner_id, atomic=atomic)
+        await ReminderService(self.db).reschedule_ids(
+            result.id
+            for result, operation in zip(response.results, operations)
+            if result.status == "created"
+            or (result.status == "updated" and REMINDER_FIELDS.intersection(operation.data))
+        )
+        return response
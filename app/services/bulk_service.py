@@ -0,0 +1,272 @@
+"""
+Сервис пакетных операций (создание, изменение, удаление) над записями владельца
+"""
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+import structlog
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import and_, insert, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.response_cache import response_cache
+from app.schemas.bulk import BulkAction, BulkItemResult, BulkOperation, BulkResponse
+from app.services import rollup_service
+
+logger = structlog.get_logger()
+
+# Подготовленная операция: позиция в пакете, операция, проверенные значения полей
+Prepared = Tuple[int, BulkOperation, Dict[str, Any]]
+
+_DONE = {
+    BulkAction.CREATE: "created",
+    BulkAction.UPDATE: "updated",
+    BulkAction.DELETE: "deleted",
+}
+
+
+class BulkService:
+    """Пакетные операции над одной сущностью.
+    
+    Сначала все операции проверяются: схема данных, существование изменяемых
+    записей и записей по внешним ключам (references: колонка -> модель).
+    normalize_create — приведение значений создаваемой записи, как в create_* сервиса.
+    Одна запись может изменяться или удаляться только одной операцией пакета.
+    Затем операции выполняются группами: создания — одним INSERT ... RETURNING,
+    изменения — executemany UPDATE по первичному ключу, удаления — одним UPDATE.
+    """
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        model,
+        entity: str,
+        create_schema: Type[BaseModel],
+        update_schema: Type[BaseModel],
+        references: Optional[Dict[str, Any]] = None,
+        normalize_create: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    ):
+        self.db = db
+        self.model = model
+        self.entity = entity
+        self.create_schema = create_schema
+        self.update_schema = update_schema
+        self.references = references or {}
+        self.normalize_create = normalize_create
+    
+    async def run(
+        self,
+        operations: List[BulkOperation],
+        owner_id: int,
+        atomic: bool = True
+    ) -> BulkResponse:
+        """Выполнение пакета.
+        
+        atomic=True — одна транзакция; если хоть одна операция не прошла проверку,
+        ничего не применяется (остальные операции получают статус skipped).
+        atomic=False — транзакции по BULK_CHUNK_SIZE операций; ошибочные операции
+        пропускаются, ошибка БД отменяет только свою порцию.
+        """
+        results: List[Optional[BulkItemResult]] = [None] * len(operations)
+        prepared = self._validate(operations, results)
+        await self._check_existing(prepared, owner_id, results)
+        await self._check_references(prepared, owner_id, results)
+        prepared = [item for item in prepared if results[item[0]] is None]
+        
+        if atomic and len(prepared) < len(operations):
+            for index, operation, _ in prepared:
+                results[index] = self._result(index, operation, "skipped", operation.id)
+            return self._response(results)
+        
+        chunk_size = len(prepared) if atomic else settings.BULK_CHUNK_SIZE
+        applied = False
+        for start in range(0, len(prepared), chunk_size):
+            chunk = prepared[start:start + chunk_size]
+            try:
+                await self._execute(chunk, owner_id, results)
+                await self.db.commit()
+                applied = True
+            except DBAPIError as exc:
+                await self.db.rollback()
+                logger.warning("Ошибка пакетной операции", entity=self.entity, error=str(exc.orig))
+                for index, operation, _ in chunk:
+                    results[index] = self._result(
+                        index, operation, "error", operation.id, "Ошибка базы данных при сохранении"
+                    )
+        
+        if applied:
+            await response_cache.invalidate(self.entity, owner_id)
+        return self._response(results)
+    
+    @staticmethod
+    def _result(
+        index: int,
+        operation: BulkOperation,
+        status: str,
+        item_id: Optional[int] = None,
+        error: Optional[str] = None
+    ) -> BulkItemResult:
+        return BulkItemResult(index=index, action=operation.action, status=status, id=item_id, error=error)
+    
+    def _validate(
+        self,
+        operations: List[BulkOperation],
+        results: List[Optional[BulkItemResult]]
+    ) -> List[Prepared]:
+        """Проверка данных схемами сущности и повторов id в пакете"""
+        prepared = []
+        seen_ids = set()
+        for index, operation in enumerate(operations):
+            if operation.action != BulkAction.CREATE:
+                if operation.id is None:
+                    results[index] = self._result(index, operation, "error", error="id обязателен")
+                    continue
+                # Сводки для отчетов считаются по состоянию записи до пакета,
+                # поэтому вторая операция над той же записью отклоняется
+                if operation.id in seen_ids:
+                    results[index] = self._result(
+                        index, operation, "error", operation.id, "Запись уже изменяется в этом пакете"
+                    )
+                    continue
+                seen_ids.add(operation.id)
+            try:
+                if operation.action == BulkAction.CREATE:
+                    values = self.create_schema(**operation.data).model_dump()
+                    if self.normalize_create is not None:
+                        values = self.normalize_create(values)
+                elif operation.action == BulkAction.UPDATE:
+                    values = self.update_schema(**operation.data).model_dump(exclude_unset=True)
+                else:
+                    values = {}
+            except ValidationError as exc:
+                error = "; ".join(
+                    f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in exc.errors()
+                )
+                results[index] = self._result(index, operation, "error", operation.id, error)
+                continue
+            prepared.append((index, operation, values))
+        return prepared
+    
+    async def _existing_ids(self, model, ids: set, owner_id: int) -> set:
+        """id из набора, которые существуют (и принадлежат владельцу, если у модели он есть)"""
+        if not ids:
+            return set()
+        conditions = [model.id.in_(ids)]
+        if hasattr(model, "owner_id"):
+            conditions.append(model.owner_id == owner_id)
+        if hasattr(model, "is_deleted"):
+            conditions.append(model.is_deleted == False)
+        result = await self.db.execute(select(model.id).where(and_(*conditions)))
+        return set(result.scalars())
+    
+    async def _check_existing(
+        self,
+        prepared: List[Prepared],
+        owner_id: int,
+        results: List[Optional[BulkItemResult]]
+    ) -> None:
+        """Изменяемые и удаляемые записи должны существовать"""
+        ids = {operation.id for _, operation, _ in prepared if operation.action != BulkAction.CREATE}
+        found = await self._existing_ids(self.model, ids, owner_id)
+        for index, operation, _ in prepared:
+            if operation.action != BulkAction.CREATE and operation.id not in found:
+                results[index] = self._result(index, operation, "error", operation.id, "Запись не найдена")
+    
+    async def _check_references(
+        self,
+        prepared: List[Prepared],
+        owner_id: int,
+        results: List[Optional[BulkItemResult]]
+    ) -> None:
+        """Записи по внешним ключам должны существовать (по одному запросу на колонку)"""
+        for column, model in self.references.items():
+            ids = {values[column] for _, _, values in prepared if values.get(column) is not None}
+            found = await self._existing_ids(model, ids, owner_id)
+            for index, operation, values in prepared:
+                value = values.get(column)
+                if results[index] is None and value is not None and value not in found:
+                    results[index] = self._result(
+                        index, operation, "error", operation.id, f"{column}: запись {value} не найдена"
+                    )
+    
+    async def _execute(
+        self,
+        chunk: List[Prepared],
+        owner_id: int,
+        results: List[Optional[BulkItemResult]]
+    ) -> None:
+        """Выполнение порции операций в текущей транзакции"""
+        model = self.model
+        now = datetime.now(timezone.utc)
+        groups: Dict[BulkAction, List[Prepared]] = {action: [] for action in BulkAction}
+        for item in chunk:
+            groups[item[1].action].append(item)
+        creates, updates, deletes = (
+            groups[BulkAction.CREATE], groups[BulkAction.UPDATE], groups[BulkAction.DELETE]
+        )
+        
+        # Пакетные INSERT/UPDATE не вызывают событий flush, поэтому сводки для отчетов
+        # обновляются здесь по значениям записей до изменения
+        rollup = rollup_service.ROLLUPS.get(model)
+        changes = []
+        if rollup is not None:
+            before = await rollup_service.snapshot(
+                self.db, rollup, [operation.id for _, operation, _ in updates + deletes]
+            )
+            changes.extend(
+                (None, rollup.defaults({**values, "owner_id": owner_id, "created_at": now}))
+                for _, _, values in creates
+            )
+            changes.extend(
+                (before[operation.id], {**before[operation.id], **values})
+                for _, operation, values in updates if operation.id in before
+            )
+            changes.extend(
+                (before[operation.id], None) for _, operation, _ in deletes if operation.id in before
+            )
+        
+        if creates:
+            result = await self.db.execute(
+                insert(model).returning(model.id, sort_by_parameter_order=True),
+                # created_at задается явно: тот же день попадает в сводку (см. rollup_service._day)
+                [{**values, "owner_id": owner_id, "created_at": now} for _, _, values in creates],
+            )
+            for (index, operation, _), item_id in zip(creates, result.scalars()):
+                results[index] = self._result(index, operation, _DONE[operation.action], item_id)
+        
+        if updates:
+            # ORM bulk UPDATE по первичному ключу: executemany, события модели не вызываются
+            await self.db.execute(
+                update(model).execution_options(synchronize_session=False),
+                [{**values, "id": operation.id, "updated_at": now} for _, operation, values in updates],
+            )
+        
+        if deletes:
+            await self.db.execute(
+                update(model)
+                .where(model.id.in_([operation.id for _, operation, _ in deletes]))
+                .values(is_deleted=True, deleted_at=now, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        
+        for index, operation, _ in updates + deletes:
+            results[index] = self._result(index, operation, _DONE[operation.action], operation.id)
+        
+        if changes:
+            await rollup_service.apply(self.db, rollup, changes)
+    
+    @staticmethod
+    def _response(results: List[BulkItemResult]) -> BulkResponse:
+        counts = {status: 0 for status in ("created", "updated", "deleted", "error")}
+        for result in results:
+            if result.status in counts:
+                counts[result.status] += 1
+        return BulkResponse(
+            results=results,
+            created=counts["created"],
+            updated=counts["updated"],
+            deleted=counts["deleted"],
+            failed=counts["error"],
+        )
@@ -1,18 +1,35 @@
 """
 Сервис для работы с компаниями
 """
-from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_
+from sqlalchemy.sql import Select
 from sqlalchemy.orm import selectinload
 
+from app.core.database import dialect_name
+from app.core.fieldsets import load_only_columns
+from app.core.json_filters import json_filters
+from app.core.pagination import Cursor, Page, TotalStrategy, paginate
+from app.core.response_cache import response_cache
+from app.core.search import search_filter, search_rank
 from app.models.company import Company
+from app.schemas.bulk import BulkOperation, BulkResponse
 from app.schemas.company import CompanyCreate, CompanyUpdate
+from app.services.bulk_service import BulkService
 
 
 class CompanyService:
     """Сервис для работы с компаниями"""
     
+    # Поля подстрочного поиска (в PostgreSQL покрыты trigram-индексами)
+    search_columns = (
+        Company.name,
+        Company.email,
+        Company.website
+    )
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -31,16 +48,16 @@ class CompanyService:
         )
         return result.scalar_one_or_none()
     
-    async def get_companies(
+    def _list_query(
         self,
         owner_id: int,
-        skip: int = 0,
-        limit: int = 100,
         search: Optional[str] = None,
         status: Optional[str] = None,
-        industry: Optional[str] = None
-    ) -> Tuple[List[Company], int]:
-        """Получение списка компаний с фильтрацией"""
+        industry: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None
+    ) -> Select:
+        """Запрос компаний владельца со всеми фильтрами списка"""
         query = select(Company).where(
             and_(
                 Company.owner_id == owner_id,
@@ -50,12 +67,7 @@ class CompanyService:
         
         # Поиск
         if search:
-            search_filter = or_(
-                Company.name.ilike(f"%{search}%"),
-                Company.email.ilike(f"%{search}%"),
-                Company.website.ilike(f"%{search}%")
-            )
-            query = query.where(search_filter)
+            query = query.where(search_filter(self.search_columns, search))
         
         # Фильтр по статусу
         if status:
@@ -65,34 +77,55 @@ class CompanyService:
         if industry:
             query = query.where(Company.industry == industry)
         
-        # Получение общего количества
-        count_query = select(func.count(Company.id)).where(
-            and_(
-                Company.owner_id == owner_id,
-                Company.is_deleted == False
-            )
-        )
-        
-        if search:
-            count_query = count_query.where(search_filter)
-        if status:
-            count_query = count_query.where(Company.status == status)
-        if industry:
-            count_query = count_query.where(Company.industry == industry)
-        
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        # Фильтры по тегам и пользовательским полям (в PostgreSQL — по GIN-индексам)
+        if tags or custom_fields:
+            query = query.where(*json_filters(dialect_name(self.db), Company, tags, custom_fields))
         
-        # Получение данных
-        result = await self.db.execute(
-            query.options(selectinload(Company.parent_company))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Company.created_at.desc())
+        return query
+    
+    def get_companies_export_query(
+        self,
+        owner_id: int,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        industry: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None
+    ) -> Select:
+        """Запрос компаний для потоковой выгрузки (фильтры как у списка)"""
+        return self._list_query(owner_id, search, status, industry, tags, custom_fields)
+    
+    async def get_companies(
+        self,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        industry: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None,
+        cursor: Optional[Cursor] = None,
+        total_strategy: Optional[TotalStrategy] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Page:
+        """Получение списка компаний с фильтрацией"""
+        query = self._list_query(owner_id, search, status, industry, tags, custom_fields)
+        if fields:
+            options = [load_only_columns(Company, fields)]
+        else:
+            options = [selectinload(Company.parent_company)]
+        return await paginate(
+            self.db,
+            query,
+            Company,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            total_strategy=total_strategy,
+            rank=search_rank(self.db, self.search_columns, search),
+            options=options
         )
-        
-        companies = result.scalars().all()
-        return companies, total
     
     async def create_company(self, company_data: CompanyCreate, owner_id: int) -> Company:
         """Создание новой компании"""
@@ -103,6 +136,7 @@ class CompanyService:
         
         self.db.add(company)
         await self.db.commit()
+        await response_cache.invalidate("companies", owner_id)
         await self.db.refresh(company)
         return company
     
@@ -122,6 +156,7 @@ class CompanyService:
             setattr(company, field, value)
         
         await self.db.commit()
+        await response_cache.invalidate("companies", owner_id)
         await self.db.refresh(company)
         return company
     
@@ -132,5 +167,24 @@ class CompanyService:
             return False
         
         company.is_deleted = True
+        company.deleted_at = datetime.now(timezone.utc)
         await self.db.commit()
+        await response_cache.invalidate("companies", owner_id)
         return True
+    
+    async def bulk_companies(
+        self,
+        operations: List[BulkOperation],
+        owner_id: int,
+        atomic: bool = True
+    ) -> BulkResponse:
+        """Пакетное создание, изменение и удаление компаний"""
+        bulk_service = BulkService(
+            self.db,
+            Company,
+            "companies",
+            CompanyCreate,
+            CompanyUpdate,
+            references={"parent_company_id": Company}
+        )
+        return await bulk_service.run(operations, owner_id, atomic=atomic)
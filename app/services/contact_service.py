@@ -1,18 +1,37 @@
 """
 Сервис для работы с контактами
 """
-from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_
+from sqlalchemy.sql import Select
 from sqlalchemy.orm import selectinload
 
+from app.core.database import dialect_name
+from app.core.fieldsets import load_only_columns
+from app.core.json_filters import json_filters
+from app.core.pagination import Cursor, Page, TotalStrategy, paginate
+from app.core.response_cache import response_cache
+from app.core.search import search_filter, search_rank
+from app.models.company import Company
 from app.models.contact import Contact
+from app.schemas.bulk import BulkOperation, BulkResponse
 from app.schemas.contact import ContactCreate, ContactUpdate
+from app.services.bulk_service import BulkService
 
 
 class ContactService:
     """Сервис для работы с контактами"""
     
+    # Поля подстрочного поиска (в PostgreSQL покрыты trigram-индексами)
+    search_columns = (
+        Contact.first_name,
+        Contact.last_name,
+        Contact.email,
+        Contact.phone
+    )
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -31,16 +50,16 @@ class ContactService:
         )
         return result.scalar_one_or_none()
     
-    async def get_contacts(
+    def _list_query(
         self,
         owner_id: int,
-        skip: int = 0,
-        limit: int = 100,
         search: Optional[str] = None,
         status: Optional[str] = None,
-        company_id: Optional[int] = None
-    ) -> Tuple[List[Contact], int]:
-        """Получение списка контактов с фильтрацией"""
+        company_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None
+    ) -> Select:
+        """Запрос контактов владельца со всеми фильтрами списка"""
         query = select(Contact).where(
             and_(
                 Contact.owner_id == owner_id,
@@ -50,13 +69,7 @@ class ContactService:
         
         # Поиск
         if search:
-            search_filter = or_(
-                Contact.first_name.ilike(f"%{search}%"),
-                Contact.last_name.ilike(f"%{search}%"),
-                Contact.email.ilike(f"%{search}%"),
-                Contact.phone.ilike(f"%{search}%")
-            )
-            query = query.where(search_filter)
+            query = query.where(search_filter(self.search_columns, search))
         
         # Фильтр по статусу
         if status:
@@ -66,34 +79,55 @@ class ContactService:
         if company_id:
             query = query.where(Contact.company_id == company_id)
         
-        # Получение общего количества
-        count_query = select(func.count(Contact.id)).where(
-            and_(
-                Contact.owner_id == owner_id,
-                Contact.is_deleted == False
-            )
-        )
-        
-        if search:
-            count_query = count_query.where(search_filter)
-        if status:
-            count_query = count_query.where(Contact.status == status)
-        if company_id:
-            count_query = count_query.where(Contact.company_id == company_id)
-        
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        # Фильтры по тегам и пользовательским полям (в PostgreSQL — по GIN-индексам)
+        if tags or custom_fields:
+            query = query.where(*json_filters(dialect_name(self.db), Contact, tags, custom_fields))
         
-        # Получение данных
-        result = await self.db.execute(
-            query.options(selectinload(Contact.company))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Contact.created_at.desc())
+        return query
+    
+    def get_contacts_export_query(
+        self,
+        owner_id: int,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        company_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None
+    ) -> Select:
+        """Запрос контактов для потоковой выгрузки (фильтры как у списка)"""
+        return self._list_query(owner_id, search, status, company_id, tags, custom_fields)
+    
+    async def get_contacts(
+        self,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        company_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None,
+        cursor: Optional[Cursor] = None,
+        total_strategy: Optional[TotalStrategy] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Page:
+        """Получение списка контактов с фильтрацией"""
+        query = self._list_query(owner_id, search, status, company_id, tags, custom_fields)
+        if fields:
+            options = [load_only_columns(Contact, fields)]
+        else:
+            options = [selectinload(Contact.company)]
+        return await paginate(
+            self.db,
+            query,
+            Contact,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            total_strategy=total_strategy,
+            rank=search_rank(self.db, self.search_columns, search),
+            options=options
         )
-        
-        contacts = result.scalars().all()
-        return contacts, total
     
     async def create_contact(self, contact_data: ContactCreate, owner_id: int) -> Contact:
         """Создание нового контакта"""
@@ -104,6 +138,7 @@ class ContactService:
         
         self.db.add(contact)
         await self.db.commit()
+        await response_cache.invalidate("contacts", owner_id)
         await self.db.refresh(contact)
         return contact
     
@@ -123,6 +158,7 @@ class ContactService:
             setattr(contact, field, value)
         
         await self.db.commit()
+        await response_cache.invalidate("contacts", owner_id)
         await self.db.refresh(contact)
         return contact
     
@@ -133,5 +169,24 @@ class ContactService:
             return False
         
         contact.is_deleted = True
+        contact.deleted_at = datetime.now(timezone.utc)
         await self.db.commit()
+        await response_cache.invalidate("contacts", owner_id)
         return True
+    
+    async def bulk_contacts(
+        self,
+        operations: List[BulkOperation],
+        owner_id: int,
+        atomic: bool = True
+    ) -> BulkResponse:
+        """Пакетное создание, изменение и удаление контактов"""
+        bulk_service = BulkService(
+            self.db,
+            Contact,
+            "contacts",
+            ContactCreate,
+            ContactUpdate,
+            references={"company_id": Company}
+        )
+        return await bulk_service.run(operations, owner_id, atomic=atomic)
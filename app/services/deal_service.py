@@ -1,18 +1,60 @@
 """
 Сервис для работы со сделками
 """
-from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import Integer, and_, cast, func, literal, null, select, union_all
+from sqlalchemy.sql import Select
 from sqlalchemy.orm import selectinload
 
-from app.models.deal import Deal
-from app.schemas.deal import DealCreate, DealUpdate
+from app.core.database import dialect_name
+from app.core.fieldsets import load_only_columns
+from app.core.json_filters import json_filters
+from app.core.pagination import Cursor, Page, TotalStrategy, paginate
+from app.core.response_cache import response_cache
+from app.core.search import search_filter, search_rank
+from app.models.company import Company
+from app.models.contact import Contact
+from app.models.deal import Deal, DealStatus
+from app.schemas.bulk import BulkOperation, BulkResponse
+from app.schemas.deal import (
+    DealCreate,
+    DealPipeline,
+    DealUpdate,
+    PipelineColumn,
+    PipelineDeal,
+    PipelineTotal,
+)
+from app.services.bulk_service import BulkService
+
+
+def _money(value) -> Decimal:
+    """Денежная сумма с точностью до копеек (None — 0)"""
+    return Decimal(value or 0).quantize(Decimal("0.01"))
 
 
 class DealService:
     """Сервис для работы со сделками"""
     
+    # Поля подстрочного поиска (в PostgreSQL покрыты trigram-индексами)
+    search_columns = (
+        Deal.title,
+        Deal.description
+    )
+    
+    # Поля карточки сделки в колонке воронки (кроме currency)
+    pipeline_card_fields = (
+        "id",
+        "title",
+        "amount",
+        "probability",
+        "contact_id",
+        "company_id",
+        "expected_close_date"
+    )
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -34,44 +76,35 @@ class DealService:
         )
         return result.scalar_one_or_none()
     
-    async def get_deals(
+    def _list_query(
         self,
         owner_id: int,
-        skip: int = 0,
-        limit: int = 100,
         search: Optional[str] = None,
         status: Optional[str] = None,
-        manager_id: Optional[int] = None,  # Фильтр по менеджеру
-        contact_id: Optional[int] = None,  # Фильтр по клиенту
-        company_id: Optional[int] = None
-    ) -> Tuple[List[Deal], int]:
-        """Получение списка сделок с фильтрацией"""
+        manager_id: Optional[int] = None,
+        contact_id: Optional[int] = None,
+        company_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None
+    ) -> Select:
+        """Запрос сделок со всеми фильтрами списка"""
         # Базовый фильтр: по умолчанию показываем сделки текущего пользователя
         # Если указан manager_id, фильтруем по нему
-        manager_filter = Deal.owner_id == (manager_id if manager_id else owner_id)
-        
         query = select(Deal).where(
             and_(
-                manager_filter,
+                Deal.owner_id == (manager_id if manager_id else owner_id),
                 Deal.is_deleted == False
             )
         )
         
         # Поиск
-        search_filter = None
         if search:
-            search_filter = or_(
-                Deal.title.ilike(f"%{search}%"),
-                Deal.description.ilike(f"%{search}%")
-            )
-            query = query.where(search_filter)
+            query = query.where(search_filter(self.search_columns, search))
         
         # Фильтр по статусу
         if status:
-            from app.models.deal import DealStatus
             try:
-                status_enum = DealStatus(status)
-                query = query.where(Deal.status == status_enum)
+                query = query.where(Deal.status == DealStatus(status))
             except ValueError:
                 # Если статус невалидный, просто игнорируем фильтр
                 pass
@@ -84,54 +117,174 @@ class DealService:
         if company_id:
             query = query.where(Deal.company_id == company_id)
         
-        # Получение общего количества
-        count_query = select(func.count(Deal.id)).where(
-            and_(
-                manager_filter,
-                Deal.is_deleted == False
-            )
-        )
-        
-        if search_filter:
-            count_query = count_query.where(search_filter)
-        if status:
-            from app.models.deal import DealStatus
-            try:
-                status_enum = DealStatus(status)
-                count_query = count_query.where(Deal.status == status_enum)
-            except ValueError:
-                pass
-        if contact_id:
-            count_query = count_query.where(Deal.contact_id == contact_id)
-        if company_id:
-            count_query = count_query.where(Deal.company_id == company_id)
-        
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        # Фильтры по тегам и пользовательским полям (в PostgreSQL — по GIN-индексам)
+        if tags or custom_fields:
+            query = query.where(*json_filters(dialect_name(self.db), Deal, tags, custom_fields))
         
-        # Получение данных
-        result = await self.db.execute(
-            query.options(
+        return query
+    
+    def get_deals_export_query(
+        self,
+        owner_id: int,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        manager_id: Optional[int] = None,
+        contact_id: Optional[int] = None,
+        company_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None
+    ) -> Select:
+        """Запрос сделок для потоковой выгрузки (фильтры как у списка)"""
+        return self._list_query(
+            owner_id, search, status, manager_id, contact_id, company_id, tags, custom_fields
+        )
+    
+    async def get_deals(
+        self,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        manager_id: Optional[int] = None,  # Фильтр по менеджеру
+        contact_id: Optional[int] = None,  # Фильтр по клиенту
+        company_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None,
+        cursor: Optional[Cursor] = None,
+        total_strategy: Optional[TotalStrategy] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Page:
+        """Получение списка сделок с фильтрацией"""
+        query = self._list_query(
+            owner_id, search, status, manager_id, contact_id, company_id, tags, custom_fields
+        )
+        if fields:
+            options = [load_only_columns(Deal, fields)]
+        else:
+            options = [
                 selectinload(Deal.contact),
                 selectinload(Deal.company),
                 selectinload(Deal.owner)
+            ]
+        return await paginate(
+            self.db,
+            query,
+            Deal,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            total_strategy=total_strategy,
+            rank=search_rank(self.db, self.search_columns, search),
+            options=options
+        )
+    
+    def _pipeline_query(self, owner_id: int, top: int) -> Select:
+        """Итоги по (статус, валюта) и top-N сделок каждого статуса одним запросом.
+        
+        Ветка kind='total' — GROUP BY status, currency; ветка kind='top' — сделки
+        с row_number() OVER (PARTITION BY status ORDER BY amount DESC) <= top.
+        Колонки другой ветки UNION ALL заполнены типизированными NULL.
+        """
+        active = and_(Deal.owner_id == owner_id, Deal.is_deleted == False)
+        card_columns = [getattr(Deal, name) for name in self.pipeline_card_fields]
+        # Ранжирование только по колонкам индекса ix_deals_owner_pipeline (без чтения таблицы),
+        # поля карточек подтягиваются по id для top-N строк. LIMIT не меняет результат,
+        # но дает планировщику верную оценку числа строк для соединения по первичному ключу.
+        ranking = (
+            select(
+                Deal.id,
+                func.row_number().over(
+                    partition_by=Deal.status,
+                    order_by=(Deal.amount.desc().nulls_last(), Deal.id.desc())
+                ).label("position")
+            )
+            .where(active)
+            .subquery()
+        )
+        ranked = (
+            select(ranking)
+            .where(ranking.c.position <= top)
+            .limit(top * len(DealStatus))
+            .subquery()
+        )
+        totals = (
+            select(
+                literal("total").label("kind"),
+                Deal.status,
+                Deal.currency,
+                func.count().label("count"),
+                func.sum(Deal.amount).label("amount_sum"),
+                func.sum(Deal.amount * Deal.probability).label("weighted_sum"),
+                cast(null(), Integer).label("position"),
+                *(cast(null(), column.type).label(column.key) for column in card_columns)
+            )
+            .where(active)
+            .group_by(Deal.status, Deal.currency)
+        )
+        top_deals = (
+            select(
+                literal("top").label("kind"),
+                Deal.status,
+                Deal.currency,
+                cast(null(), Integer).label("count"),
+                cast(null(), Deal.amount.type).label("amount_sum"),
+                cast(null(), Deal.amount.type).label("weighted_sum"),
+                ranked.c.position,
+                *card_columns
             )
-            .offset(skip)
-            .limit(limit)
-            .order_by(Deal.created_at.desc())
+            .join(ranked, ranked.c.id == Deal.id)
         )
+        return union_all(totals, top_deals).order_by("kind", "position", "currency")
+    
+    async def get_pipeline(
+        self,
+        owner_id: int,
+        manager_id: Optional[int] = None,
+        top: int = 5
+    ) -> DealPipeline:
+        """Воронка сделок: по каждому статусу количество, сумма и взвешенная сумма
+        по валютам плюс top-N сделок по сумме. Строки сделок в Python не загружаются.
+        """
+        query = self._pipeline_query(manager_id if manager_id else owner_id, top)
+        result = await self.db.execute(query)
         
-        deals = result.scalars().all()
-        return deals, total
+        columns = {
+            status: {"status": status, "count": 0, "totals": [], "top_deals": []}
+            for status in DealStatus
+        }
+        for row in result.mappings():
+            column = columns[DealStatus(row["status"])]
+            if row["kind"] == "total":
+                column["count"] += row["count"]
+                column["totals"].append(PipelineTotal(
+                    currency=row["currency"],
+                    count=row["count"],
+                    amount=_money(row["amount_sum"]),
+                    weighted_amount=_money((row["weighted_sum"] or 0) / Decimal(100)),
+                ))
+            else:
+                column["top_deals"].append(PipelineDeal(
+                    currency=row["currency"],
+                    **{name: row[name] for name in self.pipeline_card_fields}
+                ))
+        return DealPipeline(
+            columns=[PipelineColumn(**column) for column in columns.values()],
+            top=top
+        )
     
-    async def create_deal(self, deal_data: DealCreate, owner_id: int) -> Deal:
-        """Создание новой сделки"""
-        deal_dict = deal_data.dict()
-        # Убеждаемся, что contact_id и company_id равны None, если они 0 или None
+    @staticmethod
+    def _normalize_references(deal_dict: Dict) -> Dict:
+        """contact_id и company_id, равные 0, означают отсутствие связи (None)"""
         if deal_dict.get('contact_id') == 0:
             deal_dict['contact_id'] = None
         if deal_dict.get('company_id') == 0:
             deal_dict['company_id'] = None
+        return deal_dict
+    
+    async def create_deal(self, deal_data: DealCreate, owner_id: int) -> Deal:
+        """Создание новой сделки"""
+        deal_dict = self._normalize_references(deal_data.dict())
         
         deal = Deal(
             **deal_dict,
@@ -140,6 +293,7 @@ class DealService:
         
         self.db.add(deal)
         await self.db.commit()
+        await response_cache.invalidate("deals", owner_id)
         await self.db.refresh(deal)
         return deal
     
@@ -160,6 +314,7 @@ class DealService:
         
         # updated_at обновится автоматически через event listener
         await self.db.commit()
+        await response_cache.invalidate("deals", owner_id)
         await self.db.refresh(deal)
         return deal
     
@@ -178,6 +333,7 @@ class DealService:
         # updated_at обновится автоматически через event listener
         
         await self.db.commit()
+        await response_cache.invalidate("deals", owner_id)
         await self.db.refresh(deal)
         return deal
     
@@ -188,5 +344,25 @@ class DealService:
             return False
         
         deal.is_deleted = True
+        deal.deleted_at = datetime.now(timezone.utc)
         await self.db.commit()
+        await response_cache.invalidate("deals", owner_id)
         return True
+    
+    async def bulk_deals(
+        self,
+        operations: List[BulkOperation],
+        owner_id: int,
+        atomic: bool = True
+    ) -> BulkResponse:
+        """Пакетное создание, изменение и удаление сделок"""
+        bulk_service = BulkService(
+            self.db,
+            Deal,
+            "deals",
+            DealCreate,
+            DealUpdate,
+            references={"contact_id": Contact, "company_id": Company},
+            normalize_create=self._normalize_references
+        )
+        return await bulk_service.run(operations, owner_id, atomic=atomic)
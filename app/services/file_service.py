@@ -1,12 +1,18 @@
 """
 Сервис для работы с файлами
 """
-from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_
+from sqlalchemy.sql import Select
 from sqlalchemy.orm import selectinload
 
+from app.core.database import dialect_name
+from app.core.json_filters import json_filters
+from app.core.pagination import Cursor, Page, TotalStrategy, paginate
+from app.core.search import search_filter, search_rank
 from app.models.file import File
 from app.schemas.file import FileCreate
 
@@ -14,6 +20,13 @@ from app.schemas.file import FileCreate
 class FileService:
     """Сервис для работы с файлами"""
     
+    # Поля подстрочного поиска (в PostgreSQL покрыты trigram-индексами)
+    search_columns = (
+        File.filename,
+        File.original_filename,
+        File.title
+    )
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -31,19 +44,19 @@ class FileService:
         )
         return result.scalar_one_or_none()
     
-    async def get_files(
+    def _list_query(
         self,
         owner_id: int,
-        skip: int = 0,
-        limit: int = 100,
         search: Optional[str] = None,
         mime_type: Optional[str] = None,
         contact_id: Optional[int] = None,
         company_id: Optional[int] = None,
         deal_id: Optional[int] = None,
-        activity_id: Optional[int] = None
-    ) -> Tuple[List[File], int]:
-        """Получение списка файлов с фильтрацией"""
+        activity_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None
+    ) -> Select:
+        """Запрос файлов владельца со всеми фильтрами списка"""
         query = select(File).where(
             and_(
                 File.owner_id == owner_id,
@@ -53,12 +66,7 @@ class FileService:
         
         # Поиск
         if search:
-            search_filter = or_(
-                File.filename.ilike(f"%{search}%"),
-                File.original_filename.ilike(f"%{search}%"),
-                File.title.ilike(f"%{search}%")
-            )
-            query = query.where(search_filter)
+            query = query.where(search_filter(self.search_columns, search))
         
         # Фильтр по типу файла
         if mime_type:
@@ -80,39 +88,42 @@ class FileService:
         if activity_id:
             query = query.where(File.activity_id == activity_id)
         
-        # Получение общего количества
-        count_query = select(func.count(File.id)).where(
-            and_(
-                File.owner_id == owner_id,
-                File.is_deleted == False
-            )
-        )
-        
-        if search:
-            count_query = count_query.where(search_filter)
-        if mime_type:
-            count_query = count_query.where(File.mime_type == mime_type)
-        if contact_id:
-            count_query = count_query.where(File.contact_id == contact_id)
-        if company_id:
-            count_query = count_query.where(File.company_id == company_id)
-        if deal_id:
-            count_query = count_query.where(File.deal_id == deal_id)
-        if activity_id:
-            count_query = count_query.where(File.activity_id == activity_id)
-        
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        # Фильтры по тегам и пользовательским полям (в PostgreSQL — по GIN-индексам)
+        if tags or custom_fields:
+            query = query.where(*json_filters(dialect_name(self.db), File, tags, custom_fields))
         
-        # Получение данных
-        result = await self.db.execute(
-            query.offset(skip)
-            .limit(limit)
-            .order_by(File.created_at.desc())
+        return query
+    
+    async def get_files(
+        self,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        mime_type: Optional[str] = None,
+        contact_id: Optional[int] = None,
+        company_id: Optional[int] = None,
+        deal_id: Optional[int] = None,
+        activity_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, str]] = None,
+        cursor: Optional[Cursor] = None,
+        total_strategy: Optional[TotalStrategy] = None
+    ) -> Page:
+        """Получение списка файлов с фильтрацией"""
+        query = self._list_query(
+            owner_id, search, mime_type, contact_id, company_id, deal_id, activity_id, tags, custom_fields
+        )
+        return await paginate(
+            self.db,
+            query,
+            File,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            total_strategy=total_strategy,
+            rank=search_rank(self.db, self.search_columns, search)
         )
-        
-        files = result.scalars().all()
-        return files, total
     
     async def upload_file(self, file: UploadFile, file_data: FileCreate, owner_id: int) -> File:
         """Загрузка файла"""
@@ -147,5 +158,6 @@ class FileService:
             return False
         
         file.is_deleted = True
+        file.deleted_at = datetime.now(timezone.utc)
         await self.db.commit()
         return True
@@ -0,0 +1,240 @@
+"""
+Сервис импорта контактов и компаний из CSV
+"""
+import csv
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import JSON, and_, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import dialect_name
+from app.core.fast_json import dumps, loads
+from app.core.response_cache import response_cache
+from app.models.company import Company
+from app.models.contact import Contact
+from app.schemas.company import CompanyCreate
+from app.schemas.contact import ContactCreate
+
+# Строка CSV: номер строки файла и значения по заголовкам
+CsvRow = Tuple[int, Dict[str, Any]]
+
+
+@dataclass
+class ImportReport:
+    """Итог импорта: количество строк, ошибки по строкам и скорость"""
+    total: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    duration: float = 0.0
+    
+    def add_error(self, line: int, messages: List[str]) -> None:
+        self.failed += 1
+        # В отчет попадают первые IMPORT_MAX_ERRORS ошибок, счетчик — все
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "errors": messages})
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "duration": round(self.duration, 3),
+            "rows_per_second": round(self.total / self.duration) if self.duration else None,
+        }
+
+
+class ImportService:
+    """Пакетный импорт записей из CSV.
+    
+    Файл читается построчно пачками по IMPORT_BATCH_SIZE. Пачка валидируется
+    схемой *Create одним вызовом, корректные строки записываются COPY
+    (PostgreSQL) или многострочным INSERT (остальные БД) и фиксируются, ошибки
+    собираются в отчет с номерами строк файла.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def import_contacts(self, file_path: str, owner_id: int) -> ImportReport:
+        """Импорт контактов. Колонка company (название) заменяет company_id."""
+        names, ids = await self._company_map(owner_id)
+        report = await self._import(
+            file_path,
+            owner_id,
+            Contact,
+            ContactCreate,
+            lookups={"company": ("company_id", names)},
+            references={"company_id": ids},
+        )
+        await response_cache.invalidate("contacts", owner_id)
+        return report
+    
+    async def import_companies(self, file_path: str, owner_id: int) -> ImportReport:
+        """Импорт компаний. Колонка parent_company (название) заменяет parent_company_id."""
+        names, ids = await self._company_map(owner_id)
+        report = await self._import(
+            file_path,
+            owner_id,
+            Company,
+            CompanyCreate,
+            lookups={"parent_company": ("parent_company_id", names)},
+            references={"parent_company_id": ids},
+        )
+        await response_cache.invalidate("companies", owner_id)
+        return report
+    
+    async def _company_map(self, owner_id: int) -> Tuple[Dict[str, int], Set[int]]:
+        """Компании владельца: название (без учета регистра) -> id и множество id"""
+        result = await self.db.execute(
+            select(Company.id, Company.name).where(
+                and_(
+                    Company.owner_id == owner_id,
+                    Company.is_deleted == False
+                )
+            )
+        )
+        names: Dict[str, int] = {}
+        ids: Set[int] = set()
+        for company_id, name in result:
+            names.setdefault(name.strip().casefold(), company_id)
+            ids.add(company_id)
+        return names, ids
+    
+    async def _import(
+        self,
+        file_path: str,
+        owner_id: int,
+        model,
+        schema: Type[BaseModel],
+        lookups: Dict[str, Tuple[str, Dict[str, int]]],
+        references: Dict[str, Set[int]]
+    ) -> ImportReport:
+        report = ImportReport()
+        started = time.perf_counter()
+        adapter = TypeAdapter(List[schema])
+        columns = set(schema.model_fields) | set(lookups)
+        json_columns = {
+            column.name for column in model.__table__.columns if isinstance(column.type, JSON)
+        }
+        
+        with open(file_path, newline="", encoding="utf-8-sig") as file:
+            rows = self._read(csv.DictReader(file), columns)
+            while True:
+                batch = list(islice(rows, settings.IMPORT_BATCH_SIZE))
+                if not batch:
+                    break
+                report.total += len(batch)
+                
+                prepared = []
+                for line, values in batch:
+                    error = self._prepare(values, json_columns, lookups)
+                    if error:
+                        report.add_error(line, [error])
+                    else:
+                        prepared.append((line, values))
+                
+                records = []
+                for line, record in self._validate(adapter, prepared, report):
+                    missing = [
+                        name for name, known in references.items()
+                        if record[name] is not None and record[name] not in known
+                    ]
+                    if missing:
+                        report.add_error(line, [f"{name}: запись не найдена" for name in missing])
+                        continue
+                    record["owner_id"] = owner_id
+                    record["is_deleted"] = False
+                    records.append(record)
+                
+                if records:
+                    await self._write(model, records, json_columns)
+                    report.imported += len(records)
+        
+        report.errors.sort(key=lambda error: error["line"])
+        report.duration = time.perf_counter() - started
+        return report
+    
+    @staticmethod
+    def _read(reader: csv.DictReader, columns: Set[str]) -> Iterator[CsvRow]:
+        """Строки файла с номером строки; пустые значения и лишние колонки отбрасываются"""
+        for raw in reader:
+            yield reader.line_num, {
+                key: value for key, value in raw.items()
+                if key in columns and value not in (None, "")
+            }
+    
+    @staticmethod
+    def _prepare(
+        values: Dict[str, Any],
+        json_columns: Set[str],
+        lookups: Dict[str, Tuple[str, Dict[str, int]]]
+    ) -> Optional[str]:
+        """Разбор JSON-колонок и замена названий на id. Возвращает текст ошибки."""
+        for name in json_columns.intersection(values):
+            try:
+                values[name] = loads(values[name])
+            except ValueError:
+                return f"{name}: некорректный JSON"
+        for column, (target, ids_by_name) in lookups.items():
+            name = values.pop(column, None)
+            if name is None or target in values:
+                continue
+            target_id = ids_by_name.get(name.strip().casefold())
+            if target_id is None:
+                return f"{column}: «{name}» не найдена"
+            values[target] = target_id
+        return None
+    
+    @staticmethod
+    def _validate(
+        adapter: TypeAdapter,
+        rows: List[CsvRow],
+        report: ImportReport
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """Валидация пачки одним вызовом; строки с ошибками уходят в отчет.
+        
+        Возвращает номера строк и значения схемы (dict) для корректных строк.
+        """
+        try:
+            items = adapter.validate_python([values for _, values in rows])
+        except ValidationError as exc:
+            messages = defaultdict(list)
+            for error in exc.errors():
+                index, *loc = error["loc"]
+                messages[index].append(f"{'.'.join(map(str, loc))}: {error['msg']}")
+            for index in sorted(messages):
+                report.add_error(rows[index][0], messages[index])
+            rows = [row for index, row in enumerate(rows) if index not in messages]
+            items = adapter.validate_python([values for _, values in rows])
+        return [(line, record) for (line, _), record in zip(rows, adapter.dump_python(items))]
+    
+    async def _write(self, model, records: List[Dict[str, Any]], json_columns: Set[str]) -> None:
+        """Запись пачки: COPY в PostgreSQL, многострочный INSERT в остальных БД"""
+        if dialect_name(self.db) == "postgresql":
+            columns = list(records[0])
+            values = itemgetter(*columns)
+            # asyncpg передает json/jsonb текстом
+            json_indexes = [index for index, name in enumerate(columns) if name in json_columns]
+            rows = []
+            for record in records:
+                row = list(values(record))
+                for index in json_indexes:
+                    row[index] = dumps(row[index]).decode()
+                rows.append(row)
+            connection = await self.db.connection()
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                model.__tablename__, columns=columns, records=rows
+            )
+        else:
+            await self.db.execute(insert(model), records)
+        await self.db.commit()
@@ -0,0 +1,216 @@
+"""
+Окончательное удаление мягко удаленных записей.
+
+Записи с is_deleted = true, удаленные раньше PURGE_RETENTION_DAYS назад (deleted_at,
+для записей, удаленных до появления deleted_at, — updated_at), удаляются пакетами
+по PURGE_BATCH_SIZE в порядке первичного ключа. Каждый пакет — отдельная короткая
+транзакция: выбор id по частичному индексу ix_<таблица>_purge и один DELETE по этим
+id. В PostgreSQL пакет ждет блокировку не дольше PURGE_LOCK_TIMEOUT_MS и при неудаче
+пропускается до следующего запуска. Скорость ограничена PURGE_MAX_ROWS_PER_SECOND,
+время одного запуска — PURGE_MAX_RUNTIME_SECONDS.
+
+Таблицы очищаются в порядке внешних ключей (файлы → активности → сделки → контакты →
+компании): к моменту очистки родителя удаленные дочерние записи уже удалены. Записи,
+на которые еще ссылаются другие записи (живые или удаленные позже срока хранения),
+остаются; проверка ссылок идет по индексам ix_<таблица>_<колонка>_ref.
+
+Дневные сводки (app/services/rollup_service.py) учитывают только неудаленные записи,
+поэтому очистка их не меняет.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+from sqlalchemy import Column, and_, delete, exists, func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import Base, dialect_name
+from app.models.activity import Activity
+from app.models.company import Company
+from app.models.contact import Contact
+from app.models.deal import Deal
+from app.models.file import File
+
+logger = structlog.get_logger()
+
+# Порядок очистки: дочерние таблицы раньше родительских
+PURGE_ORDER = (File, Activity, Deal, Contact, Company)
+
+
+@dataclass
+class PurgeReport:
+    """Итог очистки таблицы: выбрано, удалено, оставлено из-за ссылок и из-за ошибок пакетов"""
+    table: str
+    selected: int = 0
+    deleted: int = 0
+    referenced: int = 0
+    failed: int = 0
+    batches: int = 0
+    duration: float = 0.0
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "table": self.table,
+            "selected": self.selected,
+            "deleted": self.deleted,
+            "referenced": self.referenced,
+            "failed": self.failed,
+            "batches": self.batches,
+            "duration": round(self.duration, 3),
+            "rows_per_second": round(self.deleted / self.duration) if self.duration else None,
+        }
+
+
+def _references(model) -> List[Column]:
+    """Колонки всех таблиц с внешним ключом на model"""
+    return [
+        foreign_key.parent
+        for table in Base.metadata.tables.values()
+        for foreign_key in table.foreign_keys
+        if foreign_key.column.table is model.__table__
+    ]
+
+
+def _local_upload_path(file_path: Optional[str]) -> Optional[Path]:
+    """Путь к файлу в UPLOAD_ROOT по file_path записи (URL под UPLOAD_URL_PREFIX)"""
+    prefix = f"{settings.UPLOAD_URL_PREFIX.rstrip('/')}/"
+    if not file_path or not file_path.startswith(prefix):
+        return None
+    root = Path(settings.UPLOAD_ROOT).resolve()
+    path = (root / file_path[len(prefix):]).resolve()
+    try:
+        path.relative_to(root)
+    except ValueError:
+        return None
+    return path
+
+
+def remove_old_exports(now: Optional[datetime] = None) -> int:
+    """Удаление выгрузок UPLOAD_ROOT/exports старше EXPORT_RETENTION_DAYS; число удаленных файлов"""
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=settings.EXPORT_RETENTION_DAYS)).timestamp()
+    directory = Path(settings.UPLOAD_ROOT) / "exports"
+    if not directory.is_dir():
+        return 0
+    removed = 0
+    for path in directory.iterdir():
+        if path.is_file() and path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+class PurgeService:
+    """Пакетное окончательное удаление мягко удаленных записей"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def purge(
+        self,
+        progress: Optional[Callable[[List[PurgeReport]], None]] = None,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Очистка всех таблиц PURGE_ORDER; progress вызывается после каждого пакета"""
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=settings.PURGE_RETENTION_DAYS)
+        deadline = time.monotonic() + settings.PURGE_MAX_RUNTIME_SECONDS
+        reports: List[PurgeReport] = []
+        removed_files = 0
+        complete = True
+        for model in PURGE_ORDER:
+            report = PurgeReport(model.__tablename__)
+            reports.append(report)
+            complete, removed = await self._purge_table(model, cutoff, deadline, report, reports, progress)
+            removed_files += removed
+            logger.info("Очистка удаленных записей", **report.as_dict())
+            if not complete:
+                # Оставшееся (и родительские таблицы) очистит следующий запуск
+                logger.warning("Очистка остановлена по PURGE_MAX_RUNTIME_SECONDS", table=report.table)
+                break
+        return {
+            "cutoff": cutoff.isoformat(),
+            "complete": complete,
+            "tables": [report.as_dict() for report in reports],
+            "files_removed": removed_files,
+        }
+    
+    def _candidates(self, model, cutoff: datetime, after_id: int):
+        """Следующий пакет id удаленных записей старше срока хранения"""
+        deleted_at = func.coalesce(model.deleted_at, model.updated_at)
+        return (
+            select(model.id)
+            .where(model.is_deleted == True, model.id > after_id, deleted_at < cutoff)
+            .order_by(model.id)
+            .limit(settings.PURGE_BATCH_SIZE)
+        )
+    
+    def _delete(self, model, ids: List[int]):
+        """DELETE пакета без записей, на которые еще есть ссылки"""
+        conditions = [model.id.in_(ids), model.is_deleted == True]
+        for column in _references(model):
+            # Псевдоним: для ссылок таблицы на саму себя (parent_company_id)
+            referencing = column.table.alias()
+            conditions.append(~exists().where(referencing.c[column.key] == model.id))
+        returning = [model.id, model.file_path] if model is File else [model.id]
+        return delete(model).where(and_(*conditions)).returning(*returning)
+    
+    async def _purge_table(self, model, cutoff, deadline, report, reports, progress):
+        """Очистка одной таблицы; (успели ли до deadline, число удаленных файлов с диска)"""
+        started = time.monotonic()
+        after_id = 0
+        removed_files = 0
+        try:
+            while True:
+                if time.monotonic() >= deadline:
+                    return False, removed_files
+                batch_started = time.monotonic()
+                if dialect_name(self.db) == "postgresql":
+                    await self.db.execute(text(f"SET LOCAL lock_timeout = '{int(settings.PURGE_LOCK_TIMEOUT_MS)}ms'"))
+                ids = list((await self.db.execute(self._candidates(model, cutoff, after_id))).scalars())
+                if not ids:
+                    await self.db.rollback()
+                    return True, removed_files
+                after_id = ids[-1]
+                try:
+                    rows = (await self.db.execute(self._delete(model, ids))).all()
+                    await self.db.commit()
+                except DBAPIError as exc:
+                    # Блокировка не получена за PURGE_LOCK_TIMEOUT_MS или на запись появилась
+                    # ссылка после проверки: пакет остается до следующего запуска
+                    await self.db.rollback()
+                    report.failed += len(ids)
+                    logger.warning("Пакет очистки пропущен", table=report.table, first_id=ids[0], error=str(exc))
+                else:
+                    report.deleted += len(rows)
+                    report.referenced += len(ids) - len(rows)
+                    if model is File:
+                        removed_files += self._remove_uploads(row.file_path for row in rows)
+                report.selected += len(ids)
+                report.batches += 1
+                report.duration = time.monotonic() - started
+                if progress is not None:
+                    progress(reports)
+                # Ограничение скорости: пакет из N записей занимает не меньше N / PURGE_MAX_ROWS_PER_SECOND
+                pause = len(ids) / settings.PURGE_MAX_ROWS_PER_SECOND - (time.monotonic() - batch_started)
+                if pause > 0:
+                    await asyncio.sleep(pause)
+        finally:
+            report.duration = time.monotonic() - started
+    
+    @staticmethod
+    def _remove_uploads(file_paths) -> int:
+        """Удаление с диска файлов удаленных записей files"""
+        removed = 0
+        for file_path in file_paths:
+            path = _local_upload_path(file_path)
+            if path is not None and path.is_file():
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
@@ -0,0 +1,185 @@
+"""
+Сервис напоминаний об активностях.
+
+Напоминание отправляется за REMINDER_ADVANCE_MINUTES до scheduled_at (или due_date,
+если scheduled_at не задан) ожидающей (status = 'pending') активности исполнителю,
+а если его нет — владельцу.
+
+Каждый тик send_reminders сканирует только новое окно времени (high-water mark,
+now + REMINDER_LOOKAHEAD_SECONDS] по индексам ix_activities_reminders_*, кладет
+найденные напоминания в очередь (app/core/reminder_queue.py) и передает в Celery
+те, что наступают до следующего тика, с eta = время напоминания. Работа тика
+зависит от числа напоминаний в окне, а не от размера таблицы.
+
+Активности, созданные или перенесенные внутрь уже просканированного окна,
+добавляются в очередь при записи (reschedule). Отправка проверяет, что
+напоминание не устарело (активность не удалена, не закрыта и не перенесена).
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Optional
+
+import structlog
+from sqlalchemy import and_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.reminder_queue import parse_member, reminder_member, reminder_queue
+from app.models.activity import Activity
+
+logger = structlog.get_logger()
+
+# Поля активности, от которых зависят время и получатель напоминания
+REMINDER_FIELDS = frozenset({"status", "scheduled_at", "due_date", "assigned_to_id", "is_deleted"})
+
+_COLUMNS = (
+    Activity.id,
+    Activity.owner_id,
+    Activity.assigned_to_id,
+    Activity.status,
+    Activity.is_deleted,
+    Activity.scheduled_at,
+    Activity.due_date,
+)
+
+
+def _utc(value: datetime) -> datetime:
+    """Время с часовым поясом UTC (значения без пояса в БД хранятся в UTC)"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _naive(value: datetime) -> datetime:
+    """Время UTC без пояса для сравнения с колонками DateTime"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def remind_at(activity) -> Optional[datetime]:
+    """Время напоминания (UTC) для активности или строки с полями scheduled_at/due_date"""
+    moment = activity.scheduled_at or activity.due_date
+    if moment is None:
+        return None
+    return _utc(moment) - timedelta(minutes=settings.REMINDER_ADVANCE_MINUTES)
+
+
+def recipient(activity) -> int:
+    """Получатель напоминания: исполнитель или владелец"""
+    return activity.assigned_to_id or activity.owner_id
+
+
+class ReminderService:
+    """Сканирование окна напоминаний и передача наступающих в отправку"""
+    
+    def __init__(self, db: AsyncSession, queue=None):
+        self.db = db
+        self.queue = queue if queue is not None else reminder_queue
+    
+    @staticmethod
+    def _window_query(since: datetime, until: datetime):
+        """Ожидающие активности с scheduled_at (или due_date без scheduled_at) в (since, until]"""
+        pending = and_(Activity.status == "pending", Activity.is_deleted == False)
+        by_scheduled = select(*_COLUMNS).where(
+            pending,
+            Activity.scheduled_at > since,
+            Activity.scheduled_at <= until
+        )
+        by_due_date = select(*_COLUMNS).where(
+            pending,
+            Activity.scheduled_at.is_(None),
+            Activity.due_date > since,
+            Activity.due_date <= until
+        )
+        return union_all(by_scheduled, by_due_date)
+    
+    async def tick(
+        self,
+        dispatch: Callable[[int, int, datetime], None],
+        now: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """Один тик: сканирование нового окна и передача наступающих напоминаний в dispatch.
+        
+        dispatch(activity_id, user_id, remind_at) вызывается для напоминаний, время которых
+        не позже следующего тика; просроченные (в пределах REMINDER_GRACE_SECONDS после
+        простоя) передаются с прошедшим временем и отправляются сразу.
+        """
+        now = now or datetime.now(timezone.utc)
+        high_water_mark = await self.queue.get_high_water_mark()
+        since = (
+            datetime.fromtimestamp(high_water_mark, timezone.utc)
+            if high_water_mark is not None
+            else now - timedelta(seconds=settings.REMINDER_GRACE_SECONDS)
+        )
+        until = now + timedelta(seconds=settings.REMINDER_LOOKAHEAD_SECONDS)
+        
+        scanned = 0
+        if until > since:
+            advance = timedelta(minutes=settings.REMINDER_ADVANCE_MINUTES)
+            result = await self.db.execute(self._window_query(_naive(since + advance), _naive(until + advance)))
+            items = {
+                reminder_member(row.id, recipient(row)): remind_at(row).timestamp()
+                for row in result
+            }
+            # Граница сдвигается только после записи в очередь: сбой между ними
+            # приведет к повторному сканированию окна, а не к потере напоминаний
+            await self.queue.push(items)
+            await self.queue.set_high_water_mark(until.timestamp())
+            scanned = len(items)
+        
+        next_tick = now + timedelta(seconds=settings.REMINDER_INTERVAL_SECONDS)
+        due = await self.queue.pop_due(next_tick.timestamp())
+        for member, score in due:
+            activity_id, user_id = parse_member(member)
+            dispatch(activity_id, user_id, datetime.fromtimestamp(score, timezone.utc))
+        return {"scanned": scanned, "dispatched": len(due), "queued": await self.queue.size()}
+    
+    async def reschedule(self, activities: Iterable, now: Optional[datetime] = None) -> None:
+        """Постановка в очередь напоминаний созданных или измененных активностей.
+        
+        Нужна для активностей, время напоминания которых уже внутри просканированного
+        окна; остальные найдет следующий тик (повторная постановка ничего не меняет).
+        """
+        now = now or datetime.now(timezone.utc)
+        earliest = now - timedelta(seconds=settings.REMINDER_GRACE_SECONDS)
+        latest = now + timedelta(seconds=settings.REMINDER_LOOKAHEAD_SECONDS)
+        items = {}
+        for activity in activities:
+            if activity.status != "pending" or activity.is_deleted:
+                continue
+            moment = remind_at(activity)
+            if moment is not None and earliest <= moment <= latest:
+                items[reminder_member(activity.id, recipient(activity))] = moment.timestamp()
+        if not items:
+            return
+        try:
+            await self.queue.push(items)
+        except Exception as exc:
+            # Недоступная очередь не должна ломать запись активности
+            logger.warning("Не удалось поставить напоминания в очередь", error=str(exc))
+    
+    async def reschedule_ids(self, activity_ids: Iterable[int]) -> None:
+        """reschedule для активностей по id (после пакетных операций)"""
+        activity_ids = list(activity_ids)
+        if not activity_ids:
+            return
+        result = await self.db.execute(select(*_COLUMNS).where(Activity.id.in_(activity_ids)))
+        await self.reschedule(result.all())
+    
+    async def get_due_activity(
+        self,
+        activity_id: int,
+        user_id: int,
+        expected: Optional[datetime] = None
+    ) -> Optional[Activity]:
+        """Активность, если напоминание еще актуально: она ожидает выполнения, не удалена,
+        а время напоминания (если передано expected) и получатель не изменились
+        """
+        activity = await self.db.get(Activity, activity_id)
+        if activity is None or activity.is_deleted or activity.status != "pending":
+            return None
+        if recipient(activity) != user_id:
+            return None
+        if expected is not None:
+            moment = remind_at(activity)
+            if moment is None or abs((moment - _utc(expected)).total_seconds()) >= 1:
+                return None
+        return activity
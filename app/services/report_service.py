@@ -0,0 +1,155 @@
+"""
+Сервис отчетов по дневным сводкам
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.deal import DealStatus
+from app.models.stats import ActivityDailyStats, DealDailyStats
+from app.schemas.report import (
+    ActivityDayRow,
+    ActivityReport,
+    ActivityTypeRow,
+    CurrencyAmount,
+    DailyReport,
+    OwnerDailySummary,
+    SalesDayRow,
+    SalesReport,
+    SalesStatusRow,
+)
+from app.services.deal_service import _money
+
+
+class ReportService:
+    """Отчеты читают только сводки deal_daily_stats и activity_daily_stats.
+    
+    Запросы за период одного менеджера — диапазон по первичному ключу
+    (owner_id, day, ...), поэтому время не зависит от числа сделок и активностей,
+    а только от числа дней периода.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def sales_report(self, owner_id: int, date_from: date, date_to: date) -> SalesReport:
+        """Сделки, созданные с date_from по date_to включительно: по статусам и по дням"""
+        period = and_(
+            DealDailyStats.owner_id == owner_id,
+            DealDailyStats.day.between(date_from, date_to),
+            DealDailyStats.count != 0
+        )
+        by_status = await self.db.execute(
+            select(
+                DealDailyStats.status,
+                DealDailyStats.currency,
+                func.sum(DealDailyStats.count).label("count"),
+                func.sum(DealDailyStats.amount_sum).label("amount_sum"),
+                func.sum(DealDailyStats.weighted_sum).label("weighted_sum")
+            )
+            .where(period)
+            .group_by(DealDailyStats.status, DealDailyStats.currency)
+            .order_by(DealDailyStats.status, DealDailyStats.currency)
+        )
+        status_rows = [
+            SalesStatusRow(
+                status=DealStatus(row.status),
+                currency=row.currency,
+                count=row.count,
+                amount=_money(row.amount_sum),
+                weighted_amount=_money((row.weighted_sum or 0) / Decimal(100)),
+            )
+            for row in by_status
+        ]
+        by_day = await self.db.execute(
+            select(
+                DealDailyStats.day,
+                DealDailyStats.currency,
+                func.sum(DealDailyStats.count).label("count"),
+                func.sum(DealDailyStats.amount_sum).label("amount_sum")
+            )
+            .where(period)
+            .group_by(DealDailyStats.day, DealDailyStats.currency)
+            .order_by(DealDailyStats.day, DealDailyStats.currency)
+        )
+        return SalesReport(
+            user_id=owner_id,
+            date_from=date_from,
+            date_to=date_to,
+            count=sum(row.count for row in status_rows),
+            by_status=status_rows,
+            by_day=[
+                SalesDayRow(day=row.day, currency=row.currency, count=row.count, amount=_money(row.amount_sum))
+                for row in by_day
+            ],
+        )
+    
+    async def activity_report(self, owner_id: int, date_from: date, date_to: date) -> ActivityReport:
+        """Активности, созданные с date_from по date_to включительно: по типам и по дням"""
+        period = and_(
+            ActivityDailyStats.owner_id == owner_id,
+            ActivityDailyStats.day.between(date_from, date_to),
+            ActivityDailyStats.count != 0
+        )
+        by_type = await self.db.execute(
+            select(
+                ActivityDailyStats.type,
+                ActivityDailyStats.status,
+                func.sum(ActivityDailyStats.count).label("count")
+            )
+            .where(period)
+            .group_by(ActivityDailyStats.type, ActivityDailyStats.status)
+            .order_by(ActivityDailyStats.type, ActivityDailyStats.status)
+        )
+        type_rows = [ActivityTypeRow(type=row.type, status=row.status, count=row.count) for row in by_type]
+        by_day = await self.db.execute(
+            select(ActivityDailyStats.day, func.sum(ActivityDailyStats.count).label("count"))
+            .where(period)
+            .group_by(ActivityDailyStats.day)
+            .order_by(ActivityDailyStats.day)
+        )
+        return ActivityReport(
+            user_id=owner_id,
+            date_from=date_from,
+            date_to=date_to,
+            count=sum(row.count for row in type_rows),
+            by_type=type_rows,
+            by_day=[ActivityDayRow(day=row.day, count=row.count) for row in by_day],
+        )
+    
+    async def daily_report(self, day: date) -> DailyReport:
+        """Итоги дня по всем менеджерам: созданные сделки (суммы по валютам) и активности"""
+        owners: Dict[int, Dict] = defaultdict(lambda: {"deals": 0, "deal_amounts": [], "activities": 0})
+        deals = await self.db.execute(
+            select(
+                DealDailyStats.owner_id,
+                DealDailyStats.currency,
+                func.sum(DealDailyStats.count).label("count"),
+                func.sum(DealDailyStats.amount_sum).label("amount_sum")
+            )
+            .where(DealDailyStats.day == day, DealDailyStats.count != 0)
+            .group_by(DealDailyStats.owner_id, DealDailyStats.currency)
+            .order_by(DealDailyStats.owner_id, DealDailyStats.currency)
+        )
+        for row in deals:
+            summary = owners[row.owner_id]
+            summary["deals"] += row.count
+            summary["deal_amounts"].append(CurrencyAmount(currency=row.currency, amount=_money(row.amount_sum)))
+        activities = await self.db.execute(
+            select(ActivityDailyStats.owner_id, func.sum(ActivityDailyStats.count).label("count"))
+            .where(ActivityDailyStats.day == day, ActivityDailyStats.count != 0)
+            .group_by(ActivityDailyStats.owner_id)
+        )
+        for row in activities:
+            owners[row.owner_id]["activities"] = row.count
+        return DailyReport(
+            day=day,
+            owners=[
+                OwnerDailySummary(user_id=owner_id, **summary)
+                for owner_id, summary in sorted(owners.items())
+            ],
+        )
@@ -0,0 +1,326 @@
+"""
+Инкрементальное обновление дневных сводок (app/models/stats.py).
+
+Каждая неудаленная запись сделки или активности вносит в строку сводки
+(owner_id, day, статус/тип, ...) вклад: count=1 и суммы. При записи через ORM
+(before_flush) и через BulkService вычисляется разность вкладов до и после
+изменения, и она прибавляется к строкам сводок одним INSERT ... ON CONFLICT
+DO UPDATE в той же транзакции. Значения до изменения читаются из БД с
+блокировкой строк (FOR UPDATE), поэтому сводки откатываются вместе с записями
+и не расходятся с ними при конкурентных изменениях.
+
+Записи в обход сервисов (ручной SQL) сводки не видят; для исправления
+расхождений есть rebuild(), пересчитывающий сводки из исходных таблиц.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, cast, delete, event, func, inspect, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_name
+from app.models.activity import Activity
+from app.models.deal import Deal, DealStatus
+from app.models.stats import ActivityDailyStats, DealDailyStats
+
+# Значения полей исходной записи -> (ключ строки сводки, значения мер)
+Contribution = Tuple[Tuple[Any, ...], Tuple[Any, ...]]
+
+
+def _day(value: Optional[datetime]) -> date:
+    """День создания записи в UTC.
+    
+    created_at новых записей задается явно до вставки (_rollup_flush, BulkService),
+    чтобы день в сводке совпадал с днем, который по той же колонке посчитает rebuild().
+    """
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _deal_status(value) -> DealStatus:
+    """Статус сделки из члена перечисления, его имени или значения"""
+    if isinstance(value, DealStatus):
+        return value
+    if value in DealStatus.__members__:
+        return DealStatus[value]
+    return DealStatus(value)
+
+
+class Rollup:
+    """Сводка по модели: какие поля читать, как получить ключ и меры строки"""
+    
+    def __init__(
+        self,
+        model,
+        stats_model,
+        fields: Sequence[str],
+        keys: Sequence[str],
+        measures: Sequence[str],
+        contribute: Callable[[Dict[str, Any]], Contribution],
+        aggregate: Callable[[Any], list]
+    ):
+        self.model = model
+        self.stats_model = stats_model
+        self.fields = tuple(fields)
+        self.keys = tuple(keys)
+        self.measures = tuple(measures)
+        self._contribute = contribute
+        self._aggregate = aggregate
+    
+    def contribution(self, values: Optional[Dict[str, Any]]) -> Optional[Contribution]:
+        """Вклад записи в сводку; удаленная или отсутствующая запись вклада не дает"""
+        if values is None or values.get("is_deleted"):
+            return None
+        return self._contribute(values)
+    
+    def defaults(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Значения новой записи с подставленными скалярными умолчаниями колонок"""
+        result = dict(values)
+        for field in self.fields:
+            if result.get(field) is not None:
+                continue
+            default = self.model.__table__.c[field].default
+            result[field] = default.arg if default is not None and default.is_scalar else None
+        return result
+    
+    def deltas(self, changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]) -> List[Dict[str, Any]]:
+        """Строки приращений сводки по парам (значения до, значения после).
+        
+        Приращения с одинаковым ключом складываются, нулевые отбрасываются;
+        строки упорядочены по ключу, чтобы параллельные транзакции блокировали
+        строки сводки в одном порядке.
+        """
+        totals: Dict[tuple, List[Any]] = defaultdict(lambda: [0] * len(self.measures))
+        for old, new in changes:
+            for values, sign in ((old, -1), (new, 1)):
+                contribution = self.contribution(values)
+                if contribution is None:
+                    continue
+                key, measures = contribution
+                accumulated = totals[key]
+                for position, measure in enumerate(measures):
+                    accumulated[position] += sign * measure
+        return [
+            {**dict(zip(self.keys, key)), **dict(zip(self.measures, measures))}
+            for key, measures in sorted(totals.items(), key=lambda item: _sort_key(item[0]))
+            if any(measures)
+        ]
+    
+    def upsert(self, dialect: str):
+        """INSERT ... ON CONFLICT (ключ) DO UPDATE SET мера = мера + excluded.мера"""
+        table = self.stats_model.__table__
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=list(self.keys),
+            set_={name: table.c[name] + statement.excluded[name] for name in self.measures}
+        )
+    
+    def aggregate_query(self, dialect: str, owner_id: Optional[int] = None):
+        """SELECT строк сводки из исходной таблицы (для rebuild)"""
+        model = self.model
+        if dialect == "postgresql":
+            day = cast(func.timezone("UTC", model.created_at), Date)
+        else:
+            day = func.date(model.created_at)
+        columns = self._aggregate(day)
+        query = (
+            select(*columns)
+            .where(model.is_deleted == False)
+            .group_by(*columns[:len(self.keys)])
+        )
+        if owner_id is not None:
+            query = query.where(model.owner_id == owner_id)
+        return query
+
+
+def _sort_key(key: tuple) -> tuple:
+    """Ключ сортировки строк сводки (перечисления сравниваются по имени)"""
+    return tuple(getattr(part, "name", part) for part in key)
+
+
+def _deal_contribution(values: Dict[str, Any]) -> Contribution:
+    """Сделка: count, сумма и сумма amount * probability"""
+    amount = Decimal(values.get("amount") or 0)
+    probability = values.get("probability") or 0
+    key = (
+        values["owner_id"],
+        _day(values.get("created_at")),
+        _deal_status(values["status"]),
+        values.get("currency") or "",
+    )
+    return key, (1, amount, amount * probability)
+
+
+def _deal_aggregate(day) -> list:
+    """Колонки ключа и мер сводки сделок в порядке keys + measures"""
+    return [
+        Deal.owner_id,
+        day,
+        Deal.status,
+        func.coalesce(Deal.currency, literal("")),
+        func.count(),
+        func.coalesce(func.sum(Deal.amount), 0),
+        func.coalesce(func.sum(Deal.amount * Deal.probability), 0),
+    ]
+
+
+def _activity_contribution(values: Dict[str, Any]) -> Contribution:
+    """Активность: count"""
+    key = (
+        values["owner_id"],
+        _day(values.get("created_at")),
+        values["type"],
+        values.get("status") or "",
+    )
+    return key, (1,)
+
+
+def _activity_aggregate(day) -> list:
+    """Колонки ключа и мер сводки активностей в порядке keys + measures"""
+    return [
+        Activity.owner_id,
+        day,
+        Activity.type,
+        func.coalesce(Activity.status, literal("")),
+        func.count(),
+    ]
+
+
+DEAL_ROLLUP = Rollup(
+    Deal,
+    DealDailyStats,
+    fields=("owner_id", "created_at", "status", "currency", "amount", "probability", "is_deleted"),
+    keys=("owner_id", "day", "status", "currency"),
+    measures=("count", "amount_sum", "weighted_sum"),
+    contribute=_deal_contribution,
+    aggregate=_deal_aggregate,
+)
+
+ACTIVITY_ROLLUP = Rollup(
+    Activity,
+    ActivityDailyStats,
+    fields=("owner_id", "created_at", "type", "status", "is_deleted"),
+    keys=("owner_id", "day", "type", "status"),
+    measures=("count",),
+    contribute=_activity_contribution,
+    aggregate=_activity_aggregate,
+)
+
+# Сводки по исходной модели
+ROLLUPS: Dict[Any, Rollup] = {
+    Deal: DEAL_ROLLUP,
+    Activity: ACTIVITY_ROLLUP,
+}
+
+
+def _object_values(rollup: Rollup, obj, changed_only: bool = False) -> Dict[str, Any]:
+    """Значения полей ORM-объекта после изменения (changed_only — только измененные)"""
+    state = inspect(obj)
+    values = {}
+    for field in rollup.fields:
+        history = state.attrs[field].history
+        if history.added:
+            values[field] = history.added[0]
+        elif not changed_only:
+            values[field] = history.unchanged[0] if history.unchanged else None
+    return values
+
+
+def _snapshot_query(rollup: Rollup, ids: Sequence[int]):
+    """Текущие значения полей сводки с блокировкой строк до конца транзакции.
+    
+    Значения до изменения берутся из БД, а не из объекта сессии: объект мог быть
+    прочитан до параллельного изменения той же записи, и вычтенный из сводки вклад
+    не совпал бы с тем, что был прибавлен.
+    """
+    model = rollup.model
+    return (
+        select(model.id, *(getattr(model, field) for field in rollup.fields))
+        .where(model.id.in_(ids))
+        .order_by(model.id)
+        .with_for_update()
+    )
+
+
+def _rows_by_id(rollup: Rollup, result) -> Dict[int, Dict[str, Any]]:
+    return {row.id: {field: getattr(row, field) for field in rollup.fields} for row in result}
+
+
+@event.listens_for(Session, "before_flush")
+def _rollup_flush(session: Session, flush_context, instances) -> None:
+    """Приращения сводок по новым, измененным и удаляемым объектам flush"""
+    changes: Dict[Rollup, List[Tuple[Optional[Dict], Optional[Dict]]]] = defaultdict(list)
+    existing: Dict[Rollup, Dict[int, Optional[Dict]]] = defaultdict(dict)
+    for obj in session.new:
+        rollup = ROLLUPS.get(type(obj))
+        if rollup is not None:
+            # Без явного значения created_at заполнит server_default по часам БД, и около
+            # полуночи день в сводке разошелся бы с днем записи
+            if obj.created_at is None:
+                obj.created_at = datetime.now(timezone.utc)
+            changes[rollup].append((None, rollup.defaults(_object_values(rollup, obj))))
+    for obj in session.dirty:
+        rollup = ROLLUPS.get(type(obj))
+        if rollup is not None and session.is_modified(obj, include_collections=False):
+            existing[rollup][obj.id] = _object_values(rollup, obj, changed_only=True)
+    for obj in session.deleted:
+        rollup = ROLLUPS.get(type(obj))
+        if rollup is not None:
+            existing[rollup][obj.id] = None
+    if not changes and not existing:
+        return
+    
+    connection = session.connection()
+    for rollup, objects in existing.items():
+        before = _rows_by_id(rollup, connection.execute(_snapshot_query(rollup, sorted(objects))))
+        for object_id, changed in objects.items():
+            old = before.get(object_id)
+            changes[rollup].append((old, None if changed is None or old is None else {**old, **changed}))
+    for rollup, pairs in changes.items():
+        rows = rollup.deltas(pairs)
+        if rows:
+            connection.execute(rollup.upsert(connection.dialect.name), rows)
+
+
+async def snapshot(db: AsyncSession, rollup: Rollup, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Текущие значения полей сводки для записей по id (до пакетного изменения)"""
+    ids = sorted(set(ids))
+    if not ids:
+        return {}
+    return _rows_by_id(rollup, await db.execute(_snapshot_query(rollup, ids)))
+
+
+async def apply(
+    db: AsyncSession,
+    rollup: Rollup,
+    changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]
+) -> None:
+    """Прибавление приращений по парам (до, после) к строкам сводки в текущей транзакции"""
+    rows = rollup.deltas(changes)
+    if rows:
+        await db.execute(rollup.upsert(dialect_name(db)), rows)
+
+
+async def rebuild(db: AsyncSession, owner_id: Optional[int] = None) -> None:
+    """Пересчет сводок из исходных таблиц (всех или одного владельца) без фиксации транзакции"""
+    dialect = dialect_name(db)
+    for rollup in ROLLUPS.values():
+        table = rollup.stats_model.__table__
+        clear = delete(table)
+        if owner_id is not None:
+            clear = clear.where(table.c.owner_id == owner_id)
+        await db.execute(clear)
+        await db.execute(
+            table.insert().from_select(
+                list(rollup.keys) + list(rollup.measures),
+                rollup.aggregate_query(dialect, owner_id)
+            )
+        )
@@ -1,6 +1,7 @@
 """
 Сервис для работы с пользователями
 """
+from datetime import datetime, timezone
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
@@ -8,7 +9,7 @@ from sqlalchemy.orm import selectinload
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async, principal_cache
 
 
 class UserService:
@@ -51,7 +52,7 @@ class UserService:
     
     async def create_user(self, user_data: UserCreate) -> User:
         """Создание нового пользователя"""
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         
         user = User(
             email=user_data.email,
@@ -80,6 +81,7 @@ class UserService:
         
         await self.db.commit()
         await self.db.refresh(user)
+        principal_cache.invalidate(user_id)
         return user
     
     async def delete_user(self, user_id: int) -> bool:
@@ -89,5 +91,7 @@ class UserService:
             return False
         
         user.is_deleted = True
+        user.deleted_at = datetime.now(timezone.utc)
         await self.db.commit()
+        principal_cache.invalidate(user_id)
         return True
@@ -1 +1,17 @@
 # Фоновые задачи Celery
+import asyncio
+
+from app.core.database import async_engine
+# Все модели должны быть зарегистрированы до первого запроса в воркере
+from app.models import user, contact, company, deal, activity, file, stats  # noqa: F401
+
+
+def run_async(coro):
+    """Запуск корутины из задачи Celery в отдельном цикле событий"""
+    async def runner():
+        try:
+            return await coro
+        finally:
+            # Соединения пула привязаны к циклу событий задачи
+            await async_engine.dispose()
+    return asyncio.run(runner())
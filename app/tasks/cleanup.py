@@ -1,7 +1,14 @@
 """
 Задачи для очистки данных
 """
+import structlog
+
 from app.core.celery import celery_app
+from app.core.database import AsyncSessionLocal
+from app.services.purge_service import PurgeService, remove_old_exports
+from app.tasks import run_async
+
+logger = structlog.get_logger()
 
 
 @celery_app.task
@@ -14,15 +21,24 @@ def cleanup_expired_tokens():
 
 @celery_app.task
 def cleanup_old_files():
-    """Очистка старых файлов"""
-    # Здесь должна быть логика очистки старых файлов
-    print("Очистка старых файлов")
-    return "Old files cleaned up"
+    """Удаление выгрузок старше EXPORT_RETENTION_DAYS (файлы удаленных записей files
+    удаляет cleanup_soft_deleted_records)
+    """
+    removed = remove_old_exports()
+    logger.info("Старые выгрузки удалены", removed=removed)
+    return {"removed": removed}
 
 
-@celery_app.task
-def cleanup_soft_deleted_records():
-    """Окончательное удаление мягко удаленных записей"""
-    # Здесь должна быть логика окончательного удаления мягко удаленных записей
-    print("Окончательное удаление мягко удаленных записей")
-    return "Soft deleted records permanently removed"
+@celery_app.task(bind=True)
+def cleanup_soft_deleted_records(self):
+    """Окончательное удаление мягко удаленных записей старше PURGE_RETENTION_DAYS.
+    
+    Ход очистки по таблицам доступен в состоянии задачи PROGRESS, итог — в результате.
+    """
+    def progress(reports):
+        self.update_state(state="PROGRESS", meta={"tables": [report.as_dict() for report in reports]})
+    
+    async def purge():
+        async with AsyncSessionLocal() as db:
+            return await PurgeService(db).purge(progress=progress)
+    return run_async(purge())
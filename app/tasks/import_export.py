@@ -1,37 +1,73 @@
 """
 Задачи для импорта и экспорта данных
 """
+from datetime import datetime
+from pathlib import Path
 from typing import List, Dict, Any
 from app.core.celery import celery_app
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.export import ExportFormat, export_chunks
+from app.schemas.company import Company
+from app.schemas.contact import Contact
+from app.services.company_service import CompanyService
+from app.services.contact_service import ContactService
+from app.services.import_service import ImportService
+from app.tasks import run_async
+
+
+def _export_path(entity: str, user_id: int) -> Path:
+    directory = Path(settings.UPLOAD_ROOT) / "exports"
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{entity}_{user_id}_{datetime.utcnow():%Y%m%d%H%M%S}.csv"
+
+
+async def _export_to_csv(query, schema, path: Path) -> None:
+    """Потоковая выгрузка запроса в CSV-файл"""
+    with path.open("wb") as file:
+        async for chunk in export_chunks(query, schema, ExportFormat.CSV):
+            file.write(chunk)
 
 
 @celery_app.task
 def import_contacts_from_csv(file_path: str, user_id: int):
-    """Импорт контактов из CSV файла"""
-    # Здесь должна быть логика импорта из CSV
-    print(f"Импорт контактов из файла {file_path} для пользователя {user_id}")
-    return f"Contacts imported from {file_path}"
+    """Импорт контактов из CSV файла (отчет: количество строк, ошибки, скорость)"""
+    async def run_import() -> Dict[str, Any]:
+        async with AsyncSessionLocal() as db:
+            report = await ImportService(db).import_contacts(file_path, user_id)
+        return report.as_dict()
+    return run_async(run_import())
 
 
 @celery_app.task
 def export_contacts_to_csv(user_id: int, filters: Dict[str, Any] = None):
-    """Экспорт контактов в CSV файл"""
-    # Здесь должна быть логика экспорта в CSV
-    print(f"Экспорт контактов для пользователя {user_id} с фильтрами {filters}")
-    return f"Contacts exported for user {user_id}"
+    """Экспорт контактов в CSV файл (filters — фильтры списка контактов)"""
+    async def export() -> str:
+        async with AsyncSessionLocal() as db:
+            query = ContactService(db).get_contacts_export_query(owner_id=user_id, **(filters or {}))
+        path = _export_path("contacts", user_id)
+        await _export_to_csv(query, Contact, path)
+        return str(path)
+    return run_async(export())
 
 
 @celery_app.task
 def import_companies_from_csv(file_path: str, user_id: int):
-    """Импорт компаний из CSV файла"""
-    # Здесь должна быть логика импорта компаний из CSV
-    print(f"Импорт компаний из файла {file_path} для пользователя {user_id}")
-    return f"Companies imported from {file_path}"
+    """Импорт компаний из CSV файла (отчет: количество строк, ошибки, скорость)"""
+    async def run_import() -> Dict[str, Any]:
+        async with AsyncSessionLocal() as db:
+            report = await ImportService(db).import_companies(file_path, user_id)
+        return report.as_dict()
+    return run_async(run_import())
 
 
 @celery_app.task
 def export_companies_to_csv(user_id: int, filters: Dict[str, Any] = None):
-    """Экспорт компаний в CSV файл"""
-    # Здесь должна быть логика экспорта компаний в CSV
-    print(f"Экспорт компаний для пользователя {user_id} с фильтрами {filters}")
-    return f"Companies exported for user {user_id}"
+    """Экспорт компаний в CSV файл (filters — фильтры списка компаний)"""
+    async def export() -> str:
+        async with AsyncSessionLocal() as db:
+            query = CompanyService(db).get_companies_export_query(owner_id=user_id, **(filters or {}))
+        path = _export_path("companies", user_id)
+        await _export_to_csv(query, Company, path)
+        return str(path)
+    return run_async(export())
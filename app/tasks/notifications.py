@@ -1,16 +1,43 @@
 """
 Задачи для уведомлений
 """
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import structlog
+
 from app.core.celery import celery_app
+from app.core.database import AsyncSessionLocal
+from app.core.reminder_queue import reminder_queue
+from app.models.user import User
+from app.services.reminder_service import ReminderService
+from app.tasks import run_async
+from app.tasks.email import send_notification_email
+
+logger = structlog.get_logger()
+
+
+def _dispatch_reminder(activity_id: int, user_id: int, remind_at: datetime) -> None:
+    """Отправка напоминания точно в срок: Celery держит задачу до eta"""
+    send_activity_reminder.apply_async(
+        args=(activity_id, user_id, remind_at.isoformat()),
+        eta=remind_at,
+    )
 
 
 @celery_app.task
 def send_reminders():
-    """Отправка напоминаний о предстоящих активностях"""
-    # Здесь должна быть логика отправки напоминаний
-    print("Отправка напоминаний о предстоящих активностях")
-    return "Reminders sent"
+    """Отправка напоминаний о предстоящих активностях (тик планировщика напоминаний)"""
+    async def tick():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await ReminderService(db).tick(_dispatch_reminder)
+        finally:
+            await reminder_queue.close()
+    
+    stats = run_async(tick())
+    logger.info("Тик напоминаний", **stats)
+    return stats
 
 
 @celery_app.task
@@ -22,10 +49,27 @@ def send_deal_reminder(deal_id: int, user_id: int):
 
 
 @celery_app.task
-def send_activity_reminder(activity_id: int, user_id: int):
-    """Отправка напоминания об активности"""
-    # Здесь должна быть логика отправки напоминания об активности
-    print(f"Отправка напоминания об активности {activity_id} пользователю {user_id}")
+def send_activity_reminder(activity_id: int, user_id: int, remind_at: Optional[str] = None):
+    """Отправка напоминания об активности.
+    
+    remind_at — время напоминания на момент постановки; если активность с тех пор
+    перенесли, закрыли, удалили или передали другому исполнителю, напоминание
+    устарело и не отправляется.
+    """
+    async def load():
+        async with AsyncSessionLocal() as db:
+            expected = datetime.fromisoformat(remind_at) if remind_at else None
+            activity = await ReminderService(db).get_due_activity(activity_id, user_id, expected)
+            user = await db.get(User, user_id)
+            if activity is None or user is None:
+                return None
+            return activity.title, activity.scheduled_at or activity.due_date, user.email
+    
+    reminder = run_async(load())
+    if reminder is None:
+        return f"Activity reminder skipped for activity {activity_id}"
+    title, moment, email = reminder
+    send_notification_email.delay(email, f"Напоминание: {title}", f"{title} — {moment:%d.%m.%Y %H:%M} (UTC)")
     return f"Activity reminder sent for activity {activity_id}"
 
 
@@ -1,32 +1,63 @@
 """
 Задачи для генерации отчетов
 """
-from typing import Dict, Any
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+
+import structlog
+
 from app.core.celery import celery_app
+from app.core.database import AsyncSessionLocal
+from app.services.report_service import ReportService
+from app.tasks import run_async
+
+logger = structlog.get_logger()
+
+
+def _period(date_from: str, date_to: str):
+    """Границы периода из дат ISO (YYYY-MM-DD), обе включительно"""
+    return date.fromisoformat(date_from), date.fromisoformat(date_to)
 
 
 @celery_app.task
-def generate_daily_reports():
-    """Генерация ежедневных отчетов"""
-    # Здесь должна быть логика генерации ежедневных отчетов
-    print("Генерация ежедневных отчетов")
-    return "Daily reports generated"
+def generate_daily_reports(day: Optional[str] = None):
+    """Генерация ежедневного отчета за вчерашний (или указанный) день по сводкам"""
+    report_day = date.fromisoformat(day) if day else datetime.now(timezone.utc).date() - timedelta(days=1)
+    
+    async def generate():
+        async with AsyncSessionLocal() as db:
+            report = await ReportService(db).daily_report(report_day)
+        return report.model_dump(mode="json")
+    
+    report = run_async(generate())
+    logger.info("Ежедневный отчет сформирован", day=report["day"], owners=len(report["owners"]))
+    return report
 
 
 @celery_app.task
 def generate_sales_report(user_id: int, date_from: str, date_to: str):
-    """Генерация отчета по продажам"""
-    # Здесь должна быть логика генерации отчета по продажам
-    print(f"Генерация отчета по продажам для пользователя {user_id} с {date_from} по {date_to}")
-    return f"Sales report generated for user {user_id}"
+    """Генерация отчета по продажам по сводкам сделок"""
+    start, end = _period(date_from, date_to)
+    
+    async def generate():
+        async with AsyncSessionLocal() as db:
+            report = await ReportService(db).sales_report(user_id, start, end)
+        return report.model_dump(mode="json")
+    
+    return run_async(generate())
 
 
 @celery_app.task
 def generate_activity_report(user_id: int, date_from: str, date_to: str):
-    """Генерация отчета по активностям"""
-    # Здесь должна быть логика генерации отчета по активностям
-    print(f"Генерация отчета по активностям для пользователя {user_id} с {date_from} по {date_to}")
-    return f"Activity report generated for user {user_id}"
+    """Генерация отчета по активностям по сводкам активностей"""
+    start, end = _period(date_from, date_to)
+    
+    async def generate():
+        async with AsyncSessionLocal() as db:
+            report = await ReportService(db).activity_report(user_id, start, end)
+        return report.model_dump(mode="json")
+    
+    return run_async(generate())
 
 
 @celery_app.task
@@ -0,0 +1 @@
+# Нагрузочные сценарии и бенчмарки
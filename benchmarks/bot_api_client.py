@@ -0,0 +1,210 @@
+"""
+Бенчмарк: задержка одного нажатия кнопки бота (запрос к API) — новый httpx.AsyncClient
+на каждый вызов (прежнее поведение APIClient) против общего клиента с keep-alive.
+
+Поднимает заглушку API (uvicorn, по умолчанию HTTPS с самоподписанным сертификатом)
+за TCP-прокси, добавляющим задержку сети --rtt-ms, и выполняет --callbacks вызовов
+APIClient.get_deal последовательно (--concurrency параллельных пользователей).
+Без общего клиента каждый вызов платит за TCP- и TLS-рукопожатие (2 RTT сверх запроса).
+
+Запуск:
+    python -m benchmarks.bot_api_client --mode per-call --rtt-ms 20
+    python -m benchmarks.bot_api_client --mode shared --rtt-ms 20
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+_tmp_dir = tempfile.mkdtemp()
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "benchmark")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.bot import api_client  # noqa: E402
+from app.bot.api_client import APIClient  # noqa: E402
+
+
+async def deal(request):
+    deal_id = int(request.path_params["deal_id"])
+    return JSONResponse({"id": deal_id, "title": f"Сделка {deal_id}", "status": "new", "amount": "100.00"})
+
+
+stub_api = Starlette(routes=[Route("/api/v1/deals/{deal_id:int}", deal)])
+
+
+def self_signed_certificate():
+    """Самоподписанный сертификат localhost/127.0.0.1 для заглушки (пути cert, key)"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(_tmp_dir, "cert.pem")
+    key_path = os.path.join(_tmp_dir, "key.pem")
+    with open(cert_path, "wb") as file:
+        file.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as file:
+        file.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_stub(port: int, tls: bool):
+    """Заглушка API в отдельном потоке; путь к сертификату (или None)"""
+    cert_path = key_path = None
+    if tls:
+        cert_path, key_path = self_signed_certificate()
+    config = uvicorn.Config(
+        stub_api, host="127.0.0.1", port=port, log_level="warning",
+        ssl_certfile=cert_path, ssl_keyfile=key_path,
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return cert_path
+
+
+async def delayed_pipe(reader, writer, delay: float):
+    """Пересылка данных с задержкой delay (половина RTT) без потери порядка"""
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def send():
+        while True:
+            due, data = await queue.get()
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            if not data:
+                writer.close()
+                return
+            writer.write(data)
+            await writer.drain()
+    
+    sender = asyncio.create_task(send())
+    while True:
+        data = await reader.read(65536)
+        queue.put_nowait((time.perf_counter() + delay, data))
+        if not data:
+            break
+    await sender
+
+
+async def start_proxy(target_port: int, rtt: float):
+    """TCP-прокси 127.0.0.1:<порт> → заглушка с задержкой rtt на круг; (сервер, порт, открытые соединения)"""
+    connections = set()
+    
+    async def handle(client_reader, client_writer):
+        connections.add(client_writer)
+        try:
+            server_reader, server_writer = await asyncio.open_connection("127.0.0.1", target_port)
+            await asyncio.gather(
+                delayed_pipe(client_reader, server_writer, rtt / 2),
+                delayed_pipe(server_reader, client_writer, rtt / 2),
+            )
+        except (ConnectionError, OSError):
+            client_writer.close()
+        finally:
+            connections.discard(client_writer)
+    
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1], connections
+
+
+async def per_call_get_deal(client: APIClient, deal_id: int, verify) -> dict:
+    """Прежний APIClient.get_deal: новый AsyncClient (и соединение) на каждый вызов"""
+    async with httpx.AsyncClient(verify=verify) as http:
+        response = await http.get(f"{client.base_url}/deals/{deal_id}", headers=client._get_headers())
+        response.raise_for_status()
+        return response.json()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run(mode: str, callbacks: int, concurrency: int, rtt_ms: float, tls: bool):
+    stub_port = free_port()
+    cert_path = start_stub(stub_port, tls)
+    proxy, proxy_port, connections = await start_proxy(stub_port, rtt_ms / 1000)
+    scheme = "https" if tls else "http"
+    base_url = f"{scheme}://localhost:{proxy_port}/api/v1"
+    verify = cert_path or True
+    if cert_path:
+        # Общий клиент доверяет сертификату заглушки через переменную окружения OpenSSL
+        os.environ["SSL_CERT_FILE"] = cert_path
+    
+    latencies = []
+    
+    async def user(index: int):
+        client = APIClient(base_url)
+        client.set_token("benchmark")
+        for number in range(index, callbacks, concurrency):
+            started = time.perf_counter()
+            if mode == "per-call":
+                await per_call_get_deal(client, number, verify)
+            else:
+                await client.get_deal(number)
+            latencies.append((time.perf_counter() - started) * 1000)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await api_client.close_http_client()
+    proxy.close()
+    # Соединения через прокси закрываются с задержкой rtt/2 в каждую сторону
+    while connections:
+        await asyncio.sleep(0.01)
+    
+    print(
+        f"mode={mode:<8} {scheme} rtt={rtt_ms:g}ms callbacks={callbacks} concurrency={concurrency} "
+        f"mean={statistics.mean(latencies):.1f}ms p50={percentile(latencies, 0.5):.1f}ms "
+        f"p95={percentile(latencies, 0.95):.1f}ms throughput={callbacks / elapsed:.0f}/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["per-call", "shared"], default="shared")
+    parser.add_argument("--callbacks", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--no-tls", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.mode, args.callbacks, args.concurrency, args.rtt_ms, not args.no_tls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Нагрузочный тест webhook-режима бота: --chats пользователей одновременно проходят
+вход (/start → email → пароль) и открывают список сделок.
+
+Поднимает заглушку (uvicorn в отдельном процессе), которая отвечает и за CRM API
+(вход каждого --slow-every пользователя занимает --slow-ms, остальные запросы —
+--api-latency-ms), и за Bot API Telegram (записывает отправленные сообщения).
+Бот работает как ASGI-приложение app/bot/webhook.py под uvicorn; обновления
+отправляются POST-запросами с секретным заголовком, как это делает Telegram.
+
+--mode sequential — обработка обновлений по одному (прежнее поведение run_polling),
+--mode concurrent — PerChatUpdateProcessor. Для каждого обновления измеряется время
+от отправки до ответа бота; для каждого чата проверяется порядок ответов.
+
+Запуск:
+    python -m benchmarks.bot_webhook_load --mode sequential --chats 50
+    python -m benchmarks.bot_webhook_load --mode concurrent --chats 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("BOT_SESSION_DB_PATH", os.path.join(tempfile.mkdtemp(), "sessions.db"))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+from telegram.ext import Application  # noqa: E402
+
+from app.bot.config import bot_settings  # noqa: E402
+from app.bot.main import on_shutdown, setup_handlers  # noqa: E402
+from app.bot.updates import PerChatUpdateProcessor  # noqa: E402
+from app.bot.webhook import SECRET_HEADER, create_webhook_app  # noqa: E402
+
+TOKEN = "123456:benchmark"
+SECRET = "benchmark-secret"
+
+# Сценарий чата: текст сообщения и начало ожидаемого ответа бота
+SCRIPT = [
+    ("/start", "Привет"),
+    ("user{chat_id}@example.com", "Теперь введи пароль"),
+    ("secret", "✅ Авторизация успешна"),
+    ("💼 Сделки", "💼 <b>Сделки</b>"),
+]
+
+
+class Stub:
+    """Заглушка CRM API и Bot API; GET /replies — (chat_id, текст, время) в порядке получения"""
+    
+    def __init__(self, api_latency: float, slow_latency: float, slow_every: int):
+        self.api_latency = api_latency
+        self.slow_latency = slow_latency
+        self.slow_every = slow_every
+        self.replies = []
+        self.app = Starlette(routes=[
+            Route("/api/v1/auth/login", self.login, methods=["POST"]),
+            Route("/api/v1/deals/", self.deals),
+            Route("/bot{token}/{method}", self.telegram, methods=["POST"]),
+            Route("/replies", self.get_replies),
+        ])
+    
+    def is_slow(self, chat_id: int) -> bool:
+        return self.slow_every > 0 and chat_id % self.slow_every == 0
+    
+    async def login(self, request):
+        form = await request.form()
+        chat_id = int(form["username"].split("@")[0][len("user"):])
+        await asyncio.sleep(self.slow_latency if self.is_slow(chat_id) else self.api_latency)
+        return JSONResponse({"access_token": f"token-{chat_id}", "token_type": "bearer"})
+    
+    async def deals(self, request):
+        await asyncio.sleep(self.api_latency)
+        items = [
+            {"id": number, "title": f"Сделка {number}", "status": "new", "amount": "100.00", "currency": "RUB"}
+            for number in range(1, 11)
+        ]
+        return JSONResponse({"items": items, "total": 10, "pages": 1})
+    
+    async def telegram(self, request):
+        method = request.path_params["method"]
+        if method == "getMe":
+            return JSONResponse({"ok": True, "result": {
+                "id": 123456, "is_bot": True, "first_name": "CRM", "username": "crm_bot",
+            }})
+        if request.headers.get("content-type", "").startswith("application/json"):
+            params = await request.json()
+        else:
+            params = dict(await request.form())
+        chat_id = int(params.get("chat_id", 0))
+        text = params.get("text", "")
+        # time.monotonic — общие для всех процессов часы (CLOCK_MONOTONIC)
+        self.replies.append((chat_id, text, time.monotonic()))
+        return JSONResponse({"ok": True, "result": {
+            "message_id": len(self.replies),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": text,
+        }})
+    
+    
+    async def get_replies(self, request):
+        return JSONResponse(self.replies)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_stub(stub: Stub, port: int) -> None:
+    uvicorn.run(stub.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_stub(stub: Stub, port: int) -> multiprocessing.Process:
+    """Заглушка в отдельном процессе, чтобы не делить GIL с ботом"""
+    process = multiprocessing.Process(target=serve_stub, args=(stub, port), daemon=True)
+    process.start()
+    while True:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/replies").raise_for_status()
+            return process
+        except httpx.TransportError:
+            time.sleep(0.05)
+
+
+def make_update(update_id: int, chat_id: int, message_id: int, text: str) -> dict:
+    message = {
+        "message_id": message_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": {"id": chat_id, "is_bot": False, "first_name": f"User{chat_id}"},
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text)}]
+    return {"update_id": update_id, "message": message}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run(mode: str, chats: int, api_latency_ms: float, slow_ms: float, slow_every: int, concurrency: int):
+    stub = Stub(api_latency_ms / 1000, slow_ms / 1000, slow_every)
+    stub_port = free_port()
+    stub_process = start_stub(stub, stub_port)
+    bot_settings.API_BASE_URL = f"http://127.0.0.1:{stub_port}/api/v1"
+    
+    builder = (
+        Application.builder()
+        .token(TOKEN)
+        .base_url(f"http://127.0.0.1:{stub_port}/bot")
+        .updater(None)
+        .post_shutdown(on_shutdown)
+    )
+    if mode == "concurrent":
+        builder = builder.concurrent_updates(PerChatUpdateProcessor(concurrency, concurrency * 8))
+    application = builder.build()
+    setup_handlers(application)
+    
+    webhook_port = free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        create_webhook_app(application, secret_token=SECRET),
+        host="127.0.0.1", port=webhook_port, log_level="warning",
+    ))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    
+    sent = {}
+    
+    async def chat(http: httpx.AsyncClient, chat_id: int):
+        for index, (text, _) in enumerate(SCRIPT):
+            update = make_update(chat_id * 100 + index, chat_id, index + 1, text.format(chat_id=chat_id))
+            sent[(chat_id, index)] = time.monotonic()
+            response = await http.post(
+                f"http://127.0.0.1:{webhook_port}/telegram",
+                content=json.dumps(update),
+                headers={SECRET_HEADER: SECRET, "Content-Type": "application/json"},
+            )
+            response.raise_for_status()
+    
+    started = time.monotonic()
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=100)) as http:
+        await asyncio.gather(*(chat(http, chat_id) for chat_id in range(1, chats + 1)))
+        deadline = started + 300
+        while time.monotonic() < deadline:
+            replies = (await http.get(f"http://127.0.0.1:{stub_port}/replies")).json()
+            if len(replies) >= chats * len(SCRIPT):
+                break
+            await asyncio.sleep(0.1)
+    elapsed = max(received for _, _, received in replies) - started if replies else 0.0
+    server.should_exit = True
+    await serving
+    stub_process.terminate()
+    
+    # Ответы каждого чата должны прийти в порядке сценария
+    by_chat = {}
+    for chat_id, text, received in replies:
+        by_chat.setdefault(chat_id, []).append((text, received))
+    out_of_order = 0
+    latencies = []
+    for chat_id in range(1, chats + 1):
+        replies = by_chat.get(chat_id, [])
+        expected = [prefix for _, prefix in SCRIPT]
+        if len(replies) != len(SCRIPT) or any(
+            not text.startswith(prefix) for (text, _), prefix in zip(replies, expected)
+        ):
+            out_of_order += 1
+            continue
+        if stub.is_slow(chat_id):
+            continue
+        latencies.extend(
+            (received - sent[(chat_id, index)]) * 1000 for index, (_, received) in enumerate(replies)
+        )
+    
+    if not latencies:
+        print(f"mode={mode:<10} chats={chats}: нет ответов быстрых чатов")
+        return
+    print(
+        f"mode={mode:<10} chats={chats} slow_every={slow_every} slow={slow_ms:g}ms api={api_latency_ms:g}ms "
+        f"reply p50={percentile(latencies, 0.5):.0f}ms p95={percentile(latencies, 0.95):.0f}ms "
+        f"max={max(latencies):.0f}ms total={elapsed:.2f}s chats_out_of_order={out_of_order}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["sequential", "concurrent"], default="concurrent")
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--api-latency-ms", type=float, default=50.0)
+    parser.add_argument("--slow-ms", type=float, default=2000.0)
+    parser.add_argument("--slow-every", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=bot_settings.MAX_CONCURRENT_UPDATES)
+    args = parser.parse_args()
+    # Журнал каждого HTTP-запроса бота искажает замер
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(run(
+        args.mode, args.chats, args.api_latency_ms, args.slow_ms, args.slow_every, args.concurrency,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Бенчмарк: запись контактов по одному запросу на запись против POST /contacts/bulk.
+
+Создает и затем изменяет N контактов двумя способами: POST/PUT на каждую
+запись и пакетами через POST /api/v1/contacts/bulk (atomic и по порциям).
+Запросы идут через ASGI-транспорт, без сети. База — временный SQLite; для
+PostgreSQL задайте DATABASE_URL_ASYNC (и DATABASE_URL) — база очищается!
+
+Запуск:
+    python -m benchmarks.bulk_write --rows 2000 --batch 500
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_tmp_dir = tempfile.mkdtemp()
+_db_path = os.path.join(_tmp_dir, "bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_path}")
+os.environ.setdefault("DATABASE_URL_ASYNC", f"sqlite+aiosqlite:///{_db_path}")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("UPLOAD_ROOT", os.path.join(_tmp_dir, "uploads"))
+
+import httpx  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, async_engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+async def prepare() -> int:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        user = User(email="bulk@example.com", username="bulk", full_name="Bulk", hashed_password="-")
+        session.add(user)
+        await session.commit()
+        return user.id
+
+
+def contact(i: int) -> dict:
+    return {
+        "first_name": f"Имя{i}",
+        "last_name": "Фамилия",
+        "email": f"user{i}@example.com",
+        "tags": ["bench"],
+        "custom_fields": {"n": i},
+    }
+
+
+def report(name: str, rows: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} rows={rows} time={elapsed:.2f}s rows/s={rows / elapsed:.0f}")
+
+
+async def single(client: httpx.AsyncClient, rows: int) -> None:
+    started = time.perf_counter()
+    ids = []
+    for i in range(rows):
+        response = await client.post("/api/v1/contacts/", json=contact(i))
+        ids.append(response.json()["id"])
+    report("single POST", rows, started)
+    
+    started = time.perf_counter()
+    for contact_id in ids:
+        await client.put(f"/api/v1/contacts/{contact_id}", json={"status": "customer"})
+    report("single PUT", rows, started)
+
+
+async def bulk(client: httpx.AsyncClient, rows: int, batch: int, atomic: bool) -> None:
+    mode = "atomic" if atomic else "chunked"
+    started = time.perf_counter()
+    ids = []
+    for start in range(0, rows, batch):
+        operations = [
+            {"action": "create", "data": contact(i)} for i in range(start, min(start + batch, rows))
+        ]
+        response = await client.post(
+            "/api/v1/contacts/bulk", json={"operations": operations, "atomic": atomic}
+        )
+        ids.extend(result["id"] for result in response.json()["results"])
+    report(f"bulk create ({mode})", rows, started)
+    
+    started = time.perf_counter()
+    for start in range(0, rows, batch):
+        operations = [
+            {"action": "update", "id": contact_id, "data": {"status": "customer"}}
+            for contact_id in ids[start:start + batch]
+        ]
+        await client.post("/api/v1/contacts/bulk", json={"operations": operations, "atomic": atomic})
+    report(f"bulk update ({mode})", rows, started)
+
+
+async def run(rows: int, batch: int):
+    owner_id = await prepare()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(owner_id)})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost", headers=headers) as client:
+        await single(client, rows)
+        await bulk(client, rows, batch, atomic=True)
+        await bulk(client, rows, batch, atomic=False)
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Бенчмарк: задержка API во время потока логов фронтенда.
+
+--clients клиентов отправляют в сумме --logs-per-second записей в секунду
+(запросы идут в приложение в том же процессе через ASGITransport), а каждые
+10 мс выполняется GET /ping. Задержка ping считается от запланированного
+момента, поэтому включает ожидание занятого цикла событий.
+--mode legacy — прежний эндпоинт (одна запись на запрос, запись через structlog
+внутри запроса), --mode queue — текущий POST /frontend-logs: пачки по --batch
+записей, очередь с фоновой записью и лимит на клиента (--rate записей в секунду,
+по умолчанию FRONTEND_LOG_RATE_PER_SECOND). Логи пишутся в файл во временном каталоге.
+
+Запуск:
+    python -m benchmarks.frontend_logs --mode legacy --logs-per-second 4000
+    python -m benchmarks.frontend_logs --mode queue --logs-per-second 4000 --batch 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+_tmp_dir = tempfile.mkdtemp()
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import httpx  # noqa: E402
+import structlog  # noqa: E402
+from fastapi import APIRouter, FastAPI  # noqa: E402
+
+from app.api.v1.endpoints import logs  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.frontend_logs import FrontendLogPipeline  # noqa: E402
+from app.schemas.log import FrontendLogData  # noqa: E402
+
+legacy_router = APIRouter()
+legacy_logger = structlog.get_logger("frontend_logger")
+
+
+@legacy_router.post("")
+async def legacy_receive_frontend_log(log_data: FrontendLogData):
+    """Прежний эндпоинт: одна запись, запись в лог внутри запроса"""
+    log_context = {
+        "url": log_data.url,
+        "userAgent": log_data.userAgent,
+        "frontend_timestamp": log_data.timestamp,
+        "frontend_context": log_data.context,
+        "user_id": None,
+    }
+    legacy_logger.info(log_data.message, **log_context)
+    return {"status": "success", "message": "Log received"}
+
+
+def configure_logging(path: str) -> None:
+    logging.basicConfig(filename=path, level=logging.INFO, format="%(message)s")
+    structlog.configure(
+        processors=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.JSONRenderer(),
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run(mode: str, clients: int, logs_per_second: float, batch: int, seconds: float, rate: float):
+    log_path = os.path.join(_tmp_dir, "frontend.log")
+    configure_logging(log_path)
+    
+    app = FastAPI()
+    pipeline = None
+    if mode == "legacy":
+        app.include_router(legacy_router, prefix="/frontend-logs")
+        batch = 1
+    else:
+        pipeline = FrontendLogPipeline(
+            queue_size=settings.FRONTEND_LOG_QUEUE_SIZE,
+            write_batch=settings.FRONTEND_LOG_WRITE_BATCH,
+            rate=rate,
+            burst=max(settings.FRONTEND_LOG_BURST, batch),
+        )
+        logs.frontend_logs = pipeline
+        app.include_router(logs.router, prefix="/frontend-logs")
+        pipeline.start()
+    
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+    
+    entry = {
+        "level": "info", "message": "Ошибка рендера", "url": "/deals",
+        "userAgent": "Mozilla/5.0", "timestamp": "2024-01-01T00:00:00Z",
+        "context": {"component": "DealList"},
+    }
+    started = time.perf_counter()
+    deadline = started + seconds
+    sent = 0
+    latencies = []
+    
+    async def flood(index: int):
+        nonlocal sent
+        transport = httpx.ASGITransport(app=app, client=(f"10.0.0.{index}", 1234))
+        interval = batch * clients / logs_per_second
+        body = entry if mode == "legacy" else [entry] * batch
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            due = started + interval * index / clients
+            while due < deadline:
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                await client.post("/frontend-logs", json=body)
+                sent += batch
+                due += interval
+    
+    async def probe():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            due = started
+            while due < deadline:
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                await client.get("/ping")
+                latencies.append((time.perf_counter() - due) * 1000)
+                due += 0.01
+    
+    await asyncio.gather(probe(), *(flood(index) for index in range(clients)))
+    elapsed = time.perf_counter() - started
+    if pipeline is not None:
+        await pipeline.stop()
+    with open(log_path, encoding="utf-8") as file:
+        written = sum(1 for line in file if '"frontend_logger"' in line)
+    os.remove(log_path)
+    
+    dropped = pipeline.stats()["dropped"] if pipeline else {}
+    print(
+        f"mode={mode:<6} offered={logs_per_second:g}/s batch={batch} sent={sent / elapsed:.0f}/s "
+        f"written={written} dropped={dropped} "
+        f"ping p50={percentile(latencies, 0.5):.1f}ms p95={percentile(latencies, 0.95):.1f}ms "
+        f"max={max(latencies):.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["legacy", "queue"], default="queue")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--logs-per-second", type=float, default=4000)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate", type=float, default=settings.FRONTEND_LOG_RATE_PER_SECOND)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(run(args.mode, args.clients, args.logs_per_second, args.batch, args.seconds, args.rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Бенчмарк: сериализация списка сделок при limit=1000.
+
+Сравнивает текущий путь (DealList из ORM-объектов через Pydantic + JSONResponse)
+с быстрым (FAST_JSON_RESPONSES: dict по полям схемы + orjson). Замеряется как
+только сериализация загруженной страницы, так и полный GET /api/v1/deals/
+(кеш ответов выключен). Проверяется, что тела ответов совпадают байт в байт.
+
+Запуск:
+    python -m benchmarks.json_render --rows 1000 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+
+_tmp_dir = tempfile.mkdtemp()
+_db_path = os.path.join(_tmp_dir, "bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_path}")
+os.environ.setdefault("DATABASE_URL_ASYNC", f"sqlite+aiosqlite:///{_db_path}")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("UPLOAD_ROOT", os.path.join(_tmp_dir, "uploads"))
+os.environ["RESPONSE_CACHE_ENABLED"] = "False"
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import AsyncSessionLocal, Base, async_engine  # noqa: E402
+from app.core.response_cache import CacheEntry  # noqa: E402
+from app.core.fast_json import list_content  # noqa: E402
+from app.core.pagination import TotalStrategy  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.deal import Deal, DealStatus  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.deal import Deal as DealSchema, DealList  # noqa: E402
+from app.services.deal_service import DealService  # noqa: E402
+
+
+async def prepare(rows: int) -> int:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        user = User(email="json@example.com", username="json", full_name="Json", hashed_password="-")
+        session.add(user)
+        await session.flush()
+        statuses = list(DealStatus)
+        session.add_all([
+            Deal(
+                title=f"Сделка {i}",
+                description="Описание " * 20,
+                amount=Decimal(f"{i * 1000}.50"),
+                currency="RUB",
+                probability=i % 100,
+                status=statuses[i % len(statuses)],
+                owner_id=user.id,
+                custom_fields={f"field_{k}": f"значение {k}" for k in range(20)} | {"score": i / 7},
+                tags=[f"tag{k}" for k in range(10)],
+            )
+            for i in range(rows)
+        ])
+        await session.commit()
+        return user.id
+
+
+async def render(content) -> bytes:
+    response = await CacheEntry(None, None).store(content)
+    return response.body
+
+
+async def run(rows: int, repeat: int):
+    owner_id = await prepare(rows)
+    async with AsyncSessionLocal() as session:
+        page = await DealService(session).get_deals(
+            owner_id, limit=rows, total_strategy=TotalStrategy.NONE
+        )
+        fields = page.as_response(0, rows)
+        
+        bodies = {}
+        for fast in (False, True):
+            settings.FAST_JSON_RESPONSES = fast
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                bodies[fast] = await render(list_content(DealList, DealSchema, fields))
+                timings.append((time.perf_counter() - started) * 1000)
+            print(
+                f"serialize fast={fast!s:<5} items={len(fields['items'])} "
+                f"median={statistics.median(timings):.1f}ms min={min(timings):.1f}ms "
+                f"bytes={len(bodies[fast])}"
+            )
+        print(f"  bodies identical: {bodies[False] == bodies[True]}")
+    
+    token = create_access_token({"sub": str(owner_id)})
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        for fast in (False, True):
+            settings.FAST_JSON_RESPONSES = fast
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = await client.get(
+                    "/api/v1/deals/", params={"limit": rows}, headers=headers
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+            print(
+                f"GET /deals fast={fast!s:<5} status={response.status_code} "
+                f"median={statistics.median(timings):.1f}ms min={min(timings):.1f}ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Бенчмарк: задержка посторонних запросов во время волны логинов.
+
+Во время N параллельных POST /auth/login каждые 10 мс выполняется GET /health
+и замеряется его задержка. Режим inline воспроизводит прежнее поведение
+(bcrypt прямо в обработчике), режим pool — проверка пароля в пуле потоков.
+
+Запуск:
+    python -m benchmarks.login_storm --logins 200 --mode inline
+    python -m benchmarks.login_storm --logins 200 --mode pool
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_tmp_dir = tempfile.mkdtemp()
+_db_path = os.path.join(_tmp_dir, "bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_path}")
+os.environ.setdefault("DATABASE_URL_ASYNC", f"sqlite+aiosqlite:///{_db_path}")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("UPLOAD_ROOT", os.path.join(_tmp_dir, "uploads"))
+
+import httpx  # noqa: E402
+
+from app.api.v1.endpoints import auth  # noqa: E402
+from app.core import security  # noqa: E402
+from app.core.database import AsyncSessionLocal, Base, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+EMAIL = "storm@example.com"
+PASSWORD = "storm-password"
+
+
+async def _inline_verify(plain_password: str, hashed_password: str) -> bool:
+    return security.verify_password(plain_password, hashed_password)
+
+
+async def prepare():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        session.add(User(
+            email=EMAIL,
+            username="storm",
+            full_name="Storm",
+            hashed_password=security.get_password_hash(PASSWORD),
+        ))
+        await session.commit()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run(logins: int, mode: str):
+    if mode == "inline":
+        auth.verify_password_async = _inline_verify
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        stop = asyncio.Event()
+        probe_latencies = []
+        
+        async def probe():
+            # Задержка считается от момента, когда запрос должен был начаться,
+            # поэтому блокировка event loop попадает в замер
+            while not stop.is_set():
+                scheduled = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+                await client.get("/health")
+                probe_latencies.append((time.perf_counter() - scheduled) * 1000)
+        
+        async def login():
+            response = await client.post(
+                "/api/v1/auth/login",
+                data={"username": EMAIL, "password": PASSWORD},
+            )
+            return response.status_code
+        
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        codes = await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+    
+    print(f"mode={mode} logins={logins} elapsed={elapsed:.2f}s")
+    print(f"  login statuses: { {code: codes.count(code) for code in set(codes)} }")
+    print(
+        f"  /health latency ms: n={len(probe_latencies)} "
+        f"p50={statistics.median(probe_latencies):.1f} "
+        f"p99={percentile(probe_latencies, 0.99):.1f} "
+        f"max={max(probe_latencies):.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--mode", choices=["inline", "pool"], default="pool")
+    args = parser.parse_args()
+    
+    async def _main():
+        await prepare()
+        await run(args.logins, args.mode)
+    
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Бенчмарк: отчеты по продажам и активностям за год по сводкам против GROUP BY по исходным таблицам.
+
+Заполняет сделки и активности нескольких менеджеров за последние 365 дней,
+строит сводки rebuild() и замеряет отчет одного менеджера за год: агрегацию
+по таблицам deals/activities и ReportService (только deal_daily_stats и
+activity_daily_stats). База — временный SQLite; для PostgreSQL задайте
+DATABASE_URL_ASYNC (и DATABASE_URL) — база очищается!
+
+Запуск:
+    python -m benchmarks.report_rollups --rows 200000 --owners 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+_tmp_dir = tempfile.mkdtemp()
+_db_path = os.path.join(_tmp_dir, "bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_path}")
+os.environ.setdefault("DATABASE_URL_ASYNC", f"sqlite+aiosqlite:///{_db_path}")
+os.environ.setdefault("DEBUG", "False")
+
+from sqlalchemy import func, insert, select, text  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, async_engine  # noqa: E402
+from app.models import user, contact, company, deal, activity, file, stats  # noqa: E402,F401
+from app.models.activity import Activity  # noqa: E402
+from app.models.deal import Deal, DealStatus  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import rollup_service  # noqa: E402
+from app.services.report_service import ReportService  # noqa: E402
+
+BATCH = 10000
+ACTIVITY_TYPES = ["call", "email", "meeting", "task", "note"]
+ACTIVITY_STATUSES = ["pending", "completed", "cancelled"]
+
+
+async def prepare(rows: int, owners: int) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    now = datetime.now(timezone.utc)
+    statuses = list(DealStatus)
+    random.seed(1)
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(User), [
+            {"email": f"user{i}@example.com", "username": f"user{i}", "full_name": "User", "hashed_password": "-"}
+            for i in range(owners)
+        ])
+        for start in range(0, rows, BATCH):
+            created = [now - timedelta(seconds=random.randrange(365 * 86400)) for _ in range(start, min(start + BATCH, rows))]
+            await session.execute(insert(Deal), [
+                {
+                    "title": "Сделка",
+                    "owner_id": i % owners + 1,
+                    "status": statuses[i % len(statuses)],
+                    "currency": "RUB" if i % 5 else "USD",
+                    "amount": random.randrange(100, 100000),
+                    "probability": random.randrange(0, 101, 10),
+                    "is_deleted": i % 17 == 0,
+                    "created_at": created_at,
+                }
+                for i, created_at in enumerate(created, start)
+            ])
+            await session.execute(insert(Activity), [
+                {
+                    "title": "Активность",
+                    "owner_id": i % owners + 1,
+                    "type": ACTIVITY_TYPES[i % len(ACTIVITY_TYPES)],
+                    "status": ACTIVITY_STATUSES[i % len(ACTIVITY_STATUSES)],
+                    "is_deleted": i % 17 == 0,
+                    "created_at": created_at,
+                }
+                for i, created_at in enumerate(created, start)
+            ])
+        await session.commit()
+        started = time.perf_counter()
+        await rollup_service.rebuild(session)
+        await session.commit()
+        print(f"rebuild rollups              time={time.perf_counter() - started:.2f}s")
+        await session.execute(text("ANALYZE"))
+        await session.commit()
+
+
+def period_conditions(model, owner_id: int, since, until) -> list:
+    return [
+        model.owner_id == owner_id,
+        model.is_deleted == False,
+        model.created_at >= since,
+        model.created_at < until,
+    ]
+
+
+async def raw_reports(session, owner_id: int, date_from, date_to) -> None:
+    """Те же агрегаты, что в отчетах, но по исходным таблицам"""
+    since = datetime.combine(date_from, datetime.min.time(), timezone.utc)
+    until = datetime.combine(date_to + timedelta(days=1), datetime.min.time(), timezone.utc)
+    deals = period_conditions(Deal, owner_id, since, until)
+    activities = period_conditions(Activity, owner_id, since, until)
+    await session.execute(
+        select(Deal.status, Deal.currency, func.count(), func.sum(Deal.amount), func.sum(Deal.amount * Deal.probability))
+        .where(*deals).group_by(Deal.status, Deal.currency)
+    )
+    await session.execute(
+        select(func.date(Deal.created_at), Deal.currency, func.count(), func.sum(Deal.amount))
+        .where(*deals).group_by(func.date(Deal.created_at), Deal.currency)
+    )
+    await session.execute(
+        select(Activity.type, Activity.status, func.count()).where(*activities).group_by(Activity.type, Activity.status)
+    )
+    await session.execute(
+        select(func.date(Activity.created_at), func.count()).where(*activities).group_by(func.date(Activity.created_at))
+    )
+
+
+async def rollup_reports(session, owner_id: int, date_from, date_to) -> None:
+    service = ReportService(session)
+    await service.sales_report(owner_id, date_from, date_to)
+    await service.activity_report(owner_id, date_from, date_to)
+
+
+async def measure(name: str, report, repeat: int, *args) -> None:
+    async with AsyncSessionLocal() as session:
+        await report(session, *args)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await report(session, *args)
+        elapsed = (time.perf_counter() - started) / repeat
+    print(f"{name:<28} time={elapsed * 1000:.1f}ms")
+
+
+async def run(rows: int, owners: int, repeat: int):
+    await prepare(rows, owners)
+    date_to = datetime.now(timezone.utc).date()
+    date_from = date_to - timedelta(days=365)
+    await measure("GROUP BY deals/activities", raw_reports, repeat, 1, date_from, date_to)
+    await measure("rollups (ReportService)", rollup_reports, repeat, 1, date_from, date_to)
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--owners", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.owners, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Тесты общего HTTP-клиента бота к API
+"""
+import asyncio
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test")
+
+from app.bot import api_client  # noqa: E402
+from app.bot.api_client import APIClient  # noqa: E402
+from app.bot.config import bot_settings  # noqa: E402
+
+
+async def call_with_responses(statuses, call):
+    """Вызов метода APIClient через общий клиент с MockTransport; (результат или ошибка, запросы)"""
+    requests = []
+    statuses = iter(statuses)
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(next(statuses), json={"id": 1, "access_token": "token"})
+    
+    api_client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    try:
+        client = APIClient("http://api/api/v1")
+        client.set_token("token")
+        try:
+            return await call(client), requests
+        except httpx.HTTPStatusError as exc:
+            return exc, requests
+    finally:
+        await api_client.close_http_client()
+
+
+class TestBotAPIClient:
+    """Повторы запросов и общий клиент"""
+    
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        monkeypatch.setattr(bot_settings, "API_RETRY_BACKOFF", 0)
+        monkeypatch.setattr(bot_settings, "API_RETRIES", 2)
+    
+    def test_get_retried_on_503(self):
+        """GET повторяется после 503 и получает ответ; все запросы идут через один клиент"""
+        result, requests = asyncio.run(call_with_responses([503, 503, 200], lambda c: c.get_deal(1)))
+        assert result == {"id": 1, "access_token": "token"}
+        assert len(requests) == 3
+        assert requests[0].headers["Authorization"] == "Bearer token"
+    
+    def test_retries_exhausted(self):
+        """После API_RETRIES повторов ошибка отдается обработчику"""
+        result, requests = asyncio.run(call_with_responses([503] * 5, lambda c: c.get_deal(1)))
+        assert isinstance(result, httpx.HTTPStatusError)
+        assert result.response.status_code == 503
+        assert len(requests) == 3
+    
+    def test_login_not_retried(self):
+        """POST /auth/login после ответа API не повторяется"""
+        result, requests = asyncio.run(call_with_responses([503, 200], lambda c: c.login("a@b.c", "secret")))
+        assert isinstance(result, httpx.HTTPStatusError)
+        assert len(requests) == 1
+        assert requests[0].headers["Content-Type"] == "application/x-www-form-urlencoded"
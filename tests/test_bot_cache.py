@@ -0,0 +1,76 @@
+"""
+Тесты кеша ответов API и предзагрузки страниц в боте
+"""
+import asyncio
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test")
+
+from app.bot.cache import ResponseCache, get_item, get_page  # noqa: E402
+
+
+class FakeAPI:
+    """APIClient с тремя страницами компаний и счетчиком запросов"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def get_companies(self, skip: int, limit: int):
+        self.calls.append(("companies", skip))
+        await asyncio.sleep(0.01)
+        return {"items": [{"id": skip + 1}], "total": 3 * limit, "pages": 3}
+    
+    async def get_company(self, company_id: int):
+        self.calls.append(("company", company_id))
+        return {"id": company_id}
+
+
+async def browse():
+    """Список → страница 2 → страница 3 → назад к первой → карточка дважды"""
+    context = SimpleNamespace(user_data={})
+    api = FakeAPI()
+    await get_page(context, api, "companies", 1)
+    await asyncio.sleep(0.05)  # предзагрузка страницы 2 завершилась
+    await get_page(context, api, "companies", 2)
+    # Страница 3 еще загружается в фоне: нажатие ждет тот же запрос
+    await get_page(context, api, "companies", 3)
+    await get_page(context, api, "companies", 1)
+    await get_item(context, api, "companies", 7)
+    await get_item(context, api, "companies", 7)
+    return api.calls
+
+
+class TestBotCache:
+    """Кеш страниц и карточек пользователя бота"""
+    
+    def test_prefetch_and_reuse(self):
+        """Следующая страница загружается заранее, повторные просмотры не ходят в API"""
+        calls = asyncio.run(browse())
+        assert calls == [("companies", 0), ("companies", 10), ("companies", 20), ("company", 7)]
+    
+    def test_ttl_size_and_invalidate(self):
+        """Записи устаревают через TTL, вытесняются сверх размера и удаляются по разделу"""
+        async def scenario():
+            cache = ResponseCache(ttl=0.05, max_size=2)
+            loads = []
+            
+            def loader(value):
+                async def load():
+                    loads.append(value)
+                    return value
+                return load
+            
+            await cache.fetch(("deals", "item", 1), loader(1))
+            await cache.fetch(("deals", "item", 1), loader(1))
+            await asyncio.sleep(0.06)
+            await cache.fetch(("deals", "item", 1), loader(1))
+            await cache.fetch(("deals", "item", 2), loader(2))
+            await cache.fetch(("companies", "item", 3), loader(3))
+            await cache.fetch(("deals", "item", 1), loader(1))  # вытеснена как самая старая
+            cache.invalidate("deals")
+            await cache.fetch(("companies", "item", 3), loader(3))
+            await cache.fetch(("deals", "item", 2), loader(2))
+            return loads
+        
+        assert asyncio.run(scenario()) == [1, 1, 2, 3, 1, 2]
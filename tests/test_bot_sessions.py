@@ -0,0 +1,126 @@
+"""
+Тесты хранилища сессий бота и обновления токена доступа
+"""
+import asyncio
+import os
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test")
+
+from telegram.ext import ApplicationHandlerStop  # noqa: E402
+
+from app.bot import api_client, sessions  # noqa: E402
+from app.bot.api_client import APIClient  # noqa: E402
+from app.bot.handlers.auth import handle_login_input, start  # noqa: E402
+from app.bot.sessions import Session, SQLiteSessionStore, get_api_client, load_session  # noqa: E402
+
+
+def make_update(text: str, replies: list):
+    async def reply_text(message, **kwargs):
+        replies.append(message)
+    
+    return SimpleNamespace(
+        effective_user=SimpleNamespace(id=7, first_name="Анна"),
+        message=SimpleNamespace(text=text, reply_text=reply_text),
+    )
+
+
+def api_handler(requests: list):
+    """API: вход, обновление токенов и сделка, доступная только с новым токеном"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, request.url.path, request.headers.get("Authorization")))
+        if request.url.path.endswith("/auth/login"):
+            return httpx.Response(200, json={"access_token": "old", "refresh_token": "r1"})
+        if request.url.path.endswith("/auth/refresh"):
+            if request.url.params["refresh_token"] != "r1":
+                return httpx.Response(401)
+            return httpx.Response(200, json={"access_token": "new", "refresh_token": "r2"})
+        if request.headers.get("Authorization") != "Bearer new":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"id": 1})
+    return handler
+
+
+class TestBotSessions:
+    """Сессии в общем хранилище и /auth/refresh"""
+    
+    @pytest.fixture(autouse=True)
+    def transport(self):
+        requests = []
+        api_client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(api_handler(requests)))
+        yield requests
+        asyncio.run(api_client.close_http_client())
+    
+    def test_login_across_processes(self, tmp_path, monkeypatch):
+        """Диалог входа продолжается в другом процессе, токены переживают перезапуск"""
+        path = str(tmp_path / "sessions.db")
+        
+        async def handle(context, text, handler, replies):
+            # Отдельный экземпляр хранилища — как у другого процесса бота
+            monkeypatch.setattr(sessions, "session_store", SQLiteSessionStore(path, ttl=3600))
+            update = make_update(text, replies)
+            await load_session(update, context)
+            try:
+                await handler(update, context)
+            except ApplicationHandlerStop:
+                pass
+            await sessions.session_store.close()
+        
+        async def scenario():
+            first, second = SimpleNamespace(user_data={}), SimpleNamespace(user_data={})
+            replies = []
+            await handle(first, "/start", start, replies)
+            await handle(second, "anna@example.com", handle_login_input, replies)
+            await handle(first, "secret", handle_login_input, replies)
+            restarted = SimpleNamespace(user_data={})
+            await handle(restarted, "💼 Сделки", handle_login_input, replies)
+            return replies, get_api_client(make_update("", []), restarted)
+        
+        replies, client = asyncio.run(scenario())
+        assert replies[1] == "Теперь введи пароль:"
+        assert replies[2].startswith("✅ Авторизация успешна")
+        assert len(replies) == 3
+        assert (client.token, client.refresh_token) == ("old", "r1")
+    
+    def test_refresh_on_401(self, transport):
+        """Истекший токен обновляется через /auth/refresh, новые токены сохраняются"""
+        async def scenario():
+            saved = []
+            client = APIClient("http://api/api/v1")
+            client.set_token("old", "r1")
+            
+            async def on_token_refresh(refreshed: APIClient):
+                saved.append((refreshed.token, refreshed.refresh_token))
+            
+            client.on_token_refresh = on_token_refresh
+            deal = await client.get_deal(1)
+            
+            # Отозванный refresh токен: ошибка и сброс токенов
+            client.set_token("old", "expired")
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get_deal(1)
+            return deal, saved, client.token
+        
+        deal, saved, token = asyncio.run(scenario())
+        assert deal == {"id": 1}
+        assert saved == [("new", "r2"), (None, None)]
+        assert token is None
+        assert [path for _, path, _ in transport][:3] == ["/api/v1/deals/1", "/api/v1/auth/refresh", "/api/v1/deals/1"]
+    
+    def test_session_ttl(self, tmp_path):
+        """Сессия старше срока жизни не загружается"""
+        async def scenario():
+            store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=0.05)
+            await store.save(1, Session(access_token="token"))
+            fresh = await store.get(1)
+            await asyncio.sleep(0.1)
+            expired = await store.get(1)
+            await store.close()
+            return fresh, expired
+        
+        fresh, expired = asyncio.run(scenario())
+        assert fresh.access_token == "token"
+        assert expired is None
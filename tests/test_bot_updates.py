@@ -0,0 +1,78 @@
+"""
+Тесты параллельной обработки обновлений и webhook-приложения бота
+"""
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+
+import httpx
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test")
+
+from telegram import Chat, Message, Update  # noqa: E402
+from telegram.ext import Application  # noqa: E402
+
+from app.bot.updates import PerChatUpdateProcessor  # noqa: E402
+from app.bot.webhook import SECRET_HEADER, create_webhook_app  # noqa: E402
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    chat = Chat(chat_id, Chat.PRIVATE)
+    return Update(update_id, message=Message(update_id, datetime.now(timezone.utc), chat, text="x"))
+
+
+class TestPerChatUpdateProcessor:
+    """Разные чаты параллельно, один чат — по порядку"""
+    
+    def test_order_and_limit(self):
+        """Медленное обновление не задерживает другие чаты; внутри чата порядок сохраняется"""
+        async def scenario():
+            processor = PerChatUpdateProcessor(max_running_updates=2)
+            done = []
+            peak = 0
+            
+            async def handle(name: str, delay: float):
+                nonlocal peak
+                peak = max(peak, processor.current_running_updates)
+                await asyncio.sleep(delay)
+                done.append(name)
+            
+            jobs = [
+                (make_update(1, 1), handle("a1", 0.05)),
+                (make_update(2, 1), handle("a2", 0)),
+                (make_update(3, 2), handle("b1", 0)),
+                (make_update(4, 3), handle("c1", 0.01)),
+                (make_update(5, 2), handle("b2", 0)),
+            ]
+            await asyncio.gather(*(processor.process_update(update, job) for update, job in jobs))
+            return done, peak, processor._chats
+        
+        done, peak, chats = asyncio.run(scenario())
+        assert done.index("a1") < done.index("a2")
+        assert done.index("b1") < done.index("b2")
+        assert done.index("b2") < done.index("a1")
+        assert peak == 2
+        assert chats == {}
+
+
+class TestWebhookApp:
+    """Прием обновлений от Telegram"""
+    
+    def test_secret_and_queue(self):
+        """Без верного секрета — 403; принятое обновление попадает в очередь приложения"""
+        async def scenario():
+            application = Application.builder().token("123:test").updater(None).build()
+            app = create_webhook_app(application, secret_token="secret")
+            body = json.dumps(make_update(7, 42).to_dict())
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bot") as client:
+                denied = await client.post("/telegram", content=body, headers={SECRET_HEADER: "wrong"})
+                accepted = await client.post("/telegram", content=body, headers={SECRET_HEADER: "secret"})
+            return denied.status_code, accepted.status_code, application.update_queue.get_nowait()
+        
+        denied, accepted, update = asyncio.run(scenario())
+        assert denied == 403
+        assert accepted == 200
+        assert update.update_id == 7
+        assert update.effective_chat.id == 42
@@ -0,0 +1,70 @@
+"""
+Тесты пакетных операций
+"""
+from app.models.contact import Contact
+from app.models.deal import Deal
+from app.schemas.bulk import BulkAction, BulkOperation
+from app.schemas.contact import ContactCreate, ContactUpdate
+from app.schemas.deal import DealCreate, DealUpdate
+from app.services.bulk_service import BulkService
+from app.services.deal_service import DealService
+
+
+def make_service() -> BulkService:
+    return BulkService(None, Contact, "contacts", ContactCreate, ContactUpdate)
+
+
+class TestBulk:
+    """Тесты проверки операций и итогового ответа"""
+    
+    def test_validate(self):
+        """Ошибки схемы и отсутствие id относятся к своим операциям"""
+        operations = [
+            BulkOperation(action="create", data={"first_name": "A", "last_name": "B"}),
+            BulkOperation(action="create", data={"last_name": "B"}),
+            BulkOperation(action="update", data={"status": "customer"}),
+            BulkOperation(action="update", id=7, data={"status": "customer"}),
+            BulkOperation(action="delete", id=8),
+        ]
+        results = [None] * len(operations)
+        prepared = make_service()._validate(operations, results)
+        
+        assert [index for index, _, _ in prepared] == [0, 3, 4]
+        assert prepared[1][2] == {"status": "customer"}
+        assert results[1].status == "error" and results[1].error.startswith("first_name")
+        assert results[2].error == "id обязателен"
+    
+    def test_duplicate_ids(self):
+        """Повторная операция над той же записью отклоняется, первая проходит проверку"""
+        operations = [
+            BulkOperation(action="update", id=7, data={"status": "customer"}),
+            BulkOperation(action="delete", id=7),
+            BulkOperation(action="update", id=8, data={"status": "customer"}),
+        ]
+        results = [None] * len(operations)
+        prepared = make_service()._validate(operations, results)
+        
+        assert [index for index, _, _ in prepared] == [0, 2]
+        assert results[1].status == "error" and results[1].id == 7
+    
+    def test_create_normalization(self):
+        """Создание сделки пакетом приводит contact_id/company_id = 0 к None, как POST /deals"""
+        service = BulkService(
+            None, Deal, "deals", DealCreate, DealUpdate,
+            normalize_create=DealService._normalize_references
+        )
+        operations = [BulkOperation(action="create", data={"title": "Сделка", "contact_id": 0, "company_id": 0})]
+        prepared = service._validate(operations, [None])
+        
+        assert (prepared[0][2]["contact_id"], prepared[0][2]["company_id"]) == (None, None)
+    
+    def test_response_counts(self):
+        """Итоги считаются по статусам, skipped не считается ошибкой"""
+        operation = BulkOperation(action=BulkAction.DELETE, id=1)
+        results = [
+            BulkService._result(0, operation, "deleted", 1),
+            BulkService._result(1, operation, "error", 2, "Запись не найдена"),
+            BulkService._result(2, operation, "skipped", 3),
+        ]
+        response = BulkService._response(results)
+        assert (response.deleted, response.failed, response.created) == (1, 1, 0)
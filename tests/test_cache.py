@@ -0,0 +1,63 @@
+"""
+Тесты для in-process кешей
+"""
+from app.core.cache import TTLCache
+
+
+class FakeTimer:
+    """Управляемые часы для проверки TTL"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    """Тесты TTL/LRU кеша"""
+    
+    def test_hit_and_miss_counters(self):
+        """Попадания и промахи считаются"""
+        cache = TTLCache(maxsize=10, ttl=30)
+        
+        assert cache.get(1) is None
+        cache.set(1, "user")
+        assert cache.get(1) == "user"
+        
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+    
+    def test_expiration(self):
+        """Запись недоступна после истечения TTL"""
+        timer = FakeTimer()
+        cache = TTLCache(maxsize=10, ttl=30, timer=timer)
+        cache.set(1, "user")
+        
+        timer.now = 29
+        assert cache.get(1) == "user"
+        timer.now = 31
+        assert cache.get(1) is None
+        assert cache.stats()["size"] == 0
+    
+    def test_lru_eviction(self):
+        """При переполнении вытесняется давно не использованная запись"""
+        cache = TTLCache(maxsize=2, ttl=30)
+        cache.set(1, "a")
+        cache.set(2, "b")
+        cache.get(1)
+        cache.set(3, "c")
+        
+        assert cache.get(2) is None
+        assert cache.get(1) == "a"
+        assert cache.get(3) == "c"
+    
+    def test_invalidate(self):
+        """Инвалидация удаляет запись"""
+        cache = TTLCache(maxsize=10, ttl=30)
+        cache.set(1, "user")
+        cache.invalidate(1)
+        
+        assert cache.get(1) is None
@@ -0,0 +1,57 @@
+"""
+Тесты маршрутизации чтений на реплики
+"""
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import database
+from app.core.database import ReplicaSet, RoutingSession
+from app.models.contact import Contact
+
+
+def make_replicas(count: int) -> ReplicaSet:
+    return ReplicaSet([
+        create_async_engine(f"sqlite+aiosqlite:///replica{index}.db") for index in range(count)
+    ])
+
+
+class TestReplicaRouting:
+    """Тесты RoutingSession и ReplicaSet"""
+    
+    def test_round_robin(self):
+        """Реплики выбираются по кругу"""
+        replicas = make_replicas(2)
+        chosen = [replicas.choose() for _ in range(4)]
+        assert chosen == [replicas.engines[0], replicas.engines[1]] * 2
+    
+    def test_no_healthy_replicas(self):
+        """Без здоровых реплик чтение идет на primary"""
+        assert ReplicaSet([]).choose() is None
+    
+    def test_read_only_session_reads_from_replica(self, monkeypatch):
+        """SELECT в read-only сессии идет на реплику, запись — на primary"""
+        replicas = make_replicas(1)
+        monkeypatch.setattr(database, "replicas", replicas)
+        session = RoutingSession()
+        session.info["read_only"] = True
+        
+        replica = replicas.engines[0].sync_engine
+        primary = database.async_engine.sync_engine
+        assert session.get_bind(clause=select(Contact)) is replica
+        assert session.get_bind(clause=select(Contact).with_for_update()) is primary
+        assert session.get_bind(clause=update(Contact).values(first_name="x")) is primary
+    
+    def test_reads_after_write_stay_on_primary(self, monkeypatch):
+        """После записи в сессии чтения идут на primary (read-your-writes)"""
+        replicas = make_replicas(1)
+        monkeypatch.setattr(database, "replicas", replicas)
+        session = RoutingSession()
+        session.info["read_only"] = True
+        session.info["wrote"] = True
+        
+        assert session.get_bind(clause=select(Contact)) is database.async_engine.sync_engine
+    
+    def test_regular_session_uses_primary(self):
+        """Сессии без read_only всегда работают с primary"""
+        session = RoutingSession()
+        assert session.get_bind(clause=select(Contact)) is database.async_engine.sync_engine
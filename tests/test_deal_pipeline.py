@@ -0,0 +1,68 @@
+"""
+Тесты воронки сделок
+"""
+import asyncio
+from decimal import Decimal
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.database import Base
+from app.models.deal import Deal, DealStatus
+from app.services.deal_service import DealService
+
+DEALS = [
+    # (владелец, статус, сумма, валюта, вероятность, удалена)
+    (1, DealStatus.NEW, "100.50", "RUB", 50, False),
+    (1, DealStatus.NEW, "200", "RUB", 10, False),
+    (1, DealStatus.NEW, None, "RUB", 0, False),
+    (1, DealStatus.NEW, "300", "USD", 100, False),
+    (1, DealStatus.NEW, "9999", "RUB", 100, True),
+    (1, DealStatus.IN_PROGRESS, "1000", "RUB", 90, False),
+    (2, DealStatus.NEW, "5000", "RUB", 100, False),
+]
+
+
+async def build_pipeline(url: str, top: int):
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            await session.execute(insert(Deal), [
+                {
+                    "title": f"Сделка {index}",
+                    "owner_id": owner_id,
+                    "status": status,
+                    "amount": Decimal(amount) if amount else None,
+                    "currency": currency,
+                    "probability": probability,
+                    "is_deleted": deleted,
+                }
+                for index, (owner_id, status, amount, currency, probability, deleted) in enumerate(DEALS)
+            ])
+            await session.commit()
+            return await DealService(session).get_pipeline(owner_id=1, top=top)
+    finally:
+        await engine.dispose()
+
+
+class TestDealPipeline:
+    """Тесты агрегатов и top-N сделок по статусам"""
+    
+    def test_pipeline(self, tmp_path):
+        """Итоги по валютам, взвешенная сумма и крупнейшие сделки без удаленных и чужих"""
+        pipeline = asyncio.run(build_pipeline(f"sqlite+aiosqlite:///{tmp_path / 'pipeline.db'}", top=2))
+        columns = {column.status: column for column in pipeline.columns}
+        
+        assert list(columns) == [status.value for status in DealStatus]
+        new = columns[DealStatus.NEW.value]
+        assert new.count == 4
+        totals = {total.currency: total for total in new.totals}
+        assert (totals["RUB"].count, totals["RUB"].amount, totals["RUB"].weighted_amount) == (
+            3, Decimal("300.50"), Decimal("70.25")
+        )
+        assert totals["USD"].weighted_amount == Decimal("300.00")
+        assert [deal.amount for deal in new.top_deals] == [Decimal("300.00"), Decimal("200.00")]
+        assert columns[DealStatus.IN_PROGRESS.value].count == 1
+        assert columns[DealStatus.CANCELLED.value].totals == []
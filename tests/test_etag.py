@@ -0,0 +1,61 @@
+"""
+Тесты для условных GET-запросов
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+from starlette.requests import Request
+
+from app.core.etag import entity_etag, etag_matches, list_etag
+from app.core.pagination import Page, TotalStrategy
+
+
+def make_request(query: str = "", if_none_match: str = None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/contacts/",
+        "query_string": query.encode(),
+        "headers": headers,
+    })
+
+
+class TestETag:
+    """Тесты вычисления и сравнения ETag"""
+    
+    def test_entity_etag_changes_with_updated_at(self):
+        """ETag карточки меняется вместе с updated_at"""
+        created = datetime(2026, 1, 1, 12, 0)
+        obj = SimpleNamespace(id=5, created_at=created, updated_at=None)
+        first = entity_etag(obj)
+        obj.updated_at = datetime(2026, 1, 2, 12, 0)
+        
+        assert first.startswith('W/"5-')
+        assert entity_etag(obj) != first
+    
+    def test_list_etag_depends_on_page_and_params(self):
+        """ETag списка зависит от элементов страницы, total и параметров запроса"""
+        def page(updated_at=None, total=3):
+            item = SimpleNamespace(id=1, created_at=datetime(2026, 1, 1), updated_at=updated_at)
+            return Page(items=[item], total=total, total_strategy=TotalStrategy.EXACT, has_more=True)
+        
+        etag = list_etag(make_request("limit=10"), 1, page())
+        
+        assert etag == list_etag(make_request("limit=10&search="), 1, page())
+        assert etag != list_etag(make_request("limit=20"), 1, page())
+        assert etag != list_etag(make_request("limit=10"), 2, page())
+        assert etag != list_etag(make_request("limit=10"), 1, page(updated_at=datetime(2026, 1, 2)))
+        assert etag != list_etag(make_request("limit=10"), 1, page(total=4))
+    
+    def test_if_none_match(self):
+        """Слабое сравнение, списки значений и *"""
+        etag = 'W/"abc"'
+        assert etag_matches(make_request(if_none_match='W/"abc"'), etag)
+        assert etag_matches(make_request(if_none_match='"abc"'), etag)
+        assert etag_matches(make_request(if_none_match='"x", W/"abc"'), etag)
+        assert etag_matches(make_request(if_none_match="*"), etag)
+        assert not etag_matches(make_request(if_none_match='W/"other"'), etag)
+        assert not etag_matches(make_request(), etag)
@@ -0,0 +1,63 @@
+"""
+Тесты потоковой выгрузки списков
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.core.export import csv_header, encode_csv, encode_ndjson, export_fields, export_query
+from app.models.deal import Deal as DealModel, DealStatus
+from app.schemas.deal import Deal
+
+ROWS = [
+    {
+        "id": 1,
+        "title": 'Поставка, "срочно"',
+        "amount": Decimal("10.50"),
+        "status": DealStatus.NEW,
+        "tags": ["vip"],
+        "created_at": datetime(2024, 1, 2, 3, 4, 5),
+        "notes": None,
+    },
+]
+FIELDS = ["id", "title", "amount", "status", "tags", "created_at", "notes"]
+
+
+class TestExport:
+    """Тесты кодирования выгрузки"""
+    
+    def test_ndjson(self):
+        """Одна строка JSON на запись, типы как в ответах API"""
+        lines = encode_ndjson(ROWS, FIELDS).decode().splitlines()
+        assert json.loads(lines[0]) == {
+            "id": 1,
+            "title": 'Поставка, "срочно"',
+            "amount": "10.50",
+            "status": "Новая",
+            "tags": ["vip"],
+            "created_at": "2024-01-02T03:04:05",
+            "notes": None,
+        }
+    
+    def test_csv(self):
+        """CSV экранирует кавычки и запятые, списки пишутся JSON, None — пустой строкой"""
+        body = (csv_header(FIELDS) + encode_csv(ROWS, FIELDS)).decode()
+        header, row = list(csv.reader(io.StringIO(body)))
+        assert header == FIELDS
+        assert row == ["1", 'Поставка, "срочно"', "10.50", "Новая", '["vip"]', "2024-01-02T03:04:05", ""]
+    
+    def test_query_selects_only_fields(self):
+        """Выбираются только нужные колонки в порядке первичного ключа"""
+        query = export_query(select(DealModel).where(DealModel.owner_id == 1), ["id", "title"])
+        sql = str(query.compile())
+        assert sql.startswith("SELECT deals.id, deals.title \nFROM deals")
+        assert "ORDER BY deals.id" in sql
+    
+    def test_default_fields(self):
+        """Без ?fields= выгружаются все поля схемы"""
+        assert export_fields(Deal) == tuple(Deal.model_fields)
+        assert export_fields(Deal, ("title",)) == ("title",)
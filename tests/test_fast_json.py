@@ -0,0 +1,75 @@
+"""
+Тесты быстрого пути сериализации ответов
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi.responses import JSONResponse
+
+from app.core import fast_json
+from app.core.fast_json import dumps, serializer_for
+from app.models.deal import DealStatus
+from app.schemas.deal import Deal
+
+
+def make_deal(**overrides) -> SimpleNamespace:
+    values = dict(
+        id=1,
+        owner_id=2,
+        title="Сделка «Ёлка»",
+        description=None,
+        amount=Decimal("1234.50"),
+        currency="RUB",
+        probability=40,
+        status=DealStatus.IN_PROGRESS,
+        expected_close_date=datetime(2026, 3, 1, 12, 30),
+        contact_id=None,
+        company_id=3,
+        source="website",
+        notes=None,
+        custom_fields={"region": "EU", "score": 0.75, "nested": {"a": [1, 2]}},
+        tags=["vip", "q1"],
+        actual_close_date=None,
+        created_at=datetime(2026, 1, 1, 9, 0, 0, 123456, tzinfo=timezone.utc),
+        updated_at=datetime(2026, 1, 2, 9, 0, tzinfo=timezone(timedelta(hours=3))),
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def pydantic_body(row) -> bytes:
+    """Тело ответа по текущему пути через response_model"""
+    return JSONResponse(content=Deal.model_validate(row).model_dump(mode="json", by_alias=True)).body
+
+
+class TestFastJSON:
+    """Быстрый путь должен давать те же байты, что и Pydantic"""
+    
+    def test_matches_pydantic_output(self):
+        """Decimal, Enum, datetime с UTC/смещением/без зоны и JSON-поля"""
+        row = make_deal()
+        assert dumps(serializer_for(Deal)(row)) == pydantic_body(row)
+    
+    def test_matches_pydantic_output_with_nulls(self):
+        """Пустые необязательные поля"""
+        row = make_deal(amount=None, expected_close_date=None, updated_at=None, custom_fields={}, tags=[])
+        assert dumps(serializer_for(Deal)(row)) == pydantic_body(row)
+    
+    def test_row_mapping(self):
+        """Строки результата в виде mapping сериализуются так же"""
+        row = make_deal()
+        mapping = dict(vars(row))
+        assert dumps(serializer_for(Deal)(mapping)) == pydantic_body(row)
+    
+    def test_field_order_follows_schema(self):
+        """Порядок ключей совпадает с порядком полей схемы"""
+        content = json.loads(dumps(serializer_for(Deal)(make_deal())))
+        assert list(content) == list(Deal.model_fields)
+    
+    def test_stdlib_json_fallback(self, monkeypatch):
+        """Без orjson результат тот же"""
+        monkeypatch.setattr(fast_json, "orjson", None)
+        row = make_deal()
+        assert dumps(serializer_for(Deal)(row)) == pydantic_body(row)
@@ -0,0 +1,56 @@
+"""
+Тесты разреженных наборов полей (?fields=)
+"""
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from app.core import fast_json
+from app.core.config import settings
+from app.core.fieldsets import parse_fields
+from app.models.deal import DealStatus
+from app.schemas.deal import Deal, DealList
+
+
+class TestFieldsets:
+    """Тесты разбора fields и урезанных ответов"""
+    
+    def test_parse_keeps_schema_order(self):
+        """Поля возвращаются в порядке схемы, без дублей"""
+        assert parse_fields("id, title,amount,title", Deal) == ("title", "amount", "id")
+    
+    def test_parse_empty(self):
+        """Без fields — полный ответ"""
+        assert parse_fields(None, Deal) is None
+        assert parse_fields(" , ", Deal) is None
+    
+    def test_parse_unknown_field(self):
+        """Неизвестное поле — 400"""
+        with pytest.raises(HTTPException) as exc_info:
+            parse_fields("id,password", Deal)
+        assert exc_info.value.status_code == 400
+    
+    @pytest.mark.parametrize("fast", [False, True])
+    def test_partial_list_content(self, monkeypatch, fast):
+        """Элементы списка содержат только выбранные поля в обоих путях сериализации"""
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", fast)
+        row = SimpleNamespace(id=7, title="Сделка", amount=Decimal("10.50"), status=DealStatus.NEW)
+        page_fields = {
+            "items": [row], "total": 1, "page": 1, "size": 10, "pages": 1,
+            "next_cursor": None, "has_more": False, "total_strategy": "exact",
+        }
+        fields = parse_fields("id,title,amount,status", Deal)
+        
+        content = fast_json.list_content(DealList, Deal, page_fields, fields)
+        if fast:
+            body = fast_json.dumps(content)
+        else:
+            body = JSONResponse(content=content.model_dump(mode="json")).body
+        
+        assert json.loads(body)["items"] == [
+            {"title": "Сделка", "amount": "10.50", "status": "Новая", "id": 7}
+        ]
@@ -0,0 +1,95 @@
+"""
+Тесты приема логов фронтенда
+"""
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import logs
+from app.core.frontend_logs import FrontendLogPipeline
+from app.core.security import create_access_token
+
+
+def record(level: str = "info", message: str = "m") -> dict:
+    return {"level": level, "message": message}
+
+
+class TestFrontendLogPipeline:
+    """Лимит на клиента, выборка и фоновая запись"""
+
+    def test_rate_limit_and_sampling(self):
+        """Сверх burst записи отбрасываются (ошибки проходят первыми), лимит пополняется со временем"""
+        now = [0.0]
+        samples = iter([0.1, 0.9] * 10)
+        pipeline = FrontendLogPipeline(
+            queue_size=100, write_batch=10, rate=2, burst=3, info_sample_rate=0.5,
+            timer=lambda: now[0], sample=lambda: next(samples),
+        )
+        first = pipeline.submit("a", [record("info", "i1"), record("info", "i2"), record("info", "i3"),
+                                      record("error", "e1"), record("warn", "w1")])
+        other = pipeline.submit("b", [record("error")])
+        limited = pipeline.submit("a", [record("error")])
+        now[0] = 1.0
+        refilled = pipeline.submit("a", [record("error"), record("error"), record("error")])
+
+        assert first == {"accepted": 3, "sampled": 1, "rate_limited": 1, "queue_full": 0}
+        assert [item["message"] for item in list(pipeline._queue)[:3]] == ["e1", "w1", "i1"]
+        assert other["accepted"] == 1
+        assert limited["rate_limited"] == 1
+        assert refilled["accepted"] == 2
+        assert pipeline.stats()["dropped"] == {"rate_limited": 3, "sampled": 1, "queue_full": 0}
+
+    def test_queue_and_writer(self):
+        """Переполнение очереди считается, фоновая запись пишет пачками, stop дописывает остаток"""
+        async def scenario():
+            batches = []
+            pipeline = FrontendLogPipeline(
+                queue_size=5, write_batch=2, rate=100, burst=100, write=batches.append
+            )
+            result = pipeline.submit("a", [record() for _ in range(7)])
+            pipeline.start()
+            await asyncio.sleep(0.05)
+            pipeline.submit("a", [record()])
+            await pipeline.stop()
+            return result, batches, pipeline.stats()
+
+        result, batches, stats = asyncio.run(scenario())
+        assert result["queue_full"] == 2
+        assert [len(batch) for batch in batches] == [2, 2, 1, 1]
+        assert stats["written"] == 6
+        assert stats["queued"] == 0
+
+
+class TestFrontendLogsEndpoint:
+    """POST /frontend-logs"""
+
+    def test_batch_single_and_limits(self, monkeypatch):
+        """Массив и одна запись принимаются, клиент — пользователь из токена (jose)"""
+        pipeline = FrontendLogPipeline(queue_size=100, write_batch=10, rate=0.001, burst=3)
+        monkeypatch.setattr(logs, "frontend_logs", pipeline)
+        monkeypatch.setattr(logs.settings, "FRONTEND_LOG_MAX_BATCH", 3)
+        app = FastAPI()
+        app.include_router(logs.router, prefix="/frontend-logs")
+        entry = {"level": "error", "message": "boom", "url": "/deals", "userAgent": "ua", "timestamp": "t"}
+        token = create_access_token({"sub": "42"})
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+                headers = {"Authorization": f"Bearer {token}"}
+                batch = await client.post("/frontend-logs", json=[entry, entry], headers=headers)
+                single = await client.post("/frontend-logs", json=entry, headers=headers)
+                limited = await client.post("/frontend-logs", json=entry, headers=headers)
+                anonymous = await client.post("/frontend-logs", json=entry)
+                too_large = await client.post("/frontend-logs", json=[entry] * 4)
+            return batch, single, limited, anonymous, too_large
+
+        batch, single, limited, anonymous, too_large = asyncio.run(scenario())
+        assert batch.json()["accepted"] == 2
+        assert single.json()["accepted"] == 1
+        assert limited.status_code == 429
+        assert anonymous.status_code == 200
+        assert too_large.status_code == 413
+        assert list(pipeline._buckets) == ["user:42", "ip:127.0.0.1"]
+        assert pipeline._queue[0]["user_id"] == "42"
@@ -0,0 +1,47 @@
+"""
+Тесты импорта CSV
+"""
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.schemas.contact import ContactCreate
+from app.services.import_service import ImportReport, ImportService
+
+LOOKUPS = {"company": ("company_id", {"acme": 5})}
+
+
+class TestImport:
+    """Тесты подготовки и пакетной валидации строк"""
+    
+    def test_prepare_parses_json_and_resolves_company(self):
+        """JSON-колонки разбираются, название компании заменяется на id"""
+        values = {"first_name": "A", "tags": '["vip"]', "company": " ACME "}
+        assert ImportService._prepare(values, {"tags"}, LOOKUPS) is None
+        assert values == {"first_name": "A", "tags": ["vip"], "company_id": 5}
+    
+    def test_prepare_errors(self):
+        """Неизвестная компания и некорректный JSON — ошибка строки"""
+        assert "не найдена" in ImportService._prepare({"company": "Other"}, set(), LOOKUPS)
+        assert "JSON" in ImportService._prepare({"tags": "[vip"}, {"tags"}, LOOKUPS)
+    
+    def test_validate_batch_keeps_valid_rows(self):
+        """Ошибки пачки относятся к своим строкам, остальные строки проходят"""
+        report = ImportReport()
+        rows = [
+            (2, {"first_name": "A", "last_name": "B"}),
+            (3, {"last_name": "B", "email": "bad"}),
+            (4, {"first_name": "C", "last_name": "D", "company_id": "0"}),
+        ]
+        valid = ImportService._validate(TypeAdapter(List[ContactCreate]), rows, report)
+        
+        assert [line for line, _ in valid] == [2, 4]
+        assert valid[1][1]["company_id"] is None
+        assert report.failed == 1
+        assert report.errors[0]["line"] == 3
+        assert [message.split(":")[0] for message in report.errors[0]["errors"]] == ["first_name", "email"]
+    
+    def test_report(self):
+        """Отчет содержит скорость импорта"""
+        report = ImportReport(total=1000, imported=990, duration=0.5)
+        assert report.as_dict()["rows_per_second"] == 2000
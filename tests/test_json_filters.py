@@ -0,0 +1,46 @@
+"""
+Тесты фильтров по тегам и пользовательским полям
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql, sqlite
+from starlette.requests import Request
+
+from app.core.json_filters import custom_field_params, json_filters
+from app.models.contact import Contact
+
+
+def make_request(query: str) -> Request:
+    return Request({"type": "http", "query_string": query.encode(), "headers": []})
+
+
+def compile_sql(condition, dialect) -> str:
+    return str(condition.compile(dialect=dialect))
+
+
+class TestJsonFilters:
+    """Тесты разбора параметров и построения условий"""
+    
+    def test_custom_field_params(self):
+        """Параметры cf.<ключ> собираются, остальные и пустые пропускаются"""
+        request = make_request("cf.region=EU&cf.score=5&cf.empty=&status=lead")
+        assert custom_field_params(request) == {"region": "EU", "score": "5"}
+    
+    def test_custom_field_params_invalid_key(self):
+        """Недопустимое имя поля — 400"""
+        with pytest.raises(HTTPException) as exc:
+            custom_field_params(make_request("cf.a%22b=1"))
+        assert exc.value.status_code == 400
+    
+    def test_postgresql_uses_containment(self):
+        """В PostgreSQL условия строятся через @> (GIN jsonb_path_ops)"""
+        tags, custom_fields = json_filters("postgresql", Contact, ["vip"], {"region": "EU", "score": "5"})
+        assert "contacts.tags @>" in compile_sql(tags, postgresql.dialect())
+        sql = compile_sql(custom_fields, postgresql.dialect())
+        assert sql.count("contacts.custom_fields @>") == 3  # region, score как строка и как число
+    
+    def test_sqlite_fallback(self):
+        """В SQLite — json_each для тегов и json_extract для полей"""
+        tags, custom_fields = json_filters("sqlite", Contact, ["vip", "eu"], {"region": "EU"})
+        assert compile_sql(tags, sqlite.dialect()).count("json_each(contacts.tags)") == 2
+        assert "json_extract(contacts.custom_fields" in compile_sql(custom_fields, sqlite.dialect())
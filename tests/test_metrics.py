@@ -0,0 +1,55 @@
+"""
+Тесты для метрик процесса
+"""
+import asyncio
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+from app.main import app
+
+
+class TestHistogram:
+    """Тесты гистограммы"""
+    
+    def test_buckets_are_cumulative(self):
+        """Каждая корзина учитывает все значения не больше своей границы"""
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        
+        snapshot = histogram.snapshot()
+        assert snapshot["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+        assert snapshot["count"] == 4
+        assert snapshot["sum"] == 3.65
+    
+    def test_empty_snapshot(self):
+        """Пустая гистограмма"""
+        snapshot = Histogram(buckets=(1.0,)).snapshot()
+        assert snapshot == {"buckets": {"1.0": 0, "+Inf": 0}, "count": 0, "sum": 0.0}
+
+
+class TestMetricsEndpoint:
+    """Доступ к GET /metrics"""
+    
+    def get_metrics(self, headers=None) -> httpx.Response:
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+                return await client.get("/metrics", headers=headers)
+        return asyncio.run(scenario())
+    
+    def test_disabled_without_token(self, monkeypatch):
+        """Без METRICS_TOKEN эндпоинт выключен"""
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+        assert self.get_metrics().status_code == 404
+    
+    def test_requires_token(self, monkeypatch):
+        """Метрики отдаются только с верным Bearer токеном"""
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape")
+        assert self.get_metrics().status_code == 401
+        assert self.get_metrics({"Authorization": "Bearer wrong"}).status_code == 401
+        response = self.get_metrics({"Authorization": "Bearer scrape"})
+        assert response.status_code == 200
+        assert "password_hashing" in response.json()
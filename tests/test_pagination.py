@@ -0,0 +1,209 @@
+"""
+Тесты для пагинации списков
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core import pagination
+from app.core.config import settings
+from app.core.database import Base
+from app.core.pagination import Page, TotalStrategy, decode_cursor, encode_cursor
+from app.models.contact import Contact
+from app.services.contact_service import ContactService
+
+STARTED = datetime(2026, 1, 1, 12, 0, 0, 500000)
+
+
+async def list_pages(url: str, requests: list, created_at: list):
+    """Контакты владельца 1 с заданными created_at (и один чужой); страницы get_contacts.
+    
+    requests — параметры get_contacts; строка "next" вместо курсора означает next_cursor
+    предыдущей страницы. Для каждой страницы возвращаются (Page, id элементов, число
+    запросов к таблице contacts).
+    """
+    engine = create_async_engine(url)
+    statements = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            await session.execute(insert(Contact), [
+                {"id": index, "first_name": f"К{index}", "last_name": "Тест", "owner_id": 1, "created_at": moment}
+                for index, moment in enumerate(created_at, 1)
+            ] + [{"id": 1000, "first_name": "Чужой", "last_name": "Тест", "owner_id": 2, "created_at": STARTED}])
+            await session.commit()
+            
+            service = ContactService(session)
+            pages = []
+            for params in requests:
+                params = dict(params)
+                if params.get("cursor") == "next":
+                    params["cursor"] = decode_cursor(pages[-1][0].next_cursor)
+                statements.clear()
+                page = await service.get_contacts(owner_id=1, **params)
+                queries = sum(1 for statement in statements if "FROM contacts" in statement)
+                pages.append((page, [item.id for item in page.items], queries))
+            return pages
+    finally:
+        await engine.dispose()
+
+
+def minutes(count: int) -> list:
+    """created_at с шагом в минуту: id 1 — самый старый"""
+    return [STARTED + timedelta(minutes=index) for index in range(count)]
+
+
+class TestCursor:
+    """Тесты курсоров keyset-пагинации"""
+    
+    def test_cursor_roundtrip(self):
+        """Курсор восстанавливает (created_at, id)"""
+        created_at = datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        cursor = encode_cursor(created_at, 42)
+        
+        assert decode_cursor(cursor) == (created_at, 42)
+    
+    def test_empty_cursor(self):
+        """Пустой курсор означает первую страницу"""
+        assert decode_cursor(None) is None
+        assert decode_cursor("") is None
+    
+    def test_invalid_cursor(self):
+        """Невалидный курсор — 400"""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("not-a-cursor")
+        assert exc_info.value.status_code == 400
+
+
+class TestPage:
+    """Тесты формирования ответа списка"""
+    
+    def test_response_with_exact_total(self):
+        """Точный total дает количество страниц"""
+        page = Page(items=[], total=25, total_strategy=TotalStrategy.EXACT, has_more=True)
+        data = page.as_response(skip=10, limit=10)
+        
+        assert data["page"] == 2
+        assert data["pages"] == 3
+        assert data["total_strategy"] == "exact"
+    
+    def test_response_without_total(self):
+        """Без подсчета total и pages не заполняются"""
+        page = Page(items=[], total=None, total_strategy=TotalStrategy.NONE, has_more=True)
+        data = page.as_response(skip=0, limit=10)
+        
+        assert data["total"] is None
+        assert data["pages"] is None
+        assert data["has_more"] is True
+
+
+class TestPaginate:
+    """paginate на SQLite через ContactService.get_contacts"""
+    
+    def run(self, tmp_path, requests, created_at=None):
+        url = f"sqlite+aiosqlite:///{tmp_path / 'pages.db'}"
+        return asyncio.run(list_pages(url, requests, created_at or minutes(5)))
+    
+    def test_cursor_pages_skip_total_by_default(self, tmp_path):
+        """Без total_strategy страница по курсору не считает total, первая страница — точно"""
+        first, second, counted = self.run(tmp_path, [
+            {"limit": 2},
+            {"limit": 2, "cursor": "next"},
+            {"limit": 2, "cursor": "next", "total_strategy": TotalStrategy.EXACT},
+        ])
+        
+        assert (first[0].total_strategy, first[0].total) == (TotalStrategy.EXACT, 5)
+        assert (second[0].total_strategy, second[0].total) == (TotalStrategy.NONE, None)
+        assert second[2] == 1
+        assert second[1] == [3, 2]
+        assert (counted[0].total_strategy, counted[0].total) == (TotalStrategy.EXACT, 5)
+    
+    def test_exact_total_in_page_query(self, tmp_path):
+        """Точный total — count(*) OVER () в том же запросе, что и страница"""
+        [(page, ids, queries)] = self.run(tmp_path, [{"limit": 2, "skip": 1}])
+        
+        assert ids == [4, 3]
+        assert (page.total, page.total_strategy) == (5, TotalStrategy.EXACT)
+        assert queries == 1
+    
+    def test_has_more_from_extra_row(self, tmp_path):
+        """has_more и next_cursor определяются по limit + 1 строке без отдельного запроса"""
+        middle, last = self.run(tmp_path, [
+            {"limit": 2, "skip": 2, "total_strategy": TotalStrategy.NONE},
+            {"limit": 2, "skip": 3, "total_strategy": TotalStrategy.NONE},
+        ])
+        
+        assert (middle[1], middle[0].has_more, middle[2]) == ([3, 2], True, 1)
+        assert decode_cursor(middle[0].next_cursor)[1] == 2
+        assert (last[1], last[0].has_more, last[0].next_cursor) == ([2, 1], False, None)
+    
+    def test_none_strategy(self, tmp_path):
+        """none — total не считается"""
+        [(page, ids, queries)] = self.run(tmp_path, [{"limit": 2, "total_strategy": TotalStrategy.NONE}])
+        
+        assert (page.total, page.total_strategy, page.has_more) == (None, TotalStrategy.NONE, True)
+        assert queries == 1
+    
+    def test_estimated_falls_back_to_exact(self, tmp_path, monkeypatch):
+        """estimated: без оценки (SQLite) и ниже порога — точный подсчет, выше порога — оценка"""
+        [(sqlite_page, _, _)] = self.run(tmp_path, [{"limit": 2, "total_strategy": TotalStrategy.ESTIMATED}])
+        
+        estimates = iter([settings.LIST_COUNT_ESTIMATE_THRESHOLD - 1, settings.LIST_COUNT_ESTIMATE_THRESHOLD])
+        
+        async def estimated_total(db, query, model):
+            return next(estimates)
+        
+        monkeypatch.setattr(pagination, "_estimated_total", estimated_total)
+        small, large = asyncio.run(list_pages(
+            f"sqlite+aiosqlite:///{tmp_path / 'estimated.db'}",
+            [{"limit": 2, "total_strategy": TotalStrategy.ESTIMATED}] * 2,
+            minutes(5)
+        ))
+        
+        assert (sqlite_page.total, sqlite_page.total_strategy) == (5, TotalStrategy.EXACT)
+        assert (small[0].total, small[0].total_strategy) == (5, TotalStrategy.EXACT)
+        assert (large[0].total, large[0].total_strategy) == (
+            settings.LIST_COUNT_ESTIMATE_THRESHOLD, TotalStrategy.ESTIMATED
+        )
+    
+    def test_offset_past_end(self, tmp_path):
+        """Страница за пределами выборки пуста, total считается отдельным count"""
+        [(page, ids, queries)] = self.run(tmp_path, [{"limit": 2, "skip": 10}])
+        
+        assert ids == []
+        assert (page.total, page.has_more) == (5, False)
+        assert queries == 2
+    
+    def test_cursor_walk_over_equal_created_at(self, tmp_path):
+        """Обход по next_cursor при совпадающих created_at: без повторов и пропусков"""
+        whole_second = STARTED.replace(microsecond=0)
+        created_at = [
+            whole_second, STARTED, STARTED, whole_second, STARTED,
+            STARTED + timedelta(minutes=1), whole_second, STARTED + timedelta(minutes=1), STARTED,
+        ]
+        expected = [
+            item_id for _, item_id in
+            sorted(((moment, index) for index, moment in enumerate(created_at, 1)), reverse=True)
+        ]
+        for limit in (2, 3, 4):
+            pages_count = -(-len(created_at) // limit)
+            pages = asyncio.run(list_pages(
+                f"sqlite+aiosqlite:///{tmp_path / f'walk{limit}.db'}",
+                [{"limit": limit}] + [{"limit": limit, "cursor": "next"}] * (pages_count - 1),
+                created_at
+            ))
+            walked = [item_id for _, ids, _ in pages for item_id in ids]
+            
+            assert walked == expected, limit
+            assert all(page.next_cursor is not None for page, _, _ in pages[:-1])
+            assert pages[-1][0].next_cursor is None
+            assert not pages[-1][0].has_more
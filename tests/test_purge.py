@@ -0,0 +1,111 @@
+"""
+Тесты окончательного удаления мягко удаленных записей
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.activity import Activity
+from app.models.company import Company
+from app.models.contact import Contact
+from app.models.deal import Deal
+from app.models.file import File
+from app.services.contact_service import ContactService
+from app.services.purge_service import PurgeService
+
+NOW = datetime.now(timezone.utc)
+OLD = NOW - timedelta(days=settings.PURGE_RETENTION_DAYS + 10)
+RECENT = NOW - timedelta(days=1)
+
+
+def _deleted(at):
+    return {"is_deleted": at is not None, "deleted_at": at}
+
+
+async def seed_and_purge(url: str):
+    """Цепочка удаленных записей файл → активность → сделка → контакт → компания,
+    компания с живой ссылкой, недавно удаленная компания и удаление через сервис
+    """
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            await session.execute(insert(Company), [
+                {"id": 1, "name": "Удалена давно", "owner_id": 1, **_deleted(OLD)},
+                {"id": 2, "name": "Есть живой контакт", "owner_id": 1, **_deleted(OLD)},
+                {"id": 3, "name": "Удалена недавно", "owner_id": 1, **_deleted(RECENT)},
+            ])
+            await session.execute(insert(Contact), [
+                {"id": 1, "first_name": "А", "last_name": "А", "company_id": 1, "owner_id": 1, **_deleted(OLD)},
+                {"id": 2, "first_name": "Б", "last_name": "Б", "company_id": 2, "owner_id": 1, **_deleted(None)},
+                {"id": 3, "first_name": "В", "last_name": "В", "owner_id": 1, **_deleted(None)},
+            ])
+            await session.execute(insert(Deal), [
+                {"id": 1, "title": "Сделка", "contact_id": 1, "owner_id": 1, **_deleted(OLD)},
+            ])
+            await session.execute(insert(Activity), [
+                {"id": 1, "title": "Звонок", "type": "call", "deal_id": 1, "owner_id": 1, **_deleted(OLD)},
+            ])
+            await session.execute(insert(File), [
+                {
+                    "id": 1, "filename": "a.txt", "original_filename": "a.txt", "file_path": "/uploads/a.txt",
+                    "file_size": 1, "mime_type": "text/plain", "activity_id": 1, "owner_id": 1, **_deleted(OLD),
+                },
+            ])
+            await session.commit()
+            
+            await ContactService(session).delete_contact(3, owner_id=1)
+            first = await PurgeService(session).purge(now=NOW)
+            remaining = await _ids(session)
+            # Контакт, удаленный через сервис, очищается после срока хранения от deleted_at
+            later = await PurgeService(session).purge(
+                now=NOW + timedelta(days=settings.PURGE_RETENTION_DAYS, minutes=1)
+            )
+            return first, remaining, later, await _ids(session)
+    finally:
+        await engine.dispose()
+
+
+async def _ids(session: AsyncSession) -> dict:
+    return {
+        model.__tablename__: sorted((await session.execute(select(model.id))).scalars())
+        for model in (File, Activity, Deal, Contact, Company)
+    }
+
+
+class TestPurge:
+    """Пакетная очистка в порядке внешних ключей"""
+    
+    def test_purge_in_fk_order(self, tmp_path, monkeypatch):
+        """Удаленные записи старше срока очищаются пакетами; записи со ссылками и недавно удаленные остаются"""
+        monkeypatch.setattr(settings, "PURGE_BATCH_SIZE", 1)
+        monkeypatch.setattr(settings, "UPLOAD_ROOT", str(tmp_path))
+        (tmp_path / "a.txt").write_text("a")
+        
+        first, remaining, later, final = asyncio.run(
+            seed_and_purge(f"sqlite+aiosqlite:///{tmp_path / 'purge.db'}")
+        )
+        
+        assert first["complete"] is True
+        assert first["files_removed"] == 1
+        assert not (tmp_path / "a.txt").exists()
+        tables = {report["table"]: report for report in first["tables"]}
+        assert [report["table"] for report in first["tables"]] == [
+            "files", "activities", "deals", "contacts", "companies"
+        ]
+        assert tables["companies"]["selected"] == 2
+        assert tables["companies"]["deleted"] == 1
+        assert tables["companies"]["referenced"] == 1
+        assert tables["companies"]["batches"] == 2
+        assert remaining == {
+            "files": [], "activities": [], "deals": [], "contacts": [2, 3], "companies": [2, 3],
+        }
+        
+        assert {report["table"]: report["deleted"] for report in later["tables"]}["contacts"] == 1
+        assert final["contacts"] == [2]
+        assert final["companies"] == [2]
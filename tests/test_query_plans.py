@@ -0,0 +1,123 @@
+"""
+Регрессионные тесты планов списочных запросов: частичные индексы владельца
+"""
+import asyncio
+import re
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.database import Base
+
+from app.models.activity import Activity
+from app.models.company import Company
+from app.models.contact import Contact
+from app.models.deal import Deal
+from app.models.file import File
+from app.services.activity_service import ActivityService
+from app.services.company_service import CompanyService
+from app.services.contact_service import ContactService
+from app.services.deal_service import DealService
+from app.services.file_service import FileService
+
+OWNERS = 20
+ROWS = 2000
+
+# Обязательные поля моделей для сидирования
+REQUIRED = {
+    Contact: {"first_name": "Имя", "last_name": "Фамилия"},
+    Company: {"name": "Компания"},
+    Deal: {"title": "Сделка", "status": "NEW"},
+    Activity: {"title": "Звонок", "type": "call"},
+    File: {
+        "filename": "a.txt",
+        "original_filename": "a.txt",
+        "file_path": "/uploads/a.txt",
+        "file_size": 1,
+        "mime_type": "text/plain",
+    },
+}
+
+# (сервис, метод, фильтры, ожидаемый индекс)
+CASES = [
+    (ContactService, "get_contacts", {}, "ix_contacts_owner_active"),
+    (ContactService, "get_contacts", {"company_id": 7}, "ix_contacts_owner_company_id_active"),
+    (CompanyService, "get_companies", {}, "ix_companies_owner_active"),
+    (DealService, "get_deals", {}, "ix_deals_owner_active"),
+    (DealService, "get_deals", {"contact_id": 7}, "ix_deals_owner_contact_id_active"),
+    (DealService, "get_deals", {"company_id": 7}, "ix_deals_owner_company_id_active"),
+    (ActivityService, "get_activities", {}, "ix_activities_owner_active"),
+    (ActivityService, "get_activities", {"contact_id": 7}, "ix_activities_owner_contact_id_active"),
+    (ActivityService, "get_activities", {"company_id": 7}, "ix_activities_owner_company_id_active"),
+    (ActivityService, "get_activities", {"deal_id": 7}, "ix_activities_owner_deal_id_active"),
+    (FileService, "get_files", {}, "ix_files_owner_active"),
+    (FileService, "get_files", {"contact_id": 7}, "ix_files_owner_contact_id_active"),
+    (FileService, "get_files", {"company_id": 7}, "ix_files_owner_company_id_active"),
+    (FileService, "get_files", {"deal_id": 7}, "ix_files_owner_deal_id_active"),
+    (FileService, "get_files", {"activity_id": 7}, "ix_files_owner_activity_id_active"),
+]
+
+
+async def seed(session: AsyncSession) -> None:
+    """Записи OWNERS владельцев, каждая десятая удалена; внешние ключи не проверяются SQLite"""
+    started = datetime.now(timezone.utc)
+    for model, required in REQUIRED.items():
+        rows = []
+        for i in range(ROWS):
+            row = {
+                **required,
+                "owner_id": i % OWNERS + 1,
+                "is_deleted": i % 10 == 0,
+                "created_at": started - timedelta(seconds=i),
+            }
+            for column in ("contact_id", "company_id", "deal_id", "activity_id"):
+                if hasattr(model, column):
+                    row[column] = i % 50 + 1
+            rows.append(row)
+        await session.execute(insert(model), rows)
+    await session.commit()
+    await session.execute(text("ANALYZE"))
+
+
+async def list_plans(url: str) -> list:
+    """(метод, фильтры, ожидаемый индекс, план запроса страницы) для каждого случая CASES"""
+    engine = create_async_engine(url)
+    statements = []
+    
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    
+    plans = []
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            await seed(session)
+            for service_class, method, filters, index in CASES:
+                statements.clear()
+                await getattr(service_class(session), method)(owner_id=3, limit=20, **filters)
+                statement, parameters = statements[0]
+                connection = await session.connection()
+                result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                plans.append((method, filters, index, " | ".join(row[-1] for row in result)))
+    finally:
+        await engine.dispose()
+    return plans
+
+
+class TestQueryPlans:
+    """Списки каждого сервиса выполняются по частичным индексам (owner_id, ..., created_at, id)"""
+    
+    def test_list_queries_use_owner_indexes(self, tmp_path):
+        """Запрос страницы списка использует индекс владельца (и связи, если есть фильтр)"""
+        plans = asyncio.run(list_plans(f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}"))
+        for method, filters, index, plan in plans:
+            if filters:
+                assert f"INDEX {index} " in plan, f"{method} {filters}: {plan}"
+            else:
+                # В SQLite сортировка идет по julianday(created_at), поэтому индексы владельца
+                # для нее равноценны и планировщик может выбрать любой из них
+                family = index.replace("_owner_active", r"_owner_\w*active ")
+                assert re.search(f"INDEX {family}", plan), f"{method}: {plan}"
@@ -0,0 +1,127 @@
+"""
+Тесты планировщика напоминаний об активностях
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.reminder_queue import MemoryReminderQueue
+from app.models.activity import Activity
+from app.services.reminder_service import ReminderService
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+ADVANCE = timedelta(minutes=settings.REMINDER_ADVANCE_MINUTES)
+
+ACTIVITIES = [
+    # (id, scheduled_at - NOW в минутах, due_date - NOW в минутах, статус, удалена, исполнитель)
+    (1, 20, None, "pending", False, None),  # напоминание через 5 минут
+    (2, None, 18, "pending", False, 7),  # по due_date, исполнителю
+    (3, 25, None, "completed", False, None),
+    (4, 20, None, "pending", True, None),
+    (5, 24, None, "pending", False, None),  # через 9 минут: второй тик
+    (6, 600, None, "pending", False, None),  # за горизонтом сканирования
+]
+
+
+def _at(minutes):
+    return None if minutes is None else (NOW + timedelta(minutes=minutes)).replace(tzinfo=None)
+
+
+async def window_plan(url: str) -> str:
+    """План запроса окна напоминаний (SQLite EXPLAIN QUERY PLAN)"""
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            query = ReminderService._window_query(_at(0), _at(15)).compile(
+                engine.sync_engine, compile_kwargs={"literal_binds": True}
+            )
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {query}")
+            return " | ".join(row[-1] for row in result)
+    finally:
+        await engine.dispose()
+
+
+async def run_ticks(url: str):
+    """Два тика с интервалом REMINDER_INTERVAL_SECONDS и перенос активности между ними"""
+    engine = create_async_engine(url)
+    queue = MemoryReminderQueue()
+    dispatched = []
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            await session.execute(insert(Activity), [
+                {
+                    "id": activity_id,
+                    "title": f"Активность {activity_id}",
+                    "type": "call",
+                    "owner_id": 1,
+                    "assigned_to_id": assigned_to_id,
+                    "scheduled_at": _at(scheduled),
+                    "due_date": _at(due),
+                    "status": status,
+                    "is_deleted": deleted,
+                }
+                for activity_id, scheduled, due, status, deleted, assigned_to_id in ACTIVITIES
+            ])
+            await session.commit()
+            
+            service = ReminderService(session, queue)
+            dispatch = lambda *reminder: dispatched.append(reminder)  # noqa: E731
+            first = await service.tick(dispatch, now=NOW)
+            first_dispatched = list(dispatched)
+            
+            # Активность 6 перенесена внутрь уже просканированного окна
+            activity = await session.get(Activity, 6)
+            activity.scheduled_at = _at(23)
+            await session.commit()
+            await session.refresh(activity)
+            await service.reschedule([activity], now=NOW)
+            
+            dispatched.clear()
+            second = await service.tick(
+                dispatch, now=NOW + timedelta(seconds=settings.REMINDER_INTERVAL_SECONDS)
+            )
+            stale = await service.get_due_activity(1, 1, NOW + timedelta(minutes=1))
+            current = await service.get_due_activity(1, 1, NOW + timedelta(minutes=20) - ADVANCE)
+            return first, first_dispatched, second, list(dispatched), stale, current
+    finally:
+        await engine.dispose()
+
+
+class TestReminders:
+    """Сканирование окна по high-water mark и отправка наступающих напоминаний"""
+    
+    def test_ticks(self, tmp_path):
+        """Тик передает напоминания до следующего тика с eta и не сканирует окно повторно"""
+        first, first_dispatched, second, second_dispatched, stale, current = asyncio.run(
+            run_ticks(f"sqlite+aiosqlite:///{tmp_path / 'reminders.db'}")
+        )
+        
+        assert first == {"scanned": 3, "dispatched": 2, "queued": 1}
+        assert sorted(first_dispatched) == [
+            (1, 1, NOW + timedelta(minutes=20) - ADVANCE),
+            (2, 7, NOW + timedelta(minutes=18) - ADVANCE),
+        ]
+        
+        # Второй тик сканирует только новые 5 минут окна (там ничего нет) и отправляет
+        # оставшееся в очереди и перенесенную активность
+        assert second == {"scanned": 0, "dispatched": 2, "queued": 0}
+        assert sorted(second_dispatched) == [
+            (5, 1, NOW + timedelta(minutes=24) - ADVANCE),
+            (6, 1, NOW + timedelta(minutes=23) - ADVANCE),
+        ]
+        
+        assert stale is None
+        assert current is not None and current.id == 1
+    
+    def test_window_uses_reminder_indexes(self, tmp_path):
+        """Окно читается диапазонами индексов (status, scheduled_at) и (status, due_date)"""
+        plan = asyncio.run(window_plan(f"sqlite+aiosqlite:///{tmp_path / 'plan.db'}"))
+        assert "INDEX ix_activities_reminders_scheduled_at (status=? AND scheduled_at>?" in plan, plan
+        assert "INDEX ix_activities_reminders_due_date (status=? AND due_date>?" in plan, plan
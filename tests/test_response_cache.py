@@ -0,0 +1,121 @@
+"""
+Тесты для кеша ответов
+"""
+import pytest
+from pydantic import BaseModel
+from starlette.requests import Request
+
+from app.core.database import RoutingSession
+from app.core.response_cache import MemoryCacheBackend, ResponseCache
+
+
+class Item(BaseModel):
+    """Ответ эндпоинта"""
+    id: int
+    name: str
+
+
+def make_request(path: str, query: str = "", headers=()) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+    })
+
+
+def make_cache() -> ResponseCache:
+    return ResponseCache(MemoryCacheBackend(maxsize=100, ttl=60), ttl=60)
+
+
+class TestResponseCache:
+    """Тесты кеша ответов"""
+    
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self):
+        """Сохраненный ответ отдается из кеша без изменений"""
+        cache = make_cache()
+        
+        entry = await cache.lookup("contacts", 1, make_request("/contacts/", "limit=10&skip=0"))
+        assert entry.response is None
+        stored = await entry.store(Item(id=1, name="Иван"))
+        
+        entry = await cache.lookup("contacts", 1, make_request("/contacts/", "skip=0&limit=10&search="))
+        assert entry.response is not None
+        assert entry.response.body == stored.body
+        assert entry.response.headers["X-Cache"] == "HIT"
+    
+    @pytest.mark.asyncio
+    async def test_hit_with_matching_etag(self):
+        """Сохраненный ETag отдается с ответом, совпадение с If-None-Match дает 304"""
+        cache = make_cache()
+        entry = await cache.lookup("contacts", 1, make_request("/contacts/1"))
+        await entry.store(Item(id=1, name="Иван"), etag='W/"1-x"')
+        
+        entry = await cache.lookup("contacts", 1, make_request("/contacts/1"))
+        assert entry.response.headers["ETag"] == 'W/"1-x"'
+        
+        request = make_request("/contacts/1", headers=[("if-none-match", 'W/"1-x"')])
+        entry = await cache.lookup("contacts", 1, request)
+        assert entry.response.status_code == 304
+        assert entry.response.body == b""
+    
+    @pytest.mark.asyncio
+    async def test_keys_are_per_user(self):
+        """Ответ одного пользователя не отдается другому"""
+        cache = make_cache()
+        entry = await cache.lookup("contacts", 1, make_request("/contacts/1"))
+        await entry.store(Item(id=1, name="Иван"))
+        
+        entry = await cache.lookup("contacts", 2, make_request("/contacts/1"))
+        assert entry.response is None
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_bumps_owner_version(self):
+        """Запись владельца сбрасывает его кеш сущности, но не чужой"""
+        cache = make_cache()
+        for owner_id in (1, 2):
+            entry = await cache.lookup("deals", owner_id, make_request("/deals/"))
+            await entry.store(Item(id=owner_id, name="deal"))
+        
+        await cache.invalidate("deals", 1)
+        
+        assert (await cache.lookup("deals", 1, make_request("/deals/"))).response is None
+        assert (await cache.lookup("deals", 2, make_request("/deals/"))).response is not None
+    
+    @pytest.mark.asyncio
+    async def test_data_owner_version(self):
+        """Список чужих сделок (manager_id) сбрасывается записью их владельца"""
+        cache = make_cache()
+        request = make_request("/deals/", "manager_id=2")
+        entry = await cache.lookup("deals", 1, request, owner_id=2)
+        await entry.store(Item(id=1, name="deal"))
+        
+        await cache.invalidate("deals", 2)
+        
+        assert (await cache.lookup("deals", 1, request, owner_id=2)).response is None
+    
+    @pytest.mark.asyncio
+    async def test_miss_reads_from_primary(self):
+        """Промах переводит сессию на primary, попадание оставляет чтение с реплики"""
+        cache = make_cache()
+        miss_session, hit_session = RoutingSession(), RoutingSession()
+        for session in (miss_session, hit_session):
+            session.info["read_only"] = True
+        
+        entry = await cache.lookup("contacts", 1, make_request("/contacts/"), db=miss_session)
+        await entry.store(Item(id=1, name="Иван"))
+        await cache.lookup("contacts", 1, make_request("/contacts/"), db=hit_session)
+        
+        assert "read_only" not in miss_session.info
+        assert hit_session.info["read_only"] is True
+    
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        """Выключенный кеш ничего не сохраняет"""
+        cache = ResponseCache(MemoryCacheBackend(maxsize=100, ttl=60), ttl=60, enabled=False)
+        entry = await cache.lookup("contacts", 1, make_request("/contacts/"))
+        await entry.store(Item(id=1, name="Иван"))
+        
+        assert (await cache.lookup("contacts", 1, make_request("/contacts/"))).response is None
@@ -0,0 +1,149 @@
+"""
+Тесты дневных сводок для отчетов
+"""
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.database import Base
+from app.models.deal import DealStatus
+from app.models.stats import ActivityDailyStats, DealDailyStats
+from app.schemas.activity import ActivityCreate, ActivityUpdate
+from app.schemas.bulk import BulkOperation
+from app.schemas.deal import DealCreate, DealUpdate
+from app.services import bulk_service, rollup_service
+from app.services.activity_service import ActivityService
+from app.services.deal_service import DealService
+from app.services.report_service import ReportService
+
+
+async def stats_rows(session: AsyncSession) -> dict:
+    """Ненулевые строки сводок: ключ -> меры"""
+    rows = {}
+    for stats_model, rollup in (
+        (DealDailyStats, rollup_service.DEAL_ROLLUP),
+        (ActivityDailyStats, rollup_service.ACTIVITY_ROLLUP),
+    ):
+        result = await session.execute(select(stats_model).where(stats_model.count != 0))
+        for row in result.scalars():
+            key = (stats_model.__tablename__,) + tuple(getattr(row, name) for name in rollup.keys)
+            rows[key] = tuple(getattr(row, name) for name in rollup.measures)
+    return rows
+
+
+async def write_and_report(url: str):
+    """Изменения через сервисы (ORM и пакетные); сводки до и после rebuild и отчеты"""
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            deals = DealService(session)
+            # id сохраняются сразу: commit следующей операции сбрасывает состояние объектов
+            first = (await deals.create_deal(
+                DealCreate(title="A", amount=Decimal("100.50"), probability=50), owner_id=1
+            )).id
+            second = (await deals.create_deal(
+                DealCreate(title="B", amount=Decimal("10"), currency="USD"), owner_id=1
+            )).id
+            await deals.create_deal(DealCreate(title="Чужая", amount=Decimal("7")), owner_id=2)
+            await deals.update_deal(first, DealUpdate(status=DealStatus.IN_PROGRESS), owner_id=1)
+            await deals.delete_deal(second, owner_id=1)
+            await deals.bulk_deals([
+                BulkOperation(action="create", data={"title": "C", "amount": "5"}),
+                BulkOperation(action="update", id=first, data={"amount": "200", "probability": 10}),
+            ], owner_id=1)
+            
+            activities = ActivityService(session)
+            call = (await activities.create_activity(ActivityCreate(title="Звонок", type="call"), owner_id=1)).id
+            await activities.update_activity(call, ActivityUpdate(status="completed"), owner_id=1)
+            note = (await activities.create_activity(ActivityCreate(title="Заметка", type="note"), owner_id=1)).id
+            await activities.bulk_activities([BulkOperation(action="delete", id=note)], owner_id=1)
+            
+            incremental = await stats_rows(session)
+            await rollup_service.rebuild(session)
+            await session.commit()
+            rebuilt = await stats_rows(session)
+            
+            today = datetime.now(timezone.utc).date()
+            reports = ReportService(session)
+            sales = await reports.sales_report(1, today, today)
+            activity = await reports.activity_report(1, today, today)
+            daily = await reports.daily_report(today)
+            return incremental, rebuilt, sales, activity, daily
+    finally:
+        await engine.dispose()
+
+
+# Момент перед полуночью UTC: день в сводке должен совпасть с днем created_at в БД
+BEFORE_MIDNIGHT = datetime(2026, 1, 1, 23, 59, 59, 500000, tzinfo=timezone.utc)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return BEFORE_MIDNIGHT
+
+
+async def create_before_midnight(url: str):
+    """Сделки через ORM и пакетно при часах приложения перед полуночью; сводки до и после rebuild"""
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            deals = DealService(session)
+            await deals.create_deal(DealCreate(title="A", amount=Decimal("1")), owner_id=1)
+            await deals.bulk_deals([BulkOperation(action="create", data={"title": "B"})], owner_id=1)
+            incremental = await stats_rows(session)
+            await rollup_service.rebuild(session)
+            await session.commit()
+            return incremental, await stats_rows(session)
+    finally:
+        await engine.dispose()
+
+
+class TestRollups:
+    """Сводки обновляются при записи через сервисы и совпадают с пересчетом"""
+    
+    def test_incremental_matches_rebuild(self, tmp_path):
+        """Создание, изменение, удаление (ORM и пакетное) дают те же сводки, что и пересчет"""
+        incremental, rebuilt, _, _, _ = asyncio.run(
+            write_and_report(f"sqlite+aiosqlite:///{tmp_path / 'rollups.db'}")
+        )
+        assert incremental == rebuilt
+        assert len(incremental) == 4
+    
+    def test_reports_read_rollups(self, tmp_path):
+        """Отчеты по продажам, активностям и за день"""
+        _, _, sales, activity, daily = asyncio.run(
+            write_and_report(f"sqlite+aiosqlite:///{tmp_path / 'rollups.db'}")
+        )
+        by_status = {(row.status, row.currency): row for row in sales.by_status}
+        assert sales.count == 2
+        assert set(by_status) == {(DealStatus.NEW.value, "RUB"), (DealStatus.IN_PROGRESS.value, "RUB")}
+        assert by_status[(DealStatus.IN_PROGRESS.value, "RUB")].amount == Decimal("200.00")
+        assert by_status[(DealStatus.IN_PROGRESS.value, "RUB")].weighted_amount == Decimal("20.00")
+        assert [(row.currency, row.count, row.amount) for row in sales.by_day] == [("RUB", 2, Decimal("205.00"))]
+        
+        assert activity.count == 1
+        assert [(row.type, row.status, row.count) for row in activity.by_type] == [("call", "completed", 1)]
+        
+        owners = {summary.user_id: summary for summary in daily.owners}
+        assert owners[1].deals == 2
+        assert owners[1].activities == 1
+        assert owners[2].deals == 1
+        assert owners[2].activities == 0
+    
+    def test_day_from_stored_created_at(self, tmp_path, monkeypatch):
+        """created_at новой записи задается до вставки, поэтому день сводки совпадает с rebuild"""
+        monkeypatch.setattr(rollup_service, "datetime", FrozenDatetime)
+        monkeypatch.setattr(bulk_service, "datetime", FrozenDatetime)
+        incremental, rebuilt = asyncio.run(
+            create_before_midnight(f"sqlite+aiosqlite:///{tmp_path / 'rollups.db'}")
+        )
+        assert incremental == rebuilt
+        assert [key[2] for key in incremental] == [BEFORE_MIDNIGHT.date()]
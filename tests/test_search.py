@@ -0,0 +1,110 @@
+"""
+Тесты поиска: экранирование шаблона ILIKE и запасной вариант без pg_trgm
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core import search
+from app.core.database import Base
+from app.core.pagination import decode_cursor, paginate
+from app.core.search import search_filter, search_rank
+from app.models.contact import Contact
+
+COLUMNS = (Contact.first_name, Contact.last_name)
+
+
+def compile_sql(condition, dialect):
+    return condition.compile(dialect=dialect)
+
+
+def session_for(dialect_name: str):
+    """Заглушка сессии: search_rank смотрит только на диалект"""
+    return SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name=dialect_name)))
+
+
+async def run_search(url: str, term: str, rank=None, cursor=None):
+    """Поиск по контактам в SQLite: имена найденных и курсор следующей страницы"""
+    engine = create_async_engine(url)
+    started = datetime(2026, 1, 1)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            await session.execute(insert(Contact), [
+                {"id": index, "first_name": name, "last_name": "Тест", "owner_id": 1,
+                 "created_at": started + timedelta(minutes=index)}
+                for index, name in enumerate(["скидка 50%", "500", "a_b", "axb", "c\\d", "скидка 50% еще"], 1)
+            ])
+            await session.commit()
+            query = select(Contact).where(search_filter(COLUMNS, term))
+            page = await paginate(session, query, Contact, limit=1, cursor=cursor, rank=rank)
+            return [item.first_name for item in page.items], page.next_cursor
+    finally:
+        await engine.dispose()
+
+
+class TestSearchFilter:
+    """Экранирование %, _ и \\ в поисковой строке"""
+    
+    def test_pattern_is_escaped_in_both_dialects(self):
+        """Спецсимволы LIKE экранируются, ESCAPE указан для обоих диалектов"""
+        condition = search_filter(COLUMNS, "50%_a\\b")
+        for dialect in (postgresql.dialect(), sqlite.dialect()):
+            compiled = compile_sql(condition, dialect)
+            assert set(compiled.params.values()) == {"%50\\%\\_a\\\\b%"}
+            assert str(compiled).count(" ESCAPE ") == 2
+        assert str(compile_sql(condition, postgresql.dialect())).count("ILIKE") == 2
+    
+    def test_special_characters_match_literally(self, tmp_path):
+        """% и _ в запросе не работают как шаблоны, \\ ищется как символ"""
+        url = f"sqlite+aiosqlite:///{tmp_path / 'search.db'}"
+        percent, _ = asyncio.run(run_search(url, "50%"))
+        underscore, _ = asyncio.run(run_search(f"sqlite+aiosqlite:///{tmp_path / 'u.db'}", "a_b"))
+        backslash, _ = asyncio.run(run_search(f"sqlite+aiosqlite:///{tmp_path / 'b.db'}", "c\\d"))
+        
+        assert percent == ["скидка 50% еще"]
+        assert underscore == ["a_b"]
+        assert backslash == ["c\\d"]
+
+
+class TestSearchRank:
+    """Ранжирование pg_trgm и работа без него"""
+    
+    def test_rank_with_trigram(self, monkeypatch):
+        """С pg_trgm в PostgreSQL результаты ранжируются по word_similarity"""
+        monkeypatch.setattr(search, "_trigram_available", True)
+        rank = search_rank(session_for("postgresql"), COLUMNS, "иван")
+        sql = str(compile_sql(rank, postgresql.dialect()))
+        
+        assert sql.startswith("greatest(word_similarity(")
+        assert sql.count("word_similarity(") == 2
+    
+    def test_no_rank_without_trigram(self, monkeypatch):
+        """Без pg_trgm, в SQLite и без строки поиска ранжирования нет"""
+        monkeypatch.setattr(search, "_trigram_available", False)
+        assert search_rank(session_for("postgresql"), COLUMNS, "иван") is None
+        
+        monkeypatch.setattr(search, "_trigram_available", True)
+        assert search_rank(session_for("sqlite"), COLUMNS, "иван") is None
+        assert search_rank(session_for("postgresql"), COLUMNS, "") is None
+    
+    def test_keyset_cursor_kept_without_rank(self, tmp_path):
+        """Без ранжирования поиск отдает курсор, и по нему читается следующая страница"""
+        url = f"sqlite+aiosqlite:///{tmp_path / 'search.db'}"
+        first, next_cursor = asyncio.run(run_search(url, "скидка"))
+        second, _ = asyncio.run(run_search(
+            f"sqlite+aiosqlite:///{tmp_path / 'next.db'}", "скидка", cursor=decode_cursor(next_cursor)
+        ))
+        _, ranked_cursor = asyncio.run(run_search(
+            f"sqlite+aiosqlite:///{tmp_path / 'ranked.db'}", "скидка", rank=Contact.id
+        ))
+        
+        assert first == ["скидка 50% еще"]
+        assert next_cursor is not None
+        assert second == ["скидка 50%"]
+        assert ranked_cursor is None
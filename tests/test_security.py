@@ -0,0 +1,29 @@
+"""
+Тесты пула хеширования паролей
+"""
+import asyncio
+
+import pytest
+
+from app.core import security
+
+
+def fail(password: str) -> str:
+    raise ValueError(password)
+
+
+class TestPasswordHashing:
+    """Счетчики пула bcrypt"""
+    
+    def test_completed_and_failed_counters(self):
+        """Успешные и завершившиеся ошибкой операции считаются отдельно"""
+        before = security.password_hashing_stats()
+        hashed = asyncio.run(security.get_password_hash_async("secret"))
+        with pytest.raises(ValueError):
+            asyncio.run(security._run_hashing(fail, "secret"))
+        after = security.password_hashing_stats()
+        
+        assert security.verify_password("secret", hashed)
+        assert after["completed"] - before["completed"] == 1
+        assert after["failed"] - before["failed"] == 1
+        assert after["pending"] == 0